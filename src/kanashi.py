@@ -30,10 +30,12 @@ from click import (
 )
 from click.core import Context
 from json import dumps as JsonEncoder
+from signal import SIGUSR1, signal
 from subprocess import run as SubprocessRun
-from sys import argv
+from sys import argv, stderr
+from threading import Event, Thread
 from traceback import format_exception
-from typing import final, MutableSequence, Self
+from typing import final, MutableSequence, Optional, Self
 
 from kanashi.client import Client, create as ClientBuilder
 from kanashi.command import *
@@ -41,6 +43,11 @@ from kanashi.common import puts, typeof
 from kanashi.constant import BasePath, BaseVenv
 from kanashi.logger import *
 from kanashi.manager import Manager
+from kanashi.limiter import limiter
+from kanashi.metrics import metrics
+from kanashi.pool import sessions
+from kanashi.proxies import configure as configureProxyPool, ProxyPool, proxypool
+from kanashi.transport import Cassette, RecordAdapter, ReplayAdapter
 
 
 __all__ = [
@@ -111,12 +118,22 @@ class Kanashi:
 	manager:Manager
 	""" Account Manager """
 	
+	metrics:Optional[Str]
+	""" Metrics dump format, json or prometheus """
+	
+	metricsFile:Optional[Str]
+	""" Metrics dump filename, default is stderr """
+	
+	reporting:Event
+	""" Metrics dump request, set by SIGUSR1 """
+	
 	def __init__( self ) -> None:
 		
 		""" Construct method of class Main """
 		
 		disabled = "--logging-store-disabled"
 		enabled = "--logging-store-enabled"
+		structured = "--logging-store-structured"
 		verbose = "--verbose"
 		if verbose in argv:
 			del argv[argv.index( verbose )]
@@ -129,6 +146,62 @@ class Kanashi:
 		elif enabled in argv:
 			del argv[argv.index( enabled )]
 			enableStoreLog()
+		if structured in argv:
+			del argv[argv.index( structured )]
+			enableStructuredLog()
+		rotations = {}
+		for argument in [ *argv ]:
+			if argument.startswith( "--logging-store-policy\x3d" ):
+				sink( policy=argument.split( "\x3d", 1 ).pop() )
+				del argv[argv.index( argument )]
+			elif argument.startswith( "--logging-rotation-" ) and "\x3d" in argument:
+				keyset, value = argument.removeprefix( "--logging-rotation-" ).split( "\x3d", 1 )
+				if keyset in ( "age", "interval", "retention", "size" ):
+					rotations[keyset] = None if value in ( "", "none" ) else int( value )
+				elif keyset == "compress":
+					rotations[keyset] = value not in ( "0", "false", "no" )
+				del argv[argv.index( argument )]
+		if rotations:
+			sink( rotation=Rotation( **rotations ) )
+		transports = {}
+		for argument in [ *argv ]:
+			if argument.startswith( "--transport-" ) and "\x3d" in argument:
+				keyset, value = argument.removeprefix( "--transport-" ).split( "\x3d", 1 )
+				transports[keyset] = value
+				del argv[argv.index( argument )]
+		if "replay" in transports:
+			bandwidth = transports.get( "bandwidth" )
+			sessions().transport( ReplayAdapter.factory( 
+				cassette=Cassette( transports['replay'] ), 
+				latency=float( transports.get( "latency", 0 ) ), 
+				bandwidth=float( bandwidth ) if bandwidth else None 
+			))
+		elif "record" in transports:
+			sessions().transport( RecordAdapter.factory( Cassette( transports['record'] ) ) )
+		self.metrics = None
+		self.metricsFile = None
+		self.reporting = Event()
+		for argument in [ *argv ]:
+			if argument.startswith( "--metrics\x3d" ):
+				self.metrics = argument.split( "\x3d", 1 ).pop()
+				del argv[argv.index( argument )]
+			elif argument.startswith( "--metrics-file\x3d" ):
+				self.metricsFile = argument.split( "\x3d", 1 ).pop()
+				del argv[argv.index( argument )]
+			elif argument.startswith( "--proxy-pool\x3d" ):
+				configureProxyPool( ProxyPool.load( argument.split( "\x3d", 1 ).pop() ) )
+				del argv[argv.index( argument )]
+			elif argument.startswith( "--ratelimit-" ) and "\x3d" in argument:
+				keyset, value = argument.removeprefix( "--ratelimit-" ).split( "\x3d", 1 )
+				if value in ( "", "0", "none" ):
+					limiter().configure( keyset, None )
+				else:
+					rate, *capacity = value.split( "\x2c", 1 )
+					limiter().configure( keyset, float( rate ), float( capacity.pop() ) if capacity else None )
+				del argv[argv.index( argument )]
+		if self.metrics is not None:
+			signal( SIGUSR1, lambda signum, frame: self.reporting.set() )
+			Thread( target=self.reporter, name="KanashiReporter", daemon=True ).start()
 		
 		self.commands = [
 			Account,
@@ -167,9 +240,45 @@ class Kanashi:
 			status = e.code
 		finally:
 			self.logger.info( "Program terminated with status: {}", status )
+			self.report()
 			puts( close=status )
 		...
 	
+	def report( self ) -> None:
+		
+		""" Dump request metrics when enabled """
+		
+		if proxypool() is not None:
+			self.logger.info( "Proxy pool health: {}", JsonEncoder( proxypool().stats ) )
+		if self.metrics is None:
+			return
+		dumped = metrics().dump( self.metrics )
+		if self.metricsFile is not None:
+			with open( self.metricsFile, "w" ) as fopen:
+				fopen.write( dumped )
+			self.logger.info( "Request metrics written to: {}", self.metricsFile )
+		else:
+			stderr.write( dumped + "\x0a" )
+			stderr.flush()
+	
+	def reporter( self ) -> None:
+		
+		"""
+		Dump request metrics whenever SIGUSR1 is received
+		
+		The signal handler only sets the reporting event, the dump
+		runs on this thread because the handler may interrupt the
+		main thread while it holds the metrics registry lock.
+		"""
+		
+		while True:
+			self.reporting.wait()
+			self.reporting.clear()
+			try:
+				self.report()
+			except Exception as e:
+				self.logger.error( "Failed dump request metrics: {}", e )
+	
 	...
 
 
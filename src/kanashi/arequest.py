@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+
+#
+# @author hxAri (hxari)
+# @create 23-12-2024 17:30
+# @github https://github.com/hxAri/Kanashi
+#
+# Kanashi is an Open-Source project for doing various
+# things related to Instagram, e.g Login. Logout, Profile Info,
+# Follow, Unfollow, Media downloader, etc.
+#
+# Kanashi Copyright (c) 2024 - hxAri <hxari@proton.me>
+# Kanashi Licence under GNU General Public Licence v3
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+from aiohttp import (
+	BasicAuth, 
+	ClientConnectionError, 
+	ClientPayloadError, 
+	ClientSession, 
+	ClientTimeout, 
+	DummyCookieJar, 
+	FormData, 
+	TCPConnector
+)
+from asyncio import AbstractEventLoop, get_running_loop, sleep, TimeoutError as AsyncTimeoutError
+from builtins import bool as Bool, int as Int, str as Str
+from os import register_at_fork
+from requests.cookies import cookiejar_from_dict
+from requests.structures import CaseInsensitiveDict
+from time import monotonic
+from traceback import format_exception
+from typing import ( 
+	Any, 
+	MutableMapping, 
+	Optional, 
+	Tuple, 
+	Union
+)
+from urllib.parse import urlparse
+from weakref import WeakKeyDictionary
+
+from kanashi.common import typeof
+from kanashi.decoder import adecode, DecoderError
+from kanashi.errors import ProxyUnavailableError
+from kanashi.flight import frozen, SingleFlight
+from kanashi.limiter import limiter
+from kanashi.logger import Logger
+from kanashi.metrics import endpoint, metrics
+from kanashi.proxies import proxypool
+from kanashi.retry import Retry
+from kanashi.typing import Response
+
+
+__all__ = [
+	"aclose",
+	"arequest",
+	"asession"
+]
+
+
+_Flights:SingleFlight = SingleFlight()
+""" In-flight Request Coalescing """
+
+_logger = Logger( __name__ )
+""" Logger Instance """
+
+_Retryable = (
+	AsyncTimeoutError,
+	ClientConnectionError,
+	ClientPayloadError,
+	*DecoderError
+)
+""" Retryable Request Exceptions """
+
+_Sessions:WeakKeyDictionary[AbstractEventLoop,ClientSession] = WeakKeyDictionary()
+""" Client session per-event loop """
+
+
+def _forked() -> None:
+	
+	""" Reset in-flight request coalescing and client sessions in forked child """
+	
+	global _Flights, _Sessions
+	_Flights = SingleFlight()
+	_Sessions = WeakKeyDictionary()
+
+async def aclose() -> None:
+	
+	""" Close client session of running event loop """
+	
+	session = _Sessions.pop( get_running_loop(), None )
+	if session is not None:
+		await session.close()
+
+def asession( limit:Int=256, hosts:Int=0 ) -> ClientSession:
+	
+	"""
+	Return client session of running event loop
+	
+	Parameters:
+		limit (Int):
+			Maximum simultaneous connections
+		hosts (Int):
+			Maximum simultaneous connections per-host, zero is unlimited
+	
+	Returns:
+		ClientSession:
+			Aiohttp client session
+	"""
+	
+	loop = get_running_loop()
+	session = _Sessions.get( loop )
+	if session is None or session.closed:
+		session = ClientSession(
+			connector=TCPConnector( limit=limit, limit_per_host=hosts ),
+			cookie_jar=DummyCookieJar(),
+			auto_decompress=False
+		)
+		_Sessions[loop] = session
+	return session
+
+async def arequest( method:Str, url:Str, auth:Optional[Tuple[Str,Str]]=None, data:Optional[MutableMapping[Str,Any]]=None, files:Optional[MutableMapping[Str,Any]]=None, cookies:Optional[MutableMapping[Str,Str]]=None, headers:Optional[MutableMapping[Str,Str]]=None, params:Optional[MutableMapping[Str,Str]]=None, payload:Optional[MutableMapping[Str,Any]]=None, proxies:Optional[MutableMapping[Str,Str]]=None, stream:Bool=False, verify:Optional[Bool]=None, timeout:Optional[Int]=None, tries:Int=10, retry:Optional[Retry]=None, coalesce:Bool=True, thread:Union[Int,Str]=0 ) -> Optional[Response]:
+	
+	"""
+	Send HTTP Request asynchronously
+	
+	Parameters:
+		method (Str):
+			Http request method
+		url (Str):
+			Http request url target
+		auth (Optional[Tuple[Str,Str]]):
+			Http request authentication
+		data (Optional[MutableMapping[Str,Any]]):
+			Http request application/x-www-form-urlencoded
+		files (Optional[MutableMapping[Str,Any]]):
+			Http request multipart form data
+		cookies (Optional[MutableMapping[Str,Str]):
+			Http request cookies
+		headers (Optional[MutableMapping[Str,Str]):
+			Http request headers
+		params (Optional[MutableMapping[Str,Str]):
+			Http request parameters
+		payload (Optional[MutableMapping[Str,Any]]):
+			Http request application/json
+		proxies (Optional[MutableMapping[Str,Any]]):
+			Http request proxies, when not given and the proxy pool
+			is configured the proxy is assigned by account session
+			or thread position number
+		stream (Bool):
+			Allow request stream, the response body is not read
+			and must be consumed with Response.aiterate
+		verify (Optional[Bool]):
+			Verify http request
+		timeout (Optional[Int]):
+			Http request timeout
+		tries (Int):
+			Http request maximum attempts, used when retry is not given
+		retry (Optional[Retry]):
+			Http request retry policy
+		coalesce (Bool):
+			Share one in-flight fetch between identical concurrent
+			GET requests, every follower receives its own copy of
+			the response and streamed requests are never shared
+		thread (Int|Str):
+			Current thread position number
+	
+	Returns:
+		response (Optional[Response]):
+			Request response
+	
+	Raises:
+		ExceptionGroup:
+			Raises when all retryable attempts are failed
+		ProxyUnavailableError:
+			Raises when proxy pool is configured and every proxy is evicted
+	"""
+	
+	if coalesce is True and stream is False and method in ( "GET", "HEAD" ) and data is None and files is None and payload is None:
+		keyset = tuple([ method, url, frozen( params ), frozen( headers ), frozen( cookies ), frozen( proxies ), auth ])
+		response, shared = await _Flights.ado( keyset, arequest, method, url, auth=auth, cookies=cookies, headers=headers, params=params, proxies=proxies, verify=verify, timeout=timeout, tries=tries, retry=retry, coalesce=False, thread=thread )
+		if shared is True and response is not None:
+			_logger.debug( "Shared in-flight {} url=\"{}\"", method, url, thread=thread )
+			return response.copy()
+		return response
+	attempt = 0
+	label = endpoint( url, payload if payload is not None else data )
+	policy = retry if retry is not None else Retry( tries=tries )
+	pool = proxypool() if not proxies else None
+	proxy = None
+	session = asession()
+	started = monotonic()
+	throwned = []
+	urlparsed = urlparse( url )
+	urlsimple = f"{urlparsed.scheme}://{urlparsed.netloc}{urlparsed.path}"
+	anonymous = not cookies or "sessionid" not in cookies
+	sticky = object() if anonymous else cookies['sessionid']
+	options = {}
+	if auth is not None:
+		options['auth'] = BasicAuth( *auth )
+	if files:
+		form = FormData()
+		for keyset, value in ( data or {} ).items():
+			form.add_field( keyset, value )
+		for keyset, value in files.items():
+			if isinstance( value, tuple ):
+				form.add_field( keyset, value[1], filename=value[0], content_type=value[2] if len( value ) >= 3 else None )
+			else:
+				form.add_field( keyset, value, filename=keyset )
+		options['data'] = form
+	elif data is not None:
+		options['data'] = data
+	if payload is not None:
+		options['json'] = payload
+	if proxies:
+		explicit = proxies.get( urlparsed.scheme, proxies.get( "all" ) )
+		if explicit:
+			options['proxy'] = explicit
+	if verify is False:
+		options['ssl'] = False
+	while True:
+		attempt += 1
+		waited = limiter().reserve( url )
+		if waited > 0:
+			_logger.debug( "Rate limited {} url=\"{}\" delay={:.2f}", method, urlsimple, waited, thread=thread )
+			await sleep( waited )
+		_logger.warning( "Request {method} url=\"{url}\"", method=method, url=urlsimple, attempt=attempt, thread=thread )
+		sent = monotonic()
+		try:
+			if pool is not None:
+				proxy = pool.assign( sticky )
+				while proxy is None:
+					delay = pool.delay()
+					if delay is None:
+						raise ProxyUnavailableError( f"Every proxy of the pool is evicted, refused to send {method} request to url=\"{urlsimple}\" directly" )
+					_logger.warning( "Waiting proxy cooldown {} url=\"{}\" delay={:.2f}", method, urlsimple, delay, thread=thread )
+					await sleep( delay )
+					proxy = pool.assign( sticky )
+				options['proxy'] = proxy.url
+				sent = monotonic()
+			response = await session.request( 
+				method, 
+				url, 
+				params=params, 
+				cookies=cookies, 
+				headers=headers, 
+				timeout=ClientTimeout( total=timeout ),
+				**options
+			)
+			_logger.warning( "Response {method} url=\"{url}\" code={status} duration={duration:.3f}", method=method, url=urlsimple, status=response.status, duration=monotonic() - sent, endpoint=label, thread=thread )
+			if pool is not None and proxy is not None:
+				pool.report( proxy, monotonic() - sent, response.status )
+			if policy.retryable( response.status, method ):
+				delay = policy.delay( attempt, started, response.headers.get( "Retry-After" ) )
+				if delay is not None:
+					_logger.warning( "Retrying {} url=\"{}\" code={} attempt={} delay={:.2f}", method, urlsimple, response.status, attempt, delay, thread=thread )
+					metrics().observe( label, response.status, monotonic() - sent, retried=True )
+					response.close()
+					await sleep( delay )
+					continue
+			encoding = response.headers.get( "Content-Encoding" )
+			contentType = None
+			characterSet = None
+			if "Content-Type" in response.headers:
+				parts = response.headers['Content-Type'].split( "\x3b" )
+				characterSet = parts[1].strip( "\x20" ).split( "\x3d" ).pop() if len( parts ) >= 2 else None
+				contentType = parts[0].strip( "\x20" )
+			responseCookies = cookiejar_from_dict({ keyset: morsel.value for keyset, morsel in response.cookies.items() })
+			responseHeaders = CaseInsensitiveDict( response.headers )
+			if stream is True:
+				metrics().observe( label, response.status, monotonic() - sent )
+				return Response(
+					url=str( response.url ),
+					type=contentType,
+					status=response.status,
+					payload=payload if payload is not None else data,
+					content=None,
+					cookies=responseCookies,
+					headers=responseHeaders,
+					charset=characterSet,
+					encoding=encoding,
+					stream=response
+				)
+			content = bytearray()
+			try:
+				if encoding is not None:
+					_logger.warning( "Trying to decompress content={} url=\"{}\"", encoding, urlsimple, thread=thread )
+				async for chunk in adecode( response.content, encoding ):
+					content.extend( chunk )
+			except DecoderError:
+				response.close()
+				raise
+			metrics().observe( label, response.status, monotonic() - sent, len( content ) )
+			return Response(
+				url=str( response.url ),
+				type=contentType,
+				status=response.status,
+				payload=payload if payload is not None else data,
+				content=bytes( content ),
+				cookies=responseCookies,
+				headers=responseHeaders,
+				charset=characterSet,
+				encoding=encoding
+			)
+		except _Retryable as e:
+			throwned.append( e )
+			_logger.error( "{}: {}", typeof( e ), "\x0a".join( format_exception( e ) ), thread=thread )
+			delay = policy.delay( attempt, started )
+			if pool is not None and proxy is not None:
+				pool.report( proxy, error=e )
+			metrics().error( label, e, retried=delay is not None )
+			if delay is None:
+				raise ExceptionGroup( f"An error occurred while sending a {method} request to url=\"{urlsimple}\"", throwned ) from e
+			_logger.warning( "Retrying {} url=\"{}\" attempt={} delay={:.2f}", method, urlsimple, attempt, delay, thread=thread )
+			await sleep( delay )
+		except BaseException as e:
+			_logger.error( "{}: {}", typeof( e ), "\x0a".join( format_exception( e ) ), thread=thread )
+			metrics().error( label, e )
+			raise e
+		finally:
+			if pool is not None and anonymous is True:
+				pool.release( sticky )
+	...
+
+
+register_at_fork( after_in_child=_forked )
@@ -21,21 +21,24 @@
 # along with this program. If not, see <https://www.gnu.org/licenses/>.
 #
 
+from asyncio import gather, Semaphore
 from builtins import bool as Bool, int as Int, str as Str
 from click import Context, group, option as Option, pass_context as Initial
 from click.types import Path
 from hashlib import md5
 from json import dumps as JsonEncoder
 from os import makedirs as mkdir
-from os.path import isdir, isfile
+from os.path import basename, isdir, isfile
 from re import IGNORECASE, MULTILINE
 from re import compile as Pattern
 from traceback import format_exception
 from typing import (
 	Any, 
 	final, 
+	Iterable, 
 	MutableMapping, 
 	MutableSequence, 
+	Optional, 
 	Tuple, 
 	TypeVar as Var, 
 	Union
@@ -46,7 +49,8 @@ from xml.sax import saxutils
 from kanashi.client import Client
 from kanashi.common import puts, typeof
 from kanashi.constant import HomePath
-from kanashi.futures import ThreadExecutor
+from kanashi.downloader import asave, budget, save, SegmentThreshold
+from kanashi.futures import AdaptiveConcurrency, ThreadExecutor
 from kanashi.graphql.actions import (
 	PolarisPostActionLoadPostQueryQuery,
 	PolarisProfilePageContentQuery,
@@ -54,11 +58,16 @@ from kanashi.graphql.actions import (
 	PolarisStoriesV3ReelPageStandaloneQuery
 )
 from kanashi.logger import Logger
-from kanashi.request import request
+from kanashi.pool import sessions
 
 
 __all__ = [
-	"Media"
+	"adownload",
+	"download",
+	"expand",
+	"Media",
+	"tally",
+	"transfer"
 ]
 
 
@@ -75,10 +84,11 @@ _Source = Var( "_Source", bytes, str )
 """ Media Source Type """
 
 
-def download( timeline:Union[MutableMapping[Str,Any],MutableSequence[Any]], pathname:Str, thread:Union[Int,Str]=None ) -> None:
+async def adownload( timeline:Union[MutableMapping[Str,Any],MutableSequence[Any]], pathname:Str, thread:Union[Int,Str]=None, semaphore:Optional[Semaphore]=None, segments:Int=1, threshold:Int=SegmentThreshold, rate:Optional[Int]=None ) -> None:
 	
 	"""
-	Media downloader
+	Media downloader asynchronously, every media source
+	is downloaded concurrently in the running event loop
 	
 	Parameters:
 		timeline (Union[MutableMapping[Str,Any],MutableSequence[Any]]):
@@ -86,278 +96,460 @@ def download( timeline:Union[MutableMapping[Str,Any],MutableSequence[Any]], path
 		pathname (Str):
 			Pathname of stored media
 		thread (Int|Str):
-			Current thread position number
+			Current task position number
+		semaphore (Optional[Semaphore]):
+			Semaphore for limit in-flight downloads, shared across tasks
+		segments (Int):
+			Number of concurrent byte range segments for large media
+		threshold (Int):
+			Minimum media size in bytes for segmented download
+		rate (Optional[Int]):
+			Per-file bandwidth cap in bytes per second
 	"""
 	
-	def parser( timeline:MutableMapping[Str,Any], pathname:Str, thread:Union[Int,Str] ) -> MutableSequence[Tuple[_Source,_Pathname]]:
-		
-		"""
-		Timeline media parser
-		
-		Parameters:
-			timeline (MutableMapping[Str,Any]):
-				Timeline metadata info
-			pathname (Str):
-				Pathname of stored media
-			thread (Int|Str):
-				Current thread position number
-		
-		Returns:
-			MutableSequence[Tuple[_Source,_Pathname]]:
-				MutableSequence of tuple source media url and pathname stored media
-		"""
-		
-		sources = []
-		typename = "unknown"
-		separator = "\x5f"
-		timelineId = timeline['id']
-		if separator in timelineId:
-			timelineId = timelineId.split( separator )[0]
-		if "type" in timeline and timeline['type']:
-			typename = timeline['type']
-		elif "__typename" in timeline and timeline['__typename']:
-			typename = timeline['__typename']
-		match typename:
-			case "GraphHighlightReel" | "GraphReel":
-				pathname+= f"/{timeline['owner']['username']}"
-				for item in timeline['items']:
-					match item['__typename']:
-						case "GraphStoryImage":
-							image = max( item['display_resources'], key=lambda resource: ( resource['config_width'], resource['config_height'] ) )
-							sources.append( tuple([ image['src'], f"{pathname}/{typename}/GraphStoryImage/{timelineId}" ]) )
-						case "GraphStoryVideo":
-							video = max( item['video_resources'], key=lambda resource: ( resource['config_width'], resource['config_height'] ) )
-							sources.append( tuple([ video['src'], f"{pathname}/{typename}/GraphStoryVideo/{timelineId}" ]) )
-							thumbnail = max( item['display_resources'], key=lambda resource: ( resource['config_width'], resource['config_height'] ) )
-							sources.append( tuple([ thumbnail['src'], f"{pathname}/{typename}/GraphStoryVideo/{timelineId}" ]) )
-						case _:
-							_logger.warning( "Unknown media {} typename: {}", typename, item['__typename'], thread=thread )
-			case "GraphSidecar":
-				match media['type']:
-					case "GraphImage":
-						sources.append( tuple([ media['image'], f"{pathname}/GraphSidecar/GraphImage/{timelineId}" ]) )
-					case "GraphVideo":
-						sources.append( tuple([ media['video'], f"{pathname}/GraphSidecar/GraphVideo/{timelineId}" ]) )
-						sources.append( tuple([ media['thumbnail'], f"{pathname}/GraphSidecar/GraphVideo/{timelineId}" ]) )
-					case _:
-						_logger.warning( "Unknown media GraphSidecar typename: {}", media['type'], thread=thread )
-			case "GraphImage":
-				sources.append( tuple([ timeline['image'], f"{pathname}/GraphImage/{timelineId}" ]) )
-			case "GraphVideo":
-				if "owner" in timeline:
-					if not pathname.endswith( timeline['owner']['username'] ):
-						pathname+= f"/{timeline['owner']['username']}"
-				if "video" in timeline and timeline['video']:
-					sources.append( tuple([ timeline['video'], f"{pathname}/GraphVideo/{timelineId}" ]) )
-					sources.append( tuple([ timeline['thumbnail'], f"{pathname}/GraphVideo/{timelineId}" ]) )
-				elif "video_url" in timeline and timeline['video_url']:
-					sources.append( tuple([ timeline['video_url'], f"{pathname}/GraphVideo/{timelineId}" ]) )
-					thumbnail = None
-					if "display_resources" in timeline and timeline['display_resources']:
-						thumbnail = max( timeline['display_resources'], key=lambda resource: ( resource['config_width'], resource['config_height'] ) )
-					elif "display_url" in timeline and timeline['display_url']:
-						thumbnail = { "src": timeline['display_url'] }
-					elif "thumbnail_resources" in timeline and timeline['thumbnail_resources']:
-						thumbnail = max( timeline['thumbnail_resources'], key=lambda resource: ( resource['config_width'], resource['config_height'] ) )
-					elif "thumbnail_src" in timeline and timeline['thumbnail_src']:
-						thumbnail = { "src": timeline['thumbnail_src'] }
-					if thumbnail is not None and thumbnail:
-						sources.append( tuple([ thumbnail['src'], f"{pathname}/GraphVideo/{timelineId}" ]) )
-			case "kanashi.client.Client.profile":
-				if not pathname.endswith( timeline['username'] ):
-					pathname+= f"/{timeline['username']}"
-				sources.append( tuple([ timeline['profile_pic_url_hd'], f"{pathname}/profile" ]) )
-			case "kanashi.graphql.actions.profile.PolarisProfilePageContentQuery":
-				if not pathname.endswith( timeline['username'] ):
-					pathname+= f"/{timeline['username']}"
-				sources.append( tuple([ timeline['hd_profile_pic_url_info']['url'], f"{pathname}/profile" ]) )
-			case "kanashi.client.Client.reels":
-				if not pathname.endswith( timeline['owner']['username'] ):
-					pathname+= f"/{timeline['owner']['username']}"
-				match timeline['media_type']:
-					case 1:
-						image = max( timeline['image_versions2']['candidates'], key=lambda resource: ( resource['width'], resource['height'] ) )
-						sources.append( tuple([ timeline['url'], f"{pathname}/GraphImage/{timelineId}" ]) )
-					case 2:
-						video = None
-						if "video_dash_manifest" in timeline and timeline['video_dash_manifest']:
-							videoDashManifests = videoDashManifest( timeline['video_dash_manifest'] )
-							video = max( videoDashManifests, key=lambda resource: ( resource['width'], resource['height'] if "height" in resource else 0 ) )
-						elif "video_versions" in timeline and timeline['video_versions']:
-							video = min( timeline['video_versions'], key=lambda resource: ( resource['type'] ) )
-						sources.append( tuple([ video['url'], f"{pathname}/GraphVideo/{timelineId}" ]) )
-						thumbnail = max( timeline['image_versions2']['candidates'], key=lambda resource: ( resource['width'], resource['height'] ) )
-						sources.append( tuple([ thumbnail['url'], f"{pathname}/GraphVideo/{timelineId}" ]) )
-					case _:
-						_logger.warning( "Unknown media {} typename: {}", typename, timeline['media_type'], thread=thread )
-			case "XDTGraphSidecar":
-				for edge in timeline['edge_sidecar_to_children']['edges']:
-					match edge['node']['__typename']:
-						case "XDTGraphImage":
-							media = max( edge['node']['display_resources'], key=lambda resource: ( resource['config_width'], resource['config_height'] ) )
-							sources.append( tuple([ media['src'], f"{pathname}/XDTGraphSidecar/XDTGraphImage/{timelineId}" ]) )
-						case "XDTGraphVideo":
-							sources.append( tuple([ edge['node']['video_url'], f"{pathname}/XDTGraphSidecar/XDTGraphVideo/{timelineId}" ]) )
-							thumbnail = max( edge['node']['display_resources'], key=lambda resource: ( resource['config_width'], resource['config_height'] ) )
-							sources.append( tuple([ thumbnail['src'], f"{pathname}/XDTGraphSidecar/XDTGraphVideo/{timelineId}" ]) )
-						case _:
-							_logger.warning( "Unknown media XDTGraphSidecar typename: {}", edge['node']['__typename'], thread=thread )
-					...
-				...
-			case "XDTGraphImage":
-				media = max( timeline['display_resources'], key=lambda resource: ( resource['config_width'], resource['config_height'] ) )
-				sources.append( tuple([ media['src'], f"{pathname}/XDTGraphImage/{timelineId}" ]) )
-			case "XDTGraphVideo":
-				sources.append( tuple([ timeline['video_url'], f"{pathname}/XDTGraphVideo/{timelineId}" ]) )
-				thumbnail = max( timeline['display_resources'], key=lambda resource: ( resource['config_width'], resource['config_height'] ) )
-				sources.append( tuple([ thumbnail['src'], f"{pathname}/XDTGraphVideo/{timelineId}" ]) )
-			case "XDTReelDict":
-				if not pathname.endswith( timeline['user']['username'] ):
-					pathname+= f"/{timeline['user']['username']}"
-				timelineId = timeline['id'].split( "\x3a" )[-1]
-				for item in timeline['items']:
-					match item['__typename']:
-						case "XDTMediaDict":
-							match item['media_type']:
-								case 1:
-									image = max( item['image_versions2']['candidates'], key=lambda resource: ( resource['width'], resource['height'] ) )
-									sources.append( tuple([ image['url'], f"{pathname}/XDTReelDict/XDTMediaDict/{timelineId}" ]) )
-								case 2:
-									video = None
-									if "video_dash_manifest" in item and item['video_dash_manifest']:
-										videoDashManifests = videoDashManifest( item['video_dash_manifest'] )
-										video = max( videoDashManifests, key=lambda resource: ( resource['width'], resource['height'] if "height" in resource else 0 ) )
-									elif "video_versions" in item and item['video_versions']:
-										video = min( item['video_versions'], key=lambda resource: ( resource['type'] ) )
-									sources.append( tuple([ video['url'], f"{pathname}/XDTReelDict/XDTMediaDict/{timelineId}" ]) )
-									thumbnail = max( item['image_versions2']['candidates'], key=lambda resource: ( resource['width'], resource['height'] ) )
-									sources.append( tuple([ thumbnail['url'], f"{pathname}/XDTReelDict/XDTMediaDict/{timelineId}" ]) )
-								case _:
-									_logger.warning( "Unknown media XDTReelDict[XDTMediaDict] type: {}", item['media_type'], thread=thread )
-						case _:
-							_logger.warning( "Unknown media XDTReelDict typename: {}", item['__typename'], thread=thread )
-			case "XDTMediaDict":
-				if not pathname.endswith( timeline['user']['username'] ):
-					pathname+= f"/{timeline['user']['username']}"
-				timelineId = timeline['pk']
-				match timeline['media_type']:
-					case 1:
-						image = max( timeline['image_versions2']['candidates'], key=lambda resource: ( resource['width'], resource['height'] ) )
-						sources.append( tuple([ image['url'], f"{pathname}/XDTMediaDict/{timeline['user']['pk']}" ]) )
-					case 2:
-						video = None
-						if "video_dash_manifest" in timeline and timeline['video_dash_manifest']:
-							videoDashManifests = videoDashManifest( timeline['video_dash_manifest'] )
-							video = max( videoDashManifests, key=lambda resource: ( resource['width'], resource['height'] if "height" in resource else 0 ) )
-						elif "video_versions" in timeline and timeline['video_versions']:
-							video = min( timeline['video_versions'], key=lambda resource: ( resource['type'] ) )
-						sources.append( tuple([ video['url'], f"{pathname}/XDTMediaDict/{timeline['user']['pk']}" ]) )
-						thumbnail = max( timeline['image_versions2']['candidates'], key=lambda resource: ( resource['width'], resource['height'] ) )
-						sources.append( tuple([ thumbnail['url'], f"{pathname}/XDTMediaDict/{timeline['user']['pk']}" ]) )
-					case _:
-						_logger.warning( "Unknown media XDTMediaDict type: {}", timeline['media_type'], thread=thread )
-			case _:
-				_logger.warning( "Unknown media typename: {}", typename, thread=thread )
-		return sources
-	
-	def videoDashManifest( contents:Str )-> MutableSequence[MutableMapping[Str,Union[Int,Str]]]:
-		
-		"""
-		Parser for video dash manifest.
-		
-		Parameters:
-			contents (Str):
-				The contents dash manifest string
-		
-		Returns:
-			MutableSequence[MutableMapping[Str,Union[Int,Str]]]:
-				MutableSequence of video versions
-		"""
-		
-		results = []
-		positionEnd = 0
-		positionStart = 0
-		terminatorBegin = "<Representation"
-		terminatorEnd = "</Representation>"
-		terminatorBaseUrlBegin = "<BaseURL>"
-		terminatorBaseUrlEnd = "</BaseURL>"
+	async def fetch( source:Str, pathname:Str, extend:Union[Int,Str] ) -> None:
+		filename = destination( source, pathname, thread=extend )
+		if filename is None:
+			return
+		if semaphore is not None:
+			await semaphore.acquire()
 		try:
-			while True:
-				positionStart = contents.index( terminatorBegin, positionEnd )
-				positionEnd = contents.index( terminatorEnd, positionStart )
-				positionPropertyStart = positionStart
-				positionPropertyStart+= len( terminatorBegin )
-				positionPropertyEnd = contents.index( ">", positionPropertyStart )
-				representPropertyRaw = contents[positionPropertyStart:positionPropertyEnd]
-				representContentRaw = contents[positionPropertyEnd+1:positionEnd]
-				positionBaseUrlContentStart = representContentRaw.index( terminatorBaseUrlBegin )
-				positionBaseUrlContentStart+= len( terminatorBaseUrlBegin )
-				positionBaseUrlContentEnd = representContentRaw.index( terminatorBaseUrlEnd, positionBaseUrlContentStart )
-				properties = {}
-				properties['url'] = saxutils.unescape( representContentRaw[positionBaseUrlContentStart:positionBaseUrlContentEnd] )
-				searchs = {
-					"id": str,
-					"width": int,
-					"height": int,
-					"codecs": str,
-					"mimeType": str
-				}
-				for item in searchs.items():
-					keyset = item[0]
-					pattern = Pattern( f"(?P<{keyset}>{keyset}\\=\"(?P<value>[^\"]*)\")", IGNORECASE|MULTILINE )
-					matches = pattern.search( representPropertyRaw )
-					if matches is not None:
-						value = saxutils.unescape( matches.group( "value" ) )
-						properties[keyset] = item[1]( value ) if callable( item[1] ) is True else value
-						del value
-					del pattern
-				results.append( properties )
-				del properties
-		except ValueError: ...
+			_logger.info( "Downloading media: {}", basename( filename ), thread=extend )
+			if not await asave( source, filename, segments=segments, threshold=threshold, rate=rate, thread=extend ):
+				_logger.warning( "Failed download media: {}", basename( filename ), thread=extend )
+				return
+			_logger.info( "Successfully download media: {}", basename( filename ), thread=extend )
+		except BaseException as e:
+			_logger.error( "{}: {}", typeof( e ), "\x0a".join( format_exception( e ) ), thread=extend )
 		finally:
-			...
-		return results
+			if semaphore is not None:
+				semaphore.release()
+	
+	try:
+		targets = sources( timeline, pathname, thread=thread )
+		tasks = []
+		for extend, target in enumerate( targets, 1 ):
+			if thread is not None:
+				if isinstance( thread, Int ) and thread >= 1:
+					extend = f"T<{thread},E<{extend}>>"
+				if isinstance( thread, Str ) and thread:
+					extend = f"D<{thread},E<{extend}>>"
+			tasks.append( fetch( *target, extend ) )
+		await gather( *tasks )
+		_logger.info( "Successfully download: {} media", len( targets ), thread=thread )
+	except BaseException as e:
+		_logger.error( "{}: {}", typeof( e ), "\x0a".join( format_exception( e ) ), thread=thread )
+	...
+
+def destination( source:Str, pathname:Str, thread:Union[Int,Str]=None ) -> Optional[Str]:
+	
+	"""
+	Resolve stored media filename
+	
+	Parameters:
+		source (Str):
+			Media source url
+		pathname (Str):
+			Pathname of stored media
+		thread (Int|Str):
+			Current thread position number
+	
+	Returns:
+		Optional[Str]:
+			Stored media filename, none when media already exists
+	"""
+	
+	if not isdir( pathname ):
+		_logger.info( "Create directory pathname: {}", pathname, thread=thread )
+		mkdir( pathname, exist_ok=True )
+	urlparsed = urlparser( source )
+	pfilename = urlparsed.path.split( "\x2f" )[-1].split( "\x2e" )
+	filenamen = md5( pfilename[0].encode() ).hexdigest()
+	filenamed = f"{pathname}/{filenamen}.{pfilename[-1]}"
+	if isfile( filenamed ):
+		_logger.info( "File exists media: {}.{}", filenamen, pfilename[-1], thread=thread )
+		return None
+	return filenamed
+
+def download( timeline:Union[MutableMapping[Str,Any],MutableSequence[Any]], pathname:Str, thread:Union[Int,Str]=None, segments:Int=1, threshold:Int=SegmentThreshold, rate:Optional[Int]=None ) -> None:
+	
+	"""
+	Media downloader
+	
+	Parameters:
+		timeline (Union[MutableMapping[Str,Any],MutableSequence[Any]]):
+			Timeline metadata info
+		pathname (Str):
+			Pathname of stored media
+		thread (Int|Str):
+			Current thread position number
+		segments (Int):
+			Number of concurrent byte range segments for large media
+		threshold (Int):
+			Minimum media size in bytes for segmented download
+		rate (Optional[Int]):
+			Per-file bandwidth cap in bytes per second
+	"""
 	
 	try:
-		sources = []
-		if isinstance( timeline, MutableMapping ):
-			sources = parser( timeline, pathname, thread=thread )
-		elif isinstance( timeline, MutableSequence ):
-			for media in timeline:
-				sources.extend( parser( media, f"{pathname}", thread=thread ) )
-		for extend, target in enumerate( sources, 1 ):
+		targets = sources( timeline, pathname, thread=thread )
+		for extend, target in enumerate( targets, 1 ):
 			if thread is not None:
 				if isinstance( thread, Int ) and thread >= 1:
 					extend = f"T<{thread},E<{extend}>>"
 				if isinstance( thread, Str ) and thread:
 					extend = f"D<{thread},E<{extend}>>"
-			source, pathname = target
-			if not isdir( pathname ):
-				_logger.info( "Create directory pathname: {}", pathname, thread=extend )
-				mkdir( pathname )
-			urlparsed = urlparser( source )
-			pfilename = urlparsed.path.split( "\x2f" )[-1].split( "\x2e" )
-			filenamen = md5( pfilename[0].encode() ).hexdigest()
-			filenamed = f"{pathname}/{filenamen}.{pfilename[-1]}"
-			if isfile( filenamed ):
-				_logger.info( "File exists media: {}.{}", filenamen, pfilename[-1], thread=extend )
-				continue
-			_logger.info( "Downloading media: {}.{}", filenamen, pfilename[-1], thread=extend )
-			response = request( "GET", source, stream=True )
-			if not response.status in [ 200, 201 ]:
-				_logger.warning( "Failed download media: {}.{}", filenamen, pfilename[-1], thread=extend )
-				continue
-			_logger.info( "Opening file media: {}.{}", filenamen, pfilename[-1], thread=extend )
-			with open( filenamed, "wb" ) as fopen:
-				_logger.info( "Writing content media: {}.{}", filenamen, pfilename[-1], thread=extend )
-				fopen.write( response.content )
-				fopen.close()
-			_logger.info( "Successfully download media: {}.{}", filenamen, pfilename[-1], thread=extend )
-		_logger.info( "Successfully download: {} media", len( sources ), thread=thread )
+			transfer( target, thread=extend, segments=segments, threshold=threshold, rate=rate )
+		_logger.info( "Successfully download: {} media", len( targets ), thread=thread )
 	except BaseException as e:
 		_logger.error( "{}: {}", typeof( e ), "\x0a".join( format_exception( e ) ), thread=thread )
 	...
 
+def expand( timelines:Iterable[Union[MutableMapping[Str,Any],MutableSequence[Any]]], pathname:Str ) -> Iterable[Tuple[_Source,_Pathname]]:
+	
+	"""
+	Parse stage of media pipeline, expand every timeline pulled
+	from the pagination into media targets lazily, so the download
+	pool receives individual files instead of whole timelines
+	
+	Parameters:
+		timelines (Iterable[Union[MutableMapping[Str,Any],MutableSequence[Any]]]):
+			Iterable of timeline metadata info
+		pathname (Str):
+			Pathname of stored media
+	
+	Returns:
+		Iterable[Tuple[_Source,_Pathname]]:
+			Iterable of tuple source media url and pathname stored media
+	"""
+	
+	for position, timeline in enumerate( timelines, 1 ):
+		try:
+			targets = sources( timeline, pathname, thread=f"S<{position}>" )
+		except BaseException as e:
+			_logger.error( "{}: {}", typeof( e ), "\x0a".join( format_exception( e ) ), thread=f"S<{position}>" )
+			continue
+		_logger.info( "Parsed timeline: {} media", len( targets ), thread=f"S<{position}>" )
+		yield from targets
+
+def parser( timeline:MutableMapping[Str,Any], pathname:Str, thread:Union[Int,Str] ) -> MutableSequence[Tuple[_Source,_Pathname]]:
+	
+	"""
+	Timeline media parser
+	
+	Parameters:
+		timeline (MutableMapping[Str,Any]):
+			Timeline metadata info
+		pathname (Str):
+			Pathname of stored media
+		thread (Int|Str):
+			Current thread position number
+	
+	Returns:
+		MutableSequence[Tuple[_Source,_Pathname]]:
+			MutableSequence of tuple source media url and pathname stored media
+	"""
+	
+	sources = []
+	typename = "unknown"
+	separator = "\x5f"
+	timelineId = timeline['id']
+	if separator in timelineId:
+		timelineId = timelineId.split( separator )[0]
+	if "type" in timeline and timeline['type']:
+		typename = timeline['type']
+	elif "__typename" in timeline and timeline['__typename']:
+		typename = timeline['__typename']
+	match typename:
+		case "GraphHighlightReel" | "GraphReel":
+			pathname+= f"/{timeline['owner']['username']}"
+			for item in timeline['items']:
+				match item['__typename']:
+					case "GraphStoryImage":
+						image = max( item['display_resources'], key=lambda resource: ( resource['config_width'], resource['config_height'] ) )
+						sources.append( tuple([ image['src'], f"{pathname}/{typename}/GraphStoryImage/{timelineId}" ]) )
+					case "GraphStoryVideo":
+						video = max( item['video_resources'], key=lambda resource: ( resource['config_width'], resource['config_height'] ) )
+						sources.append( tuple([ video['src'], f"{pathname}/{typename}/GraphStoryVideo/{timelineId}" ]) )
+						thumbnail = max( item['display_resources'], key=lambda resource: ( resource['config_width'], resource['config_height'] ) )
+						sources.append( tuple([ thumbnail['src'], f"{pathname}/{typename}/GraphStoryVideo/{timelineId}" ]) )
+					case _:
+						_logger.warning( "Unknown media {} typename: {}", typename, item['__typename'], thread=thread )
+		case "GraphSidecar":
+			match timeline['type']:
+				case "GraphImage":
+					sources.append( tuple([ timeline['image'], f"{pathname}/GraphSidecar/GraphImage/{timelineId}" ]) )
+				case "GraphVideo":
+					sources.append( tuple([ timeline['video'], f"{pathname}/GraphSidecar/GraphVideo/{timelineId}" ]) )
+					sources.append( tuple([ timeline['thumbnail'], f"{pathname}/GraphSidecar/GraphVideo/{timelineId}" ]) )
+				case _:
+					_logger.warning( "Unknown media GraphSidecar typename: {}", timeline['type'], thread=thread )
+		case "GraphImage":
+			sources.append( tuple([ timeline['image'], f"{pathname}/GraphImage/{timelineId}" ]) )
+		case "GraphVideo":
+			if "owner" in timeline:
+				if not pathname.endswith( timeline['owner']['username'] ):
+					pathname+= f"/{timeline['owner']['username']}"
+			if "video" in timeline and timeline['video']:
+				sources.append( tuple([ timeline['video'], f"{pathname}/GraphVideo/{timelineId}" ]) )
+				sources.append( tuple([ timeline['thumbnail'], f"{pathname}/GraphVideo/{timelineId}" ]) )
+			elif "video_url" in timeline and timeline['video_url']:
+				sources.append( tuple([ timeline['video_url'], f"{pathname}/GraphVideo/{timelineId}" ]) )
+				thumbnail = None
+				if "display_resources" in timeline and timeline['display_resources']:
+					thumbnail = max( timeline['display_resources'], key=lambda resource: ( resource['config_width'], resource['config_height'] ) )
+				elif "display_url" in timeline and timeline['display_url']:
+					thumbnail = { "src": timeline['display_url'] }
+				elif "thumbnail_resources" in timeline and timeline['thumbnail_resources']:
+					thumbnail = max( timeline['thumbnail_resources'], key=lambda resource: ( resource['config_width'], resource['config_height'] ) )
+				elif "thumbnail_src" in timeline and timeline['thumbnail_src']:
+					thumbnail = { "src": timeline['thumbnail_src'] }
+				if thumbnail is not None and thumbnail:
+					sources.append( tuple([ thumbnail['src'], f"{pathname}/GraphVideo/{timelineId}" ]) )
+		case "kanashi.client.Client.profile":
+			if not pathname.endswith( timeline['username'] ):
+				pathname+= f"/{timeline['username']}"
+			sources.append( tuple([ timeline['profile_pic_url_hd'], f"{pathname}/profile" ]) )
+		case "kanashi.graphql.actions.profile.PolarisProfilePageContentQuery":
+			if not pathname.endswith( timeline['username'] ):
+				pathname+= f"/{timeline['username']}"
+			sources.append( tuple([ timeline['hd_profile_pic_url_info']['url'], f"{pathname}/profile" ]) )
+		case "kanashi.client.Client.reels":
+			if not pathname.endswith( timeline['owner']['username'] ):
+				pathname+= f"/{timeline['owner']['username']}"
+			match timeline['media_type']:
+				case 1:
+					image = max( timeline['image_versions2']['candidates'], key=lambda resource: ( resource['width'], resource['height'] ) )
+					sources.append( tuple([ timeline['url'], f"{pathname}/GraphImage/{timelineId}" ]) )
+				case 2:
+					video = None
+					if "video_dash_manifest" in timeline and timeline['video_dash_manifest']:
+						videoDashManifests = videoDashManifest( timeline['video_dash_manifest'] )
+						video = max( videoDashManifests, key=lambda resource: ( resource['width'], resource['height'] if "height" in resource else 0 ) )
+					elif "video_versions" in timeline and timeline['video_versions']:
+						video = min( timeline['video_versions'], key=lambda resource: ( resource['type'] ) )
+					sources.append( tuple([ video['url'], f"{pathname}/GraphVideo/{timelineId}" ]) )
+					thumbnail = max( timeline['image_versions2']['candidates'], key=lambda resource: ( resource['width'], resource['height'] ) )
+					sources.append( tuple([ thumbnail['url'], f"{pathname}/GraphVideo/{timelineId}" ]) )
+				case _:
+					_logger.warning( "Unknown media {} typename: {}", typename, timeline['media_type'], thread=thread )
+		case "XDTGraphSidecar":
+			for edge in timeline['edge_sidecar_to_children']['edges']:
+				match edge['node']['__typename']:
+					case "XDTGraphImage":
+						media = max( edge['node']['display_resources'], key=lambda resource: ( resource['config_width'], resource['config_height'] ) )
+						sources.append( tuple([ media['src'], f"{pathname}/XDTGraphSidecar/XDTGraphImage/{timelineId}" ]) )
+					case "XDTGraphVideo":
+						sources.append( tuple([ edge['node']['video_url'], f"{pathname}/XDTGraphSidecar/XDTGraphVideo/{timelineId}" ]) )
+						thumbnail = max( edge['node']['display_resources'], key=lambda resource: ( resource['config_width'], resource['config_height'] ) )
+						sources.append( tuple([ thumbnail['src'], f"{pathname}/XDTGraphSidecar/XDTGraphVideo/{timelineId}" ]) )
+					case _:
+						_logger.warning( "Unknown media XDTGraphSidecar typename: {}", edge['node']['__typename'], thread=thread )
+				...
+			...
+		case "XDTGraphImage":
+			media = max( timeline['display_resources'], key=lambda resource: ( resource['config_width'], resource['config_height'] ) )
+			sources.append( tuple([ media['src'], f"{pathname}/XDTGraphImage/{timelineId}" ]) )
+		case "XDTGraphVideo":
+			sources.append( tuple([ timeline['video_url'], f"{pathname}/XDTGraphVideo/{timelineId}" ]) )
+			thumbnail = max( timeline['display_resources'], key=lambda resource: ( resource['config_width'], resource['config_height'] ) )
+			sources.append( tuple([ thumbnail['src'], f"{pathname}/XDTGraphVideo/{timelineId}" ]) )
+		case "XDTReelDict":
+			if not pathname.endswith( timeline['user']['username'] ):
+				pathname+= f"/{timeline['user']['username']}"
+			timelineId = timeline['id'].split( "\x3a" )[-1]
+			for item in timeline['items']:
+				match item['__typename']:
+					case "XDTMediaDict":
+						match item['media_type']:
+							case 1:
+								image = max( item['image_versions2']['candidates'], key=lambda resource: ( resource['width'], resource['height'] ) )
+								sources.append( tuple([ image['url'], f"{pathname}/XDTReelDict/XDTMediaDict/{timelineId}" ]) )
+							case 2:
+								video = None
+								if "video_dash_manifest" in item and item['video_dash_manifest']:
+									videoDashManifests = videoDashManifest( item['video_dash_manifest'] )
+									video = max( videoDashManifests, key=lambda resource: ( resource['width'], resource['height'] if "height" in resource else 0 ) )
+								elif "video_versions" in item and item['video_versions']:
+									video = min( item['video_versions'], key=lambda resource: ( resource['type'] ) )
+								sources.append( tuple([ video['url'], f"{pathname}/XDTReelDict/XDTMediaDict/{timelineId}" ]) )
+								thumbnail = max( item['image_versions2']['candidates'], key=lambda resource: ( resource['width'], resource['height'] ) )
+								sources.append( tuple([ thumbnail['url'], f"{pathname}/XDTReelDict/XDTMediaDict/{timelineId}" ]) )
+							case _:
+								_logger.warning( "Unknown media XDTReelDict[XDTMediaDict] type: {}", item['media_type'], thread=thread )
+					case _:
+						_logger.warning( "Unknown media XDTReelDict typename: {}", item['__typename'], thread=thread )
+		case "XDTMediaDict":
+			if not pathname.endswith( timeline['user']['username'] ):
+				pathname+= f"/{timeline['user']['username']}"
+			timelineId = timeline['pk']
+			match timeline['media_type']:
+				case 1:
+					image = max( timeline['image_versions2']['candidates'], key=lambda resource: ( resource['width'], resource['height'] ) )
+					sources.append( tuple([ image['url'], f"{pathname}/XDTMediaDict/{timeline['user']['pk']}" ]) )
+				case 2:
+					video = None
+					if "video_dash_manifest" in timeline and timeline['video_dash_manifest']:
+						videoDashManifests = videoDashManifest( timeline['video_dash_manifest'] )
+						video = max( videoDashManifests, key=lambda resource: ( resource['width'], resource['height'] if "height" in resource else 0 ) )
+					elif "video_versions" in timeline and timeline['video_versions']:
+						video = min( timeline['video_versions'], key=lambda resource: ( resource['type'] ) )
+					sources.append( tuple([ video['url'], f"{pathname}/XDTMediaDict/{timeline['user']['pk']}" ]) )
+					thumbnail = max( timeline['image_versions2']['candidates'], key=lambda resource: ( resource['width'], resource['height'] ) )
+					sources.append( tuple([ thumbnail['url'], f"{pathname}/XDTMediaDict/{timeline['user']['pk']}" ]) )
+				case _:
+					_logger.warning( "Unknown media XDTMediaDict type: {}", timeline['media_type'], thread=thread )
+		case _:
+			_logger.warning( "Unknown media typename: {}", typename, thread=thread )
+	return sources
+
+def sources( timeline:Union[MutableMapping[Str,Any],MutableSequence[Any]], pathname:Str, thread:Union[Int,Str]=None ) -> MutableSequence[Tuple[_Source,_Pathname]]:
+	
+	"""
+	Timeline media sources
+	
+	Parameters:
+		timeline (Union[MutableMapping[Str,Any],MutableSequence[Any]]):
+			Timeline metadata info
+		pathname (Str):
+			Pathname of stored media
+		thread (Int|Str):
+			Current thread position number
+	
+	Returns:
+		MutableSequence[Tuple[_Source,_Pathname]]:
+			MutableSequence of tuple source media url and pathname stored media
+	"""
+	
+	results = []
+	if isinstance( timeline, MutableMapping ):
+		results = parser( timeline, pathname, thread=thread )
+	elif isinstance( timeline, MutableSequence ):
+		for media in timeline:
+			results.extend( parser( media, f"{pathname}", thread=thread ) )
+	return results
+
+def tally( results:Iterable[Optional[Bool]] ) -> Tuple[Int,Int,Int]:
+	
+	"""
+	Count transfer results of media pipeline
+	
+	Parameters:
+		results (Iterable[Optional[Bool]]):
+			Iterable of transfer results
+	
+	Returns:
+		Tuple[Int,Int,Int]:
+			Tuple number of downloaded, skipped and failed media
+	"""
+	
+	downloaded = 0
+	failed = 0
+	skipped = 0
+	for result in results:
+		if result is True:
+			downloaded += 1
+		elif result is None:
+			skipped += 1
+		else:
+			failed += 1
+	return tuple([ downloaded, skipped, failed ])
+
+def transfer( target:Tuple[_Source,_Pathname], thread:Union[Int,Str]=None, segments:Int=1, threshold:Int=SegmentThreshold, rate:Optional[Int]=None ) -> Optional[Bool]:
+	
+	"""
+	Download stage of media pipeline, download single media target
+	
+	Parameters:
+		target (Tuple[_Source,_Pathname]):
+			Tuple source media url and pathname stored media
+		thread (Int|Str):
+			Current thread position number
+		segments (Int):
+			Number of concurrent byte range segments for large media
+		threshold (Int):
+			Minimum media size in bytes for segmented download
+		rate (Optional[Int]):
+			Per-file bandwidth cap in bytes per second
+	
+	Returns:
+		Optional[Bool]:
+			Whether media is stored, none when media already exists
+	"""
+	
+	source, pathname = target
+	try:
+		filename = destination( source, pathname, thread=thread )
+		if filename is None:
+			return None
+		_logger.info( "Downloading media: {}", basename( filename ), thread=thread )
+		if not save( source, filename, segments=segments, threshold=threshold, rate=rate, thread=thread ):
+			_logger.warning( "Failed download media: {}", basename( filename ), thread=thread )
+			return False
+		_logger.info( "Successfully download media: {}", basename( filename ), thread=thread )
+		return True
+	except BaseException as e:
+		_logger.error( "{}: {}", typeof( e ), "\x0a".join( format_exception( e ) ), thread=thread )
+	return False
+
+def videoDashManifest( contents:Str )-> MutableSequence[MutableMapping[Str,Union[Int,Str]]]:
+	
+	"""
+	Parser for video dash manifest.
+	
+	Parameters:
+		contents (Str):
+			The contents dash manifest string
+	
+	Returns:
+		MutableSequence[MutableMapping[Str,Union[Int,Str]]]:
+			MutableSequence of video versions
+	"""
+	
+	results = []
+	positionEnd = 0
+	positionStart = 0
+	terminatorBegin = "<Representation"
+	terminatorEnd = "</Representation>"
+	terminatorBaseUrlBegin = "<BaseURL>"
+	terminatorBaseUrlEnd = "</BaseURL>"
+	try:
+		while True:
+			positionStart = contents.index( terminatorBegin, positionEnd )
+			positionEnd = contents.index( terminatorEnd, positionStart )
+			positionPropertyStart = positionStart
+			positionPropertyStart+= len( terminatorBegin )
+			positionPropertyEnd = contents.index( ">", positionPropertyStart )
+			representPropertyRaw = contents[positionPropertyStart:positionPropertyEnd]
+			representContentRaw = contents[positionPropertyEnd+1:positionEnd]
+			positionBaseUrlContentStart = representContentRaw.index( terminatorBaseUrlBegin )
+			positionBaseUrlContentStart+= len( terminatorBaseUrlBegin )
+			positionBaseUrlContentEnd = representContentRaw.index( terminatorBaseUrlEnd, positionBaseUrlContentStart )
+			properties = {}
+			properties['url'] = saxutils.unescape( representContentRaw[positionBaseUrlContentStart:positionBaseUrlContentEnd] )
+			searchs = {
+				"id": str,
+				"width": int,
+				"height": int,
+				"codecs": str,
+				"mimeType": str
+			}
+			for item in searchs.items():
+				keyset = item[0]
+				pattern = Pattern( f"(?P<{keyset}>{keyset}\\=\"(?P<value>[^\"]*)\")", IGNORECASE|MULTILINE )
+				matches = pattern.search( representPropertyRaw )
+				if matches is not None:
+					value = saxutils.unescape( matches.group( "value" ) )
+					properties[keyset] = item[1]( value ) if callable( item[1] ) is True else value
+					del value
+				del pattern
+			results.append( properties )
+			del properties
+	except ValueError: ...
+	finally:
+		...
+	return results
+
 
 @final
 @group
@@ -365,31 +557,42 @@ class Media: """ Instagram media """
 
 
 @Media.command( help="Instagram profile posts media" )
+@Option( "--adaptive", help="Adapt the number of running workers to latency, errors and ratelimit, threads is the maximum", is_flag=True )
+@Option( "--bandwidth", help="Global download bandwidth budget in bytes per second", required=False, type=Int )
+@Option( "--bandwidth-file", "rate", help="Per-file download bandwidth cap in bytes per second", required=False, type=Int )
 @Option( "--delays", help="Sleep time for each number of workers working", default=0, type=Int )
 @Option( "--limit", help="Instagram profile posts item limit", required=False, type=Int )
 @Option( "--pathname", help="Output the directory name to store the media", default=_PathnameDefault, type=Path( exists=False, dir_okay=True, writable=True ) )
+@Option( "--segment-threshold", "threshold", help="Minimum media size in bytes for segmented download", default=SegmentThreshold, type=Int )
+@Option( "--segments", help="The number of concurrent byte range segments for large media", default=1, type=Int )
 @Option( "--sleepy", help="Time sleep per worker", default=0, type=Int )
 @Option( "--threads", help="The number of worker threads", default=10, type=Int )
-@Option( "--timeout", help="Timeout of thread pool executor", default=4, type=Int )
+@Option( "--timeout", help="Deadline per-media download in seconds, zero for unlimited since a timed out download keeps running unreported", default=0, type=Int )
 @Option( "--user", help="Instagram profile user id", required=True, type=Str )
 @Initial
-def posts( context:Context, delays:Int, limit:Int, pathname:Str, sleepy:Int, threads:Int, timeout:Int, user:Str ) -> None:
+def posts( context:Context, adaptive:Bool, bandwidth:Int, rate:Int, delays:Int, limit:Int, pathname:Str, segments:Int, threshold:Int, sleepy:Int, threads:Int, timeout:Int, user:Str ) -> None:
 	client:Client = context.obj['client']
 	if not user.isdigit():
 		puts( f"Invalid profile user id {user}", close=1 )
 	iterator = client.posts( user, terminator=lambda item, position: limit != None and position >= limit )
+	sessions().resize( threads * max( 1, segments ) )
+	budget( bandwidth )
 	executor = ThreadExecutor(
 		name="Instagram Profile Posts",
-		callback=download,
-		pathname=pathname,
-		dataset=iterator,
+		callback=transfer,
+		segments=segments,
+		threshold=threshold,
+		rate=rate,
+		dataset=expand( iterator, pathname ),
 		workers=threads,
+		adaptive=AdaptiveConcurrency( maximum=threads ) if adaptive is True else None,
 		timeout=timeout,
 		delays=delays,
 		sleepy=sleepy
 	)
-	for executed in executor:
-		del executed
+	downloaded, skipped, failed = tally( executor )
+	_logger.info( "Downloaded profile posts: {} media, skipped {} existing, failed {}", downloaded, skipped, failed )
+	_logger.info( "Session pool stats: {}", JsonEncoder( sessions().stats ) )
 	puts( f"Successfully download profile posts" )
 
 @Media.command( help="Instagram profile picture media" )
@@ -418,31 +621,42 @@ def profile( context:Context, pathname:Str, user:Str ) -> None:
 	puts( f"Successfully download profile picture {profile['username']}" )
 
 @Media.command( help="Instagram profile reels media" )
+@Option( "--adaptive", help="Adapt the number of running workers to latency, errors and ratelimit, threads is the maximum", is_flag=True )
+@Option( "--bandwidth", help="Global download bandwidth budget in bytes per second", required=False, type=Int )
+@Option( "--bandwidth-file", "rate", help="Per-file download bandwidth cap in bytes per second", required=False, type=Int )
 @Option( "--delays", help="Sleep time for each number of workers working", default=0, type=Int )
 @Option( "--limit", help="Instagram profile reels item limit", required=False, type=Int )
 @Option( "--pathname", help="Output the directory name to store the media", default=_PathnameDefault, type=Path( exists=False, dir_okay=True, writable=True ) )
+@Option( "--segment-threshold", "threshold", help="Minimum media size in bytes for segmented download", default=SegmentThreshold, type=Int )
+@Option( "--segments", help="The number of concurrent byte range segments for large media", default=1, type=Int )
 @Option( "--sleepy", help="Time sleep per worker", default=0, type=Int )
 @Option( "--threads", help="The number of worker threads", default=10, type=Int )
-@Option( "--timeout", help="Timeout of thread pool executor", default=4, type=Int )
+@Option( "--timeout", help="Deadline per-media download in seconds, zero for unlimited since a timed out download keeps running unreported", default=0, type=Int )
 @Option( "--user", help="Instagram profile user id", required=True, type=Str )
 @Initial
-def reels( context:Context, delays:Int, limit:Int, pathname:Str, sleepy:Int, threads:Int, timeout:Int, user:Str ) -> None:
+def reels( context:Context, adaptive:Bool, bandwidth:Int, rate:Int, delays:Int, limit:Int, pathname:Str, segments:Int, threshold:Int, sleepy:Int, threads:Int, timeout:Int, user:Str ) -> None:
 	client:Client = context.obj['client']
 	if not user.isdigit():
 		puts( f"Invalid profile user id {user}", close=1 )
 	iterator = client.reels( user, terminator=lambda item, position: limit != None and position >= limit )
+	sessions().resize( threads * max( 1, segments ) )
+	budget( bandwidth )
 	executor = ThreadExecutor(
 		name="Instagram Profile Reels",
-		callback=download,
-		pathname=pathname,
-		dataset=iterator,
+		callback=transfer,
+		segments=segments,
+		threshold=threshold,
+		rate=rate,
+		dataset=expand( iterator, pathname ),
 		workers=threads,
+		adaptive=AdaptiveConcurrency( maximum=threads ) if adaptive is True else None,
 		timeout=timeout,
 		delays=delays,
 		sleepy=sleepy
 	)
-	for executed in executor:
-		del executed
+	downloaded, skipped, failed = tally( executor )
+	_logger.info( "Downloaded profile reels: {} media, skipped {} existing, failed {}", downloaded, skipped, failed )
+	_logger.info( "Session pool stats: {}", JsonEncoder( sessions().stats ) )
 	puts( f"Successfully download profile reels" )
 
 @Media.command( help="Instagram shortcode media" )
@@ -23,19 +23,22 @@
 
 from builtins import bool as Bool, int as Int, str as Str
 from datetime import datetime
+from functools import lru_cache
 from inspect import getframeinfo, stack
 from json import loads as JsonDecoder, JSONDecodeError
 from pytz import timezone
 from random import choice
-from re import MULTILINE, S
-from re import compile, match, split, sub as substr
-from sys import exit
+from os import environ
+from re import MULTILINE, Pattern, S
+from re import compile, sub as substr
+from sys import exit, stdout
 from time import sleep
 from typing import ( 
 	Any, 
 	Iterable, 
 	MutableMapping, 
 	MutableSequence, 
+	Optional, 
 	Union
 )
 
@@ -43,6 +46,7 @@ from kanashi.constant import BasePath, BaseVenv
 
 
 __all__ = [
+	"colorable",
 	"colorize",
 	"cserializer",
 	"delays",
@@ -53,97 +57,101 @@ __all__ = [
 ]
 
 
-def colorize( string:Str, base:Str=None ) -> Str:
-	
-	"""
-	Automatic colorize the given stringa
-	
-	Parameters:
-		string (Str):
-		base (Str):
-			The string base color ansi code
+_Colorable:Optional[Bool] = None
+""" Whether output is colorized, resolved on first use """
+
+_Colorizes:MutableMapping[Str,MutableMapping[Str,Any]] = {
+	"number": {
+		"pattern": r"(?P<number>\b(?:\d+)\b)",
+		"colorize": "\x1b[1;38;5;61m{}{}"
+	},
+	"define": {
+		"handler": lambda matched: substr( r"(\.|\-){1,}", lambda m: "\x1b[1;38;5;69m{}\x1b[1;38;5;111m".format( m.group() ), matched.group( 0 ) ),
+		"pattern": r"(?P<define>(?:@|\$)[a-zA-Z0-9_\-\.]+)",
+		"colorize": "\x1b[1;38;5;111m{}{}"
+	},
+	"symbol": {
+		"pattern": r"(?P<symbol>\\|\:|\*|-|\+|/|&|%|=|\;|,|\.|\?|\!|\||<|>|\~){1,}",
+		"colorize": "\x1b[1;38;5;69m{}{}"
+	},
+	"bracket": {
+		"pattern": r"(?P<bracket>\{|\}|\[|\]|\(|\)){1,}",
+		"colorize": "\x1b[1;38;5;214m{}{}"
+	},
+	"boolean": {
+		"pattern": r"(?P<boolean>\b(?:False|True|None)\b)",
+		"colorize": "\x1b[1;38;5;199m{}{}"
+	},
+	"typedef": {
+		"pattern": r"(?P<typedef>\b(?:ABCMeta|AbstractSet|Annotated|Any|AnyStr|ArithmeticError|AssertionError|AsyncContextManager|AsyncGenerator|AsyncIterable|AsyncIterator|AttributeError|Awaitable|BaseException|BinaryIO|BlockingIOError|BrokenPipeError|BufferError|ByteString|BytesWarning|Callable|ChainMap|ChildProcessError|ClassVar|Collection|Concatenate|ConnectionAbortedError|ConnectionError|ConnectionRefusedError|ConnectionResetError|Container|ContextManager|Coroutine|Counter|DefaultDict|DeprecationWarning|Deque|Dict|EOFError|Ellipsis|EncodingWarning|EnvironmentError|Exception|False|FileExistsError|FileNotFoundError|Final|FloatingPointError|ForwardRef|FrozenSet|FutureWarning|Generator|GeneratorExit|Generic|GenericAlias|Hashable|IO|IOError|ImportError|ImportWarning|IndentationError|IndexError|InterruptedError|IsADirectoryError|ItemsView|Iterable|Iterator|KT|Key|KeyError|KeyboardInterrupt|KeysView|List|Literal|LookupError|Mapping|MappingView|Match|MemoryError|MethodDescriptorType|MethodWrapperType|ModuleNotFoundError|MutableMapping|MutableSequence|MutableSet|NameError|NamedTuple|NamedTupleMeta|NewType|NoReturn|None|NotADirectoryError|NotImplemented|NotImplementedError|OSError|Optional|OrderedDict|OverflowError|ParamSpec|ParamSpecArgs|ParamSpecKwargs|Pattern|PendingDeprecationWarning|PermissionError|ProcessLookupError|Protocol|RecursionError|ReferenceError|ResourceWarning|Reversible|RuntimeError|RuntimeWarning|Sequence|Set|Sized|StopAsyncIteration|StopIteration|SupportsAbs|SupportsBytes|SupportsComplex|SupportsFloat|SupportsIndex|SupportsInt|SupportsRound|SyntaxError|SyntaxWarning|SystemError|SystemExit|T|TabError|Text|TextIO|TimeoutError|True|Tuple|Type|TypeAlias|TypeError|TypeGuard|TypeVar|TypedDict|UnboundLocalError|UnicodeDecodeError|UnicodeEncodeError|UnicodeError|UnicodeTranslateError|UnicodeWarning|Union|UserWarning|Val|alueError|ValuesView|Warning|WrapperDescriptorType|ZeroDivisionError|abs|abstractmethod|aiter|all|anext|any|ascii|bin|bool|breakpoint|bytearray|bytes|callable|cast|chr|classmethod|collections|compile|complex|contextlib|copyright|credits|delattr|dict|dir|divmod|enumerate|eval|exec|exit|filter|final|float|format|frozenset|functools|getattr|globals|hasattr|hash|help|hex|id|input|int|io|isinstance|issubclass|iter|len|license|list|locals|map|max|memoryview|min|next|object|oct|open|operator|ord|overload|pow|print|property|quit|range|re|repr|reversed|round|set|setattr|slice|sorted|staticmethod|str|sum|super|sys|tuple|type|types|vars|zip)\b)",
+		"colorize": "\x1b[1;38;5;213m{}{}"
+	},
+	"linked": {
+		"handler": lambda matched: substr( r"(\\|\:|\*|-|\+|/|&|%|=|\;|,|\.|\?|\!|\||<|>|\~){1,}", lambda m: "\x1b[1;38;5;69m{}\x1b[1;38;5;43m".format( m.group() ), matched.group( 0 ) ),
+		"pattern": r"(?P<linked>\bhttps?://[^\s]+)",
+		"colorize": "\x1b[1;38;5;43m\x1b[4m{}{}"
+	},
+	"version": {
+		"handler": lambda matched: substr( r"([\d\.]+)", lambda m: "\x1b[1;38;5;190m{}\x1b[1;38;5;112m".format( m.group() ), matched.group( 0 ) ),
+		"pattern": r"(?P<version>\b[vV][\d\.]+\b)",
+		"colorize": "\x1b[1;38;5;112m{}{}"
+	},
+	"author": {
+		"pattern": r"(?P<author>\b(?:hx[aA]ri)\b)",
+		"colorize": "\x1b[1;38;5;111m{}{}"
+	},
+	"comment": {
+		"pattern": r"(?P<comment>\#[^\n]*)",
+		"colorize": "\x1b[1;38;5;250m{}{}"
+	},
+	"string": {
+		"handler": lambda matched: substr( r"(?<!\\)(\\\"|\\\'|\\`|\\r|\\t|\\n|\\s)", lambda m: "\x1b[1;38;5;208m{}\x1b[1;38;5;220m".format( m.group() ), matched.group( 0 ) ),
+		"pattern": r"(?P<string>(?<!\\)(\".*?(?<!\\)\"|\'.*?(?<!\\)\'|`.*?(?<!\\)`))",
+		"colorize": "\x1b[1;38;5;220m{}{}"
+	}
+}
+""" Colorize token patterns """
+
+_ColorizeEscape:Pattern = compile( r"^(?:\x1b|\033)\[([^m]+)m$" )
+""" Whole ANSI escape sequence """
+
+_ColorizeEscapes:Pattern = compile( r"((?:\x1b|\033)\[[0-9\;]+m)" )
+""" ANSI escape sequences splitter """
+
+_ColorizePattern:Pattern = compile( "(?:{})".format( "|".join( regexp['pattern'] for regexp in _Colorizes.values() ) ), MULTILINE|S )
+""" Colorize token patterns combined """
+
+_ColorizeRescape:Pattern = compile( r"(?:\x1b|\033)\[([^m]+)m" )
+""" Leading ANSI escape sequence """
+
+
+@lru_cache( maxsize=2048 )
+def _colorize( string:Str, base:Str ) -> Str:
 	
-	Returns:
-		result (Str):
-			Colorized string
-	"""
+	""" Colorize string, memoized for repeated strings """
 	
 	result = ""
-	strings = [ x for x in split( r"((?:\x1b|\033)\[[0-9\;]+m)", string ) if x != "" ]
-	regexps = {
-		"number": {
-			"pattern": r"(?P<number>\b(?:\d+)\b)",
-			"colorize": "\x1b[1;38;5;61m{}{}"
-		},
-		"define": {
-			"handler": lambda matched: substr( r"(\.|\-){1,}", lambda m: "\x1b[1;38;5;69m{}\x1b[1;38;5;111m".format( m.group() ), matched.group( 0 ) ),
-			"pattern": r"(?P<define>(?:@|\$)[a-zA-Z0-9_\-\.]+)",
-			"colorize": "\x1b[1;38;5;111m{}{}"
-		},
-		"symbol": {
-			"pattern": r"(?P<symbol>\\|\:|\*|-|\+|/|&|%|=|\;|,|\.|\?|\!|\||<|>|\~){1,}",
-			"colorize": "\x1b[1;38;5;69m{}{}"
-		},
-		"bracket": {
-			"pattern": r"(?P<bracket>\{|\}|\[|\]|\(|\)){1,}",
-			"colorize": "\x1b[1;38;5;214m{}{}"
-		},
-		"boolean": {
-			"pattern": r"(?P<boolean>\b(?:False|True|None)\b)",
-			"colorize": "\x1b[1;38;5;199m{}{}"
-		},
-		"typedef": {
-			"pattern": r"(?P<typedef>\b(?:ABCMeta|AbstractSet|Annotated|Any|AnyStr|ArithmeticError|AssertionError|AsyncContextManager|AsyncGenerator|AsyncIterable|AsyncIterator|AttributeError|Awaitable|BaseException|BinaryIO|BlockingIOError|BrokenPipeError|BufferError|ByteString|BytesWarning|Callable|ChainMap|ChildProcessError|ClassVar|Collection|Concatenate|ConnectionAbortedError|ConnectionError|ConnectionRefusedError|ConnectionResetError|Container|ContextManager|Coroutine|Counter|DefaultDict|DeprecationWarning|Deque|Dict|EOFError|Ellipsis|EncodingWarning|EnvironmentError|Exception|False|FileExistsError|FileNotFoundError|Final|FloatingPointError|ForwardRef|FrozenSet|FutureWarning|Generator|GeneratorExit|Generic|GenericAlias|Hashable|IO|IOError|ImportError|ImportWarning|IndentationError|IndexError|InterruptedError|IsADirectoryError|ItemsView|Iterable|Iterator|KT|Key|KeyError|KeyboardInterrupt|KeysView|List|Literal|LookupError|Mapping|MappingView|Match|MemoryError|MethodDescriptorType|MethodWrapperType|ModuleNotFoundError|MutableMapping|MutableSequence|MutableSet|NameError|NamedTuple|NamedTupleMeta|NewType|NoReturn|None|NotADirectoryError|NotImplemented|NotImplementedError|OSError|Optional|OrderedDict|OverflowError|ParamSpec|ParamSpecArgs|ParamSpecKwargs|Pattern|PendingDeprecationWarning|PermissionError|ProcessLookupError|Protocol|RecursionError|ReferenceError|ResourceWarning|Reversible|RuntimeError|RuntimeWarning|Sequence|Set|Sized|StopAsyncIteration|StopIteration|SupportsAbs|SupportsBytes|SupportsComplex|SupportsFloat|SupportsIndex|SupportsInt|SupportsRound|SyntaxError|SyntaxWarning|SystemError|SystemExit|T|TabError|Text|TextIO|TimeoutError|True|Tuple|Type|TypeAlias|TypeError|TypeGuard|TypeVar|TypedDict|UnboundLocalError|UnicodeDecodeError|UnicodeEncodeError|UnicodeError|UnicodeTranslateError|UnicodeWarning|Union|UserWarning|Val|alueError|ValuesView|Warning|WrapperDescriptorType|ZeroDivisionError|abs|abstractmethod|aiter|all|anext|any|ascii|bin|bool|breakpoint|bytearray|bytes|callable|cast|chr|classmethod|collections|compile|complex|contextlib|copyright|credits|delattr|dict|dir|divmod|enumerate|eval|exec|exit|filter|final|float|format|frozenset|functools|getattr|globals|hasattr|hash|help|hex|id|input|int|io|isinstance|issubclass|iter|len|license|list|locals|map|max|memoryview|min|next|object|oct|open|operator|ord|overload|pow|print|property|quit|range|re|repr|reversed|round|set|setattr|slice|sorted|staticmethod|str|sum|super|sys|tuple|type|types|vars|zip)\b)",
-			"colorize": "\x1b[1;38;5;213m{}{}"
-		},
-		"linked": {
-			"handler": lambda matched: substr( r"(\\|\:|\*|-|\+|/|&|%|=|\;|,|\.|\?|\!|\||<|>|\~){1,}", lambda m: "\x1b[1;38;5;69m{}\x1b[1;38;5;43m".format( m.group() ), matched.group( 0 ) ),
-			"pattern": r"(?P<linked>\bhttps?://[^\s]+)",
-			"colorize": "\x1b[1;38;5;43m\x1b[4m{}{}"
-		},
-		"version": {
-			"handler": lambda matched: substr( r"([\d\.]+)", lambda m: "\x1b[1;38;5;190m{}\x1b[1;38;5;112m".format( m.group() ), matched.group( 0 ) ),
-			"pattern": r"(?P<version>\b[vV][\d\.]+\b)",
-			"colorize": "\x1b[1;38;5;112m{}{}"
-		},
-		"author": {
-			"pattern": r"(?P<author>\b(?:hx[aA]ri)\b)",
-			"colorize": "\x1b[1;38;5;111m{}{}"
-		},
-		"comment": {
-			"pattern": r"(?P<comment>\#[^\n]*)",
-			"colorize": "\x1b[1;38;5;250m{}{}"
-		},
-		"string": {
-			"handler": lambda matched: substr( r"(?<!\\)(\\\"|\\\'|\\`|\\r|\\t|\\n|\\s)", lambda m: "\x1b[1;38;5;208m{}\x1b[1;38;5;220m".format( m.group() ), matched.group( 0 ) ),
-			"pattern": r"(?P<string>(?<!\\)(\".*?(?<!\\)\"|\'.*?(?<!\\)\'|`.*?(?<!\\)`))",
-			"colorize": "\x1b[1;38;5;220m{}{}"
-		}
-	}
-	if not isinstance( base, Str ):
-		base = "\x1b[0m"
+	strings = [ x for x in _ColorizeEscapes.split( string ) if x != "" ]
 	try:
 		last = base
 		escape = None
-		pattern = "(?:{})".format( "|".join( regexp['pattern'] for regexp in regexps.values() ) )
-		compiles = compile( pattern, MULTILINE|S )
 		skipable = []
 		for idx, string in enumerate( strings ):
 			if idx in skipable:
 				continue
-			color = match( r"^(?:\x1b|\033)\[([^m]+)m$", string )
+			color = _ColorizeEscape.match( string )
 			if color is not None:
 				index = idx +1
 				escape = color.group( 0 )
 				last = escape
 				try:
-					rescape = match( r"(?:\x1b|\033)\[([^m]+)m", strings[index] )
+					rescape = _ColorizeRescape.match( strings[index] )
 					while rescape is not None:
 						skipable.append( index )
 						escape += rescape.group( 0 )
 						last = rescape.group( 0 )
 						index += 1
-						rescape = match( r"(?:\x1b|\033)\[([^m]+)m", strings[index] )
+						rescape = _ColorizeRescape.match( strings[index] )
 				except IndexError:
 					break
 				if index +1 in skipable:
@@ -154,32 +162,24 @@ def colorize( string:Str, base:Str=None ) -> Str:
 				index = idx
 			string = strings[index]
 			search = 0
-			matched = compiles.search( string, search )
+			matched = _ColorizePattern.search( string, search )
 			while matched is not None:
-				if matched.groupdict():
-					group = None
-					groups = matched.groupdict().keys()
-					for group in groups:
-						if group in regexps and \
-							isinstance( regexps[group], MutableMapping ) and \
-							isinstance( matched.group( group ), str ):
-							colorize = regexps[group]['colorize']
-							break
+				if matched.lastgroup is not None:
+					regexp = _Colorizes[matched.lastgroup]
+					colorize = regexp['colorize']
 					chars = matched.group( 0 )
-					if "rematch" in regexps[group] and isinstance( regexps[group]['rematch'], MutableMapping ):
-						pass
-					if "handler" in regexps[group] and callable( regexps[group]['handler'] ):
+					if "handler" in regexp and callable( regexp['handler'] ):
 						result += escape
 						result += string[search:matched.end() - len( chars )]
-						result += colorize.format( regexps[group]['handler']( matched ), escape )
+						result += colorize.format( regexp['handler']( matched ), escape )
 						search = matched.end()
-						matched = compiles.search( string, search )
+						matched = _ColorizePattern.search( string, search )
 						continue
 					result += escape
 					result += string[search:matched.end() - len( chars )]
 					result += colorize.format( chars, escape )
 					search = matched.end()
-					matched = compiles.search( string, search )
+					matched = _ColorizePattern.search( string, search )
 				else:
 					matched = None
 			result += escape
@@ -188,6 +188,50 @@ def colorize( string:Str, base:Str=None ) -> Str:
 		raise e
 	return result
 
+def colorable( enabled:Optional[Bool]=None ) -> Bool:
+	
+	"""
+	Return whether output is colorized
+	
+	Output is not colorized when stdout is not a TTY or the
+	NO_COLOR environment variable is set, unless enabled.
+	
+	Parameters:
+		enabled (Optional[Bool]):
+			Force enable or disable colorize
+	
+	Returns:
+		Bool:
+	"""
+	
+	global _Colorable
+	if enabled is not None:
+		_Colorable = enabled
+	elif _Colorable is None:
+		_Colorable = "NO_COLOR" not in environ and hasattr( stdout, "isatty" ) and stdout.isatty()
+	return _Colorable
+
+def colorize( string:Str, base:Str=None ) -> Str:
+	
+	"""
+	Automatic colorize the given stringa
+	
+	Parameters:
+		string (Str):
+		base (Str):
+			The string base color ansi code
+	
+	Returns:
+		result (Str):
+			Colorized string
+	"""
+	
+	if colorable() is False:
+		return string
+	if not isinstance( base, Str ):
+		base = "\x1b[0m"
+	return _colorize( string, base )
+
 def cserializer( cookies:MutableMapping[Str,Str] ) -> Str:
 	
 	"""
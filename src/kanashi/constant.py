@@ -23,8 +23,8 @@
 
 from builtins import str as Str
 from os import getenv
-from sys import path as paths
-from typing import MutableSequence
+from os.path import abspath, dirname
+from sys import prefix
 
 
 __all__ = (
@@ -35,12 +35,10 @@ __all__ = (
 )
 
 
-BaseParts:MutableSequence[Str] = paths[0].split( "\x2f" )
-BasePath:Str = "\x2f".join( BaseParts[:BaseParts.index( "src" )] )
+BasePath:Str = dirname( dirname( dirname( abspath( __file__ ) ) ) )
 """ The Base Path of Application """
 
-BaseParts:MutableSequence[Str] = paths[4].split( "\x2f" )
-BaseVenv:Str = "\x2f".join( BaseParts[:BaseParts.index( "lib" )] )
+BaseVenv:Str = prefix
 """ The Base Path of Virtual Environment """
 
 HomePath:Str = getenv( "HOME" )
@@ -48,5 +46,3 @@ HomePath:Str = getenv( "HOME" )
 
 SelfPath:Str = "\x34\x62\x36\x31\x36\x65\x36\x31\x37\x33\x36\x38\x36\x39"
 """ The Self Path Application """
-
-del BaseParts
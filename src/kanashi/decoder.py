@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+
+#
+# @author hxAri (hxari)
+# @create 23-12-2024 17:30
+# @github https://github.com/hxAri/Kanashi
+#
+# Kanashi is an Open-Source project for doing various
+# things related to Instagram, e.g Login. Logout, Profile Info,
+# Follow, Unfollow, Media downloader, etc.
+#
+# Kanashi Copyright (c) 2024 - hxAri <hxari@proton.me>
+# Kanashi Licence under GNU General Public Licence v3
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+from brotli import Decompressor as BrotliDecompressor, error as BrotliError
+from builtins import bool as Bool, bytes as Bytes, int as Int, str as Str
+from pyzstd import EndlessZstdDecompressor as ZstdDecompressor, ZstdError
+from typing import Any, AsyncIterable, final, Iterable, MutableSequence, Optional
+from zlib import decompressobj as ZlibDecompressor, error as ZlibError, MAX_WBITS
+
+from kanashi.errors import DecoderTruncatedError, DecoderUnsupportedError
+
+
+__all__ = [
+	"adecode",
+	"decode",
+	"Decoder",
+	"DecoderError"
+]
+
+
+DecoderError = ( BrotliError, DecoderTruncatedError, ZlibError, ZstdError )
+""" Decoder Exceptions """
+
+
+@final
+class Decoder:
+	
+	"""
+	Incremental Content-Encoding Decoder
+	
+	Chunks are decompressed as soon as they are given, the compressed
+	body is never held in memory at once.
+	
+	>>> decoder = Decoder( "gzip" )
+	>>> for chunk in chunks:
+	>>>     decoder.decompress( chunk )
+	>>> decoder.flush()
+	"""
+	
+	__chains:MutableSequence[Any]
+	""" Decompressor chains, ordered from outermost encoding """
+	
+	__received:Bool
+	""" Whether any encoded chunk is given """
+	
+	__supported:Bool
+	""" Whether all encodings are supported """
+	
+	def __init__( self, encoding:Optional[Str] ) -> None:
+		
+		"""
+		Construct method of class Decoder
+		
+		Parameters:
+			encoding (Optional[Str]):
+				Response Content-Encoding header value
+		"""
+		
+		self.__chains = []
+		self.__received = False
+		self.__supported = True
+		encodings = [ value.strip( "\x20" ).lower() for value in ( encoding or "" ).split( "\x2c" ) ]
+		for value in reversed( encodings ):
+			match value:
+				case "" | "identity":
+					continue
+				case "br":
+					self.__chains.append( _Brotli() )
+				case "deflate":
+					self.__chains.append( _Deflate() )
+				case "gzip" | "x-gzip":
+					self.__chains.append( ZlibDecompressor( 16 + MAX_WBITS ) )
+				case "zstd":
+					self.__chains.append( ZstdDecompressor() )
+				case _:
+					self.__supported = False
+	
+	def decompress( self, chunk:Bytes ) -> Bytes:
+		
+		"""
+		Decompress the given chunk
+		
+		Parameters:
+			chunk (Bytes):
+				Compressed chunk
+		
+		Returns:
+			Bytes:
+				Decompressed bytes, may be empty
+		"""
+		
+		self.__received = self.__received or Bool( chunk )
+		for decompressor in self.__chains:
+			if not chunk:
+				break
+			chunk = decompressor.decompress( chunk )
+		return chunk
+	
+	def flush( self ) -> Bytes:
+		
+		"""
+		Flush remaining decompressed bytes
+		
+		Raises:
+			DecoderTruncatedError:
+				Raises when the content ends before the end of stream
+		"""
+		
+		result = b""
+		for position, decompressor in enumerate( self.__chains ):
+			chunk = result
+			if position >= 1 and chunk:
+				chunk = decompressor.decompress( chunk )
+			if hasattr( decompressor, "flush" ):
+				chunk += decompressor.flush()
+			if self.__received is True and not ( decompressor.at_frame_edge if isinstance( decompressor, ZstdDecompressor ) else decompressor.eof ):
+				raise DecoderTruncatedError( "Encoded content is truncated before the end of stream" )
+			result = chunk
+		return result
+	
+	@property
+	def identity( self ) -> Bool:
+		
+		""" Whether the content is not encoded """
+		
+		return not self.__chains
+	
+	@property
+	def supported( self ) -> Bool:
+		
+		""" Whether all encodings are supported """
+		
+		return self.__supported
+	
+	...
+
+
+class _Brotli:
+	
+	""" Brotli Decompressor Wrapper """
+	
+	def __init__( self ) -> None:
+		self.decompressor = BrotliDecompressor()
+	
+	def decompress( self, chunk:Bytes ) -> Bytes:
+		return self.decompressor.process( chunk )
+	
+	@property
+	def eof( self ) -> Bool:
+		return self.decompressor.is_finished()
+	
+	...
+
+
+class _Deflate:
+	
+	""" Deflate Decompressor Wrapper, fallback to raw deflate """
+	
+	def __init__( self ) -> None:
+		self.decompressor = ZlibDecompressor()
+		self.started = False
+	
+	def decompress( self, chunk:Bytes ) -> Bytes:
+		if self.started is False:
+			self.started = True
+			try:
+				return self.decompressor.decompress( chunk )
+			except ZlibError:
+				self.decompressor = ZlibDecompressor( -MAX_WBITS )
+		return self.decompressor.decompress( chunk )
+	
+	@property
+	def eof( self ) -> Bool:
+		return self.decompressor.eof
+	
+	def flush( self ) -> Bytes:
+		return self.decompressor.flush()
+	
+	...
+
+
+async def adecode( content:Any, encoding:Optional[Str], size:Int=1 << 16 ) -> AsyncIterable[Bytes]:
+	
+	"""
+	Iterate decoded body chunks from aiohttp stream reader
+	
+	The session must be created with auto_decompress disabled,
+	so unsupported encodings cannot be decoded by aiohttp.
+	
+	Parameters:
+		content (Any):
+			Aiohttp response stream reader
+		encoding (Optional[Str]):
+			Response Content-Encoding header value
+		size (Int):
+			Maximum read size in bytes
+	
+	Returns:
+		chunks (AsyncIterable[Bytes]):
+			Async iterable of decoded body chunks
+	
+	Raises:
+		DecoderError:
+			Raises when the body is not decompressable
+		DecoderUnsupportedError:
+			Raises when the content encoding is not supported
+	"""
+	
+	decoder = Decoder( encoding )
+	if decoder.supported is False:
+		raise DecoderUnsupportedError( f"Unsupported content encoding {encoding}" )
+	async for chunk in content.iter_chunked( size ):
+		chunk = decoder.decompress( chunk )
+		if chunk:
+			yield chunk
+	chunk = decoder.flush()
+	if chunk:
+		yield chunk
+
+def decode( raw:Any, encoding:Optional[Str], size:Int=1 << 16 ) -> Iterable[Bytes]:
+	
+	"""
+	Iterate decoded body chunks from raw urllib3 response
+	
+	The body is read undecoded from the network and decompressed
+	exactly once here, unsupported encodings fallback to urllib3.
+	
+	Parameters:
+		raw (Any):
+			Raw urllib3 response
+		encoding (Optional[Str]):
+			Response Content-Encoding header value
+		size (Int):
+			Maximum read size in bytes
+	
+	Returns:
+		chunks (Iterable[Bytes]):
+			Iterable of decoded body chunks
+	
+	Raises:
+		DecoderError:
+			Raises when the body is not decompressable
+	"""
+	
+	decoder = Decoder( encoding )
+	if decoder.supported is False:
+		for chunk in raw.stream( size, decode_content=True ):
+			if chunk:
+				yield chunk
+		return
+	for chunk in raw.stream( size, decode_content=False ):
+		chunk = decoder.decompress( chunk )
+		if chunk:
+			yield chunk
+	chunk = decoder.flush()
+	if chunk:
+		yield chunk
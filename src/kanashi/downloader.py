@@ -0,0 +1,639 @@
+#!/usr/bin/env python3
+
+#
+# @author hxAri (hxari)
+# @create 23-12-2024 17:30
+# @github https://github.com/hxAri/Kanashi
+#
+# Kanashi is an Open-Source project for doing various
+# things related to Instagram, e.g Login. Logout, Profile Info,
+# Follow, Unfollow, Media downloader, etc.
+#
+# Kanashi Copyright (c) 2024 - hxAri <hxari@proton.me>
+# Kanashi Licence under GNU General Public Licence v3
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+from asyncio import gather, sleep as asleep
+from builtins import bool as Bool, float as Float, int as Int, str as Str
+from concurrent.futures import ThreadPoolExecutor
+from os import link, register_at_fork, remove, replace
+from os.path import getsize, isfile
+from shutil import copyfile
+from time import sleep
+from traceback import format_exception
+from typing import Any, MutableMapping, MutableSequence, Optional, Tuple, Union
+
+from kanashi.common import typeof
+from kanashi.decoder import Decoder
+from kanashi.flight import SingleFlight
+from kanashi.limiter import TokenBucket
+from kanashi.logger import Logger
+from kanashi.request import request
+from kanashi.typing import Response
+
+
+__all__ = [
+	"asave",
+	"budget",
+	"BufferSize",
+	"PartialSuffix",
+	"save",
+	"SegmentSuffix",
+	"SegmentThreshold"
+]
+
+
+_Budget:Optional[TokenBucket] = None
+""" Process Bandwidth Budget in bytes per second, unlimited by default """
+
+_Flights:SingleFlight = SingleFlight()
+""" In-flight Download Coalescing """
+
+_logger = Logger( __name__ )
+""" Logger Instance """
+
+BufferSize:Int = 1 << 16
+""" Download chunk buffer size in bytes """
+
+PartialSuffix:Str = ".part"
+""" Partial download filename suffix """
+
+SegmentSuffix:Str = ".segments"
+""" Preallocated segmented download filename suffix, appended to partial filename """
+
+SegmentThreshold:Int = 16 << 20
+""" Minimum media size in bytes for segmented download """
+
+
+def _commit( partial:Str, filename:Str, expected:Optional[Int], thread:Union[Int,Str] ) -> Bool:
+	
+	"""
+	Move validated partial file into place
+	
+	Parameters:
+		partial (Str):
+			Partial filename
+		filename (Str):
+			Media stored filename
+		expected (Optional[Int]):
+			Expected total size in bytes, none when unknown
+		thread (Int|Str):
+			Current thread position number
+	
+	Returns:
+		Bool:
+			Return true whether partial file is complete
+	"""
+	
+	written = getsize( partial )
+	if expected is not None and written != expected:
+		_logger.warning( "Incomplete media: {} written={} expected={}", filename, written, expected, thread=thread )
+		return False
+	replace( partial, filename )
+	_logger.info( "Written {} bytes media: {}", written, filename, thread=thread )
+	return True
+
+def _forked() -> None:
+	
+	"""
+	Rebuild bandwidth budget and coalescing in forked child
+	
+	Every child owns its own budget bucket, so the budget applies
+	per-process rather than divided between the children.
+	"""
+	
+	global _Budget, _Flights
+	_Flights = SingleFlight()
+	if _Budget is not None:
+		_Budget = TokenBucket( _Budget.rate, _Budget.capacity )
+
+def _prepare( filename:Str, segments:Int=1 ) -> Tuple[Str,Int,MutableMapping[Str,Str]]:
+	
+	"""
+	Prepare partial filename, resume offset and request headers
+	
+	The partial file holds decoded bytes, so ranged requests ask
+	for identity encoding to keep the offset in the same unit.
+	
+	Parameters:
+		filename (Str):
+			Media stored filename
+		segments (Int):
+			Number of segments, range is always requested when
+			greater than one so the total size is known up front
+	
+	Returns:
+		Tuple[Str,Int,MutableMapping[Str,Str]]:
+			Partial filename, resume offset and request headers
+	"""
+	
+	partial = f"{filename}{PartialSuffix}"
+	offset = getsize( partial ) if isfile( partial ) else 0
+	headers = {}
+	if offset >= 1 or segments >= 2:
+		headers['Accept-Encoding'] = "identity"
+		headers['Range'] = f"bytes={offset}-"
+	return tuple([ partial, offset, headers ])
+
+def _resume( response:Response, partial:Str, offset:Int, thread:Union[Int,Str] ) -> Optional[Tuple[Str,Optional[Int]]]:
+	
+	"""
+	Resolve how the response body is written into partial file
+	
+	Parameters:
+		response (Response):
+			Streamed request response
+		partial (Str):
+			Partial filename
+		offset (Int):
+			Requested resume offset
+		thread (Int|Str):
+			Current thread position number
+	
+	Returns:
+		Optional[Tuple[Str,Optional[Int]]]:
+			File open mode and expected total size, none when
+			the response is not writable into partial file
+	"""
+	
+	total = None
+	contentRange = response.headers.get( "Content-Range" )
+	if contentRange is not None and "\x2f" in contentRange:
+		total = contentRange.split( "\x2f" ).pop().strip( "\x20" )
+		total = Int( total ) if total.isdigit() else None
+	match response.status:
+		case 200 | 201:
+			if offset >= 1:
+				_logger.info( "Server ignored range, restarting media: {}", partial, thread=thread )
+			contentLength = response.headers.get( "Content-Length" )
+			expected = None
+			if response.encoding is None and contentLength is not None and contentLength.isdigit():
+				expected = Int( contentLength )
+			return tuple([ "wb", expected ])
+		case 206:
+			units = contentRange.split( "\x20" ).pop().split( "\x2d" ) if contentRange else [ "" ]
+			if not units[0].isdigit() or Int( units[0] ) != offset:
+				_logger.warning( "Mismatch content range {} offset={} media: {}", contentRange, offset, partial, thread=thread )
+				remove( partial )
+				return None
+			if offset >= 1 and not Decoder( response.encoding ).identity:
+				_logger.warning( "Encoded content range {} encoding={} media: {}", contentRange, response.encoding, partial, thread=thread )
+				remove( partial )
+				return None
+			if offset >= 1:
+				_logger.info( "Resuming media from {} bytes: {}", offset, partial, thread=thread )
+			return tuple([ "ab", total ])
+		case 416:
+			if total is not None and total == offset:
+				return tuple([ "ab", total ])
+			if isfile( partial ):
+				remove( partial )
+	return None
+
+def _ranges( total:Int, segments:Int ) -> MutableSequence[Tuple[Int,Int]]:
+	
+	"""
+	Split total size into inclusive byte ranges
+	
+	Parameters:
+		total (Int):
+			Total size in bytes
+		segments (Int):
+			Number of segments
+	
+	Returns:
+		MutableSequence[Tuple[Int,Int]]:
+			MutableSequence of start and end byte position
+	"""
+	
+	length = -( -total // segments )
+	return list( tuple([ start, min( start + length, total ) -1 ]) for start in range( 0, total, length ) )
+
+async def _asegment( source:Str, partial:Str, start:Int, end:Int, size:Int, cap:Optional[TokenBucket], thread:Union[Int,Str] ) -> Bool:
+	
+	"""
+	Download byte range into partial file asynchronously
+	
+	Parameters:
+		source (Str):
+			Media source url
+		partial (Str):
+			Preallocated segmented filename
+		start (Int):
+			Start byte position
+		end (Int):
+			End byte position, inclusive
+		size (Int):
+			Chunk buffer size in bytes
+		cap (Optional[TokenBucket]):
+			Per-file bandwidth bucket shared by all segments
+		thread (Int|Str):
+			Current thread position number
+	
+	Returns:
+		Bool:
+			Return true whether all bytes of range is written
+	"""
+	
+	from kanashi.arequest import arequest
+	response = await arequest( "GET", source, headers={ "Accept-Encoding": "identity", "Range": f"bytes={start}-{end}" }, stream=True, thread=thread )
+	if response.status != 206 or not Decoder( response.encoding ).identity:
+		response.close()
+		return False
+	written = 0
+	with open( partial, "r+b" ) as fopen:
+		fopen.seek( start )
+		async for chunk in response.aiterate( size ):
+			written += fopen.write( chunk )
+			delay = _throttle( len( chunk ), cap )
+			if delay > 0:
+				await asleep( delay )
+		fopen.close()
+	return written == end - start +1
+
+def _salvage( segmented:Str, partial:Str, ranges:MutableSequence[Tuple[Int,Int]], results:MutableSequence[Any], thread:Union[Int,Str] ) -> None:
+	
+	"""
+	Keep completed leading segments of failed segmented download
+	
+	The contiguous completed segments from the beginning become
+	the partial file, so the next attempt resumes it in a single
+	stream instead of downloading the whole media again.
+	
+	Parameters:
+		segmented (Str):
+			Preallocated segmented filename
+		partial (Str):
+			Partial filename
+		ranges (MutableSequence[Tuple[Int,Int]]):
+			Segment byte ranges in order
+		results (MutableSequence[Any]):
+			Segment results in the same order, true when completed
+		thread (Int|Str):
+			Current thread position number
+	"""
+	
+	offset = 0
+	for ( start, end ), result in zip( ranges, results ):
+		if result is not True:
+			break
+		offset = end +1
+	if offset == 0:
+		remove( segmented )
+		return
+	with open( segmented, "r+b" ) as fopen:
+		fopen.truncate( offset )
+		fopen.close()
+	replace( segmented, partial )
+	_logger.info( "Keeping {} bytes of completed segments for resume: {}", offset, partial, thread=thread )
+
+def _segment( source:Str, partial:Str, start:Int, end:Int, size:Int, cap:Optional[TokenBucket], thread:Union[Int,Str] ) -> Bool:
+	
+	"""
+	Download byte range into partial file
+	
+	Parameters:
+		source (Str):
+			Media source url
+		partial (Str):
+			Preallocated segmented filename
+		start (Int):
+			Start byte position
+		end (Int):
+			End byte position, inclusive
+		size (Int):
+			Chunk buffer size in bytes
+		cap (Optional[TokenBucket]):
+			Per-file bandwidth bucket shared by all segments
+		thread (Int|Str):
+			Current thread position number
+	
+	Returns:
+		Bool:
+			Return true whether all bytes of range is written
+	"""
+	
+	response = request( "GET", source, headers={ "Accept-Encoding": "identity", "Range": f"bytes={start}-{end}" }, stream=True, thread=thread )
+	if response.status != 206 or not Decoder( response.encoding ).identity:
+		response.close()
+		return False
+	written = 0
+	with open( partial, "r+b" ) as fopen:
+		fopen.seek( start )
+		for chunk in response.iterate( size ):
+			written += fopen.write( chunk )
+			delay = _throttle( len( chunk ), cap )
+			if delay > 0:
+				sleep( delay )
+		fopen.close()
+	return written == end - start +1
+
+def _segmentable( response:Response, expected:Optional[Int], segments:Int, threshold:Int ) -> Bool:
+	
+	"""
+	Return whether response should be downloaded in segments
+	
+	Parameters:
+		response (Response):
+			Streamed request response of first range request
+		expected (Optional[Int]):
+			Expected total size in bytes
+		segments (Int):
+			Number of segments
+		threshold (Int):
+			Minimum media size in bytes
+	
+	Returns:
+		Bool:
+	"""
+	
+	return segments >= 2 \
+		and response.status == 206 \
+		and response.encoding is None \
+		and expected is not None \
+		and expected >= threshold
+
+def _share( stored:Str, filename:Str, thread:Union[Int,Str] ) -> Bool:
+	
+	"""
+	Place media stored by another in-flight download
+	
+	Parameters:
+		stored (Str):
+			Filename stored by the download leader
+		filename (Str):
+			Media stored filename
+		thread (Int|Str):
+			Current thread position number
+	
+	Returns:
+		Bool:
+			Return true whether media is stored
+	"""
+	
+	if stored == filename or isfile( filename ):
+		return True
+	_logger.info( "Sharing in-flight media: {} -> {}", stored, filename, thread=thread )
+	partial = f"{filename}{PartialSuffix}"
+	try:
+		link( stored, partial )
+	except OSError:
+		copyfile( stored, partial )
+	replace( partial, filename )
+	return True
+
+def _throttle( received:Int, cap:Optional[TokenBucket] ) -> Float:
+	
+	"""
+	Charge received bytes against bandwidth budget and per-file cap
+	
+	Every chunk reserves its bytes in arrival order, so concurrent
+	downloads are served round-robin and share the budget fairly.
+	
+	Parameters:
+		received (Int):
+			Received chunk size in bytes
+		cap (Optional[TokenBucket]):
+			Per-file bandwidth bucket
+	
+	Returns:
+		Float:
+			Seconds to wait before reading next chunk
+	"""
+	
+	delay = _Budget.reserve( received ) if _Budget is not None else 0
+	if cap is not None:
+		delay = max( delay, cap.reserve( received ) )
+	return delay
+
+async def _astore( source:Str, filename:Str, size:Int=BufferSize, segments:Int=1, threshold:Int=SegmentThreshold, rate:Optional[Int]=None, thread:Union[Int,Str]=0 ) -> Optional[Str]:
+	
+	"""
+	Stream media source into file asynchronously
+	
+	Parameters:
+		source (Str):
+			Media source url
+		filename (Str):
+			Media stored filename
+		size (Int):
+			Chunk buffer size in bytes
+		segments (Int):
+			Number of concurrent byte range segments for large media
+		threshold (Int):
+			Minimum media size in bytes for segmented download
+		rate (Optional[Int]):
+			Per-file bandwidth cap in bytes per second
+		thread (Int|Str):
+			Current thread position number
+	
+	Returns:
+		Optional[Str]:
+			Stored media filename, none when failed
+	"""
+	
+	cap = TokenBucket( rate ) if rate is not None and rate >= 1 else None
+	partial, offset, headers = _prepare( filename, segments )
+	from kanashi.arequest import arequest
+	response = await arequest( "GET", source, headers=headers, stream=True, thread=thread )
+	resume = _resume( response, partial, offset, thread )
+	if resume is None:
+		response.close()
+		return None
+	mode, expected = resume
+	if offset == 0 and _segmentable( response, expected, segments, threshold ):
+		response.close()
+		_logger.info( "Downloading {} bytes in {} segments media: {}", expected, segments, filename, thread=thread )
+		ranges = _ranges( expected, segments )
+		segmented = f"{partial}{SegmentSuffix}"
+		with open( segmented, "wb" ) as fopen:
+			fopen.truncate( expected )
+			fopen.close()
+		results = await gather( *( _asegment( source, segmented, start, end, size, cap, f"{thread}:S{index}" ) for index, ( start, end ) in enumerate( ranges, 1 ) ), return_exceptions=True )
+		if not all( result is True for result in results ):
+			_logger.warning( "Failed segmented download media: {}", filename, thread=thread )
+			_salvage( segmented, partial, ranges, results, thread )
+			return None
+		replace( segmented, partial )
+		return filename if _commit( partial, filename, expected, thread ) else None
+	_logger.info( "Writing content media: {}", filename, thread=thread )
+	with open( partial, mode ) as fopen:
+		if response.status != 416:
+			async for chunk in response.aiterate( size ):
+				fopen.write( chunk )
+				delay = _throttle( len( chunk ), cap )
+				if delay > 0:
+					await asleep( delay )
+		fopen.close()
+	response.close()
+	return filename if _commit( partial, filename, expected, thread ) else None
+
+def _store( source:Str, filename:Str, size:Int=BufferSize, segments:Int=1, threshold:Int=SegmentThreshold, rate:Optional[Int]=None, thread:Union[Int,Str]=0 ) -> Optional[Str]:
+	
+	"""
+	Stream media source into file
+	
+	The response body is never buffered, every chunk is written
+	as soon as it arrives, so memory usage per worker is bounded
+	by the given buffer size. The body is written into partial
+	file first, resumed with Range request when the partial file
+	exists and moved into place after validated.
+	
+	Parameters:
+		source (Str):
+			Media source url
+		filename (Str):
+			Media stored filename
+		size (Int):
+			Chunk buffer size in bytes
+		segments (Int):
+			Number of concurrent byte range segments for large media
+		threshold (Int):
+			Minimum media size in bytes for segmented download
+		rate (Optional[Int]):
+			Per-file bandwidth cap in bytes per second
+		thread (Int|Str):
+			Current thread position number
+	
+	Returns:
+		Optional[Str]:
+			Stored media filename, none when failed
+	"""
+	
+	cap = TokenBucket( rate ) if rate is not None and rate >= 1 else None
+	partial, offset, headers = _prepare( filename, segments )
+	response = request( "GET", source, headers=headers, stream=True, thread=thread )
+	resume = _resume( response, partial, offset, thread )
+	if resume is None:
+		response.close()
+		return None
+	mode, expected = resume
+	if offset == 0 and _segmentable( response, expected, segments, threshold ):
+		response.close()
+		_logger.info( "Downloading {} bytes in {} segments media: {}", expected, segments, filename, thread=thread )
+		ranges = _ranges( expected, segments )
+		segmented = f"{partial}{SegmentSuffix}"
+		with open( segmented, "wb" ) as fopen:
+			fopen.truncate( expected )
+			fopen.close()
+		with ThreadPoolExecutor( segments, f"{thread}:S" ) as executor:
+			futures = [ executor.submit( _segment, source, segmented, start, end, size, cap, f"{thread}:S{index}" ) for index, ( start, end ) in enumerate( ranges, 1 ) ]
+			results = []
+			for future in futures:
+				try:
+					results.append( future.result() )
+				except BaseException as e:
+					_logger.error( "{}: {}", typeof( e ), "\x0a".join( format_exception( e ) ), thread=thread )
+					results.append( False )
+		if not all( result is True for result in results ):
+			_logger.warning( "Failed segmented download media: {}", filename, thread=thread )
+			_salvage( segmented, partial, ranges, results, thread )
+			return None
+		replace( segmented, partial )
+		return filename if _commit( partial, filename, expected, thread ) else None
+	_logger.info( "Writing content media: {}", filename, thread=thread )
+	with open( partial, mode ) as fopen:
+		if response.status != 416:
+			for chunk in response.iterate( size ):
+				fopen.write( chunk )
+				delay = _throttle( len( chunk ), cap )
+				if delay > 0:
+					sleep( delay )
+		fopen.close()
+	response.close()
+	return filename if _commit( partial, filename, expected, thread ) else None
+
+async def asave( source:Str, filename:Str, size:Int=BufferSize, segments:Int=1, threshold:Int=SegmentThreshold, rate:Optional[Int]=None, thread:Union[Int,Str]=0 ) -> Bool:
+	
+	"""
+	Stream media source into file asynchronously, concurrent
+	downloads of the same source share one fetch, the aiohttp
+	engine is imported on first use so the blocking path does
+	not depend on it
+	
+	Parameters:
+		source (Str):
+			Media source url
+		filename (Str):
+			Media stored filename
+		size (Int):
+			Chunk buffer size in bytes
+		segments (Int):
+			Number of concurrent byte range segments for large media
+		threshold (Int):
+			Minimum media size in bytes for segmented download
+		rate (Optional[Int]):
+			Per-file bandwidth cap in bytes per second
+		thread (Int|Str):
+			Current thread position number
+	
+	Returns:
+		Bool:
+			Return true whether media is stored
+	"""
+	
+	stored, shared = await _Flights.ado( source, _astore, source, filename, size, segments, threshold, rate, thread )
+	if shared is False or stored is None:
+		return stored is not None
+	return _share( stored, filename, thread )
+
+def budget( rate:Optional[Int], capacity:Optional[Int]=None ) -> None:
+	
+	"""
+	Configure process bandwidth budget shared by all downloads
+	
+	Parameters:
+		rate (Optional[Int]):
+			Bytes per second, none for unlimited
+		capacity (Optional[Int]):
+			Burst capacity in bytes, default is equal with rate
+	"""
+	
+	global _Budget
+	_Budget = TokenBucket( rate, capacity ) if rate is not None and rate >= 1 else None
+	if _Budget is not None:
+		_logger.info( "Bandwidth budget rate={} capacity={}", _Budget.rate, _Budget.capacity )
+
+def save( source:Str, filename:Str, size:Int=BufferSize, segments:Int=1, threshold:Int=SegmentThreshold, rate:Optional[Int]=None, thread:Union[Int,Str]=0 ) -> Bool:
+	
+	"""
+	Stream media source into file, concurrent downloads
+	of the same source share one fetch
+	
+	Parameters:
+		source (Str):
+			Media source url
+		filename (Str):
+			Media stored filename
+		size (Int):
+			Chunk buffer size in bytes
+		segments (Int):
+			Number of concurrent byte range segments for large media
+		threshold (Int):
+			Minimum media size in bytes for segmented download
+		rate (Optional[Int]):
+			Per-file bandwidth cap in bytes per second
+		thread (Int|Str):
+			Current thread position number
+	
+	Returns:
+		Bool:
+			Return true whether media is stored
+	"""
+	
+	stored, shared = _Flights.do( source, _store, source, filename, size, segments, threshold, rate, thread )
+	if shared is False or stored is None:
+		return stored is not None
+	return _share( stored, filename, thread )
+
+
+register_at_fork( after_in_child=_forked )
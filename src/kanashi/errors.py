@@ -42,12 +42,16 @@ __all__ = [
 	"ClientUsermailError",
 	"ClientUsermailVerifyError",
 	"ClientUsernameError",
+	"DecoderTruncatedError",
+	"DecoderUnsupportedError",
 	"EncryptionError",
 	"GraphqlContentError",
 	"GraphqlError",
 	"GraphqlParserError",
 	"KanashiError",
+	"ProxyUnavailableError",
 	"RateLimitError",
+	"TransportError",
 	"UnsupportedEncryptionVersion",
 	"UserNotFoundError"
 ]
@@ -117,6 +121,10 @@ class ClientUsermailVerifyError( ClientError ): """ Raises when failed send veri
 
 class ClientUsernameError( ClientError ): """ Raises when username is exists or invalid """
 
+class DecoderTruncatedError( KanashiError ): """ Raises when encoded content ends before the end of stream """
+
+class DecoderUnsupportedError( KanashiError ): """ Raises when content encoding is not decodable """
+
 class EncryptionError( ClientError ): """ Raises when encryption error """
 
 class GraphqlError( ClientError ): """ Raises when error serverity exists in response content """
@@ -125,8 +133,12 @@ class GraphqlContentError( ClientError ): """ Raises when response content is no
 
 class GraphqlParserError( ClientError ): """ Raises when parser action failed parser response content """
 
+class ProxyUnavailableError( KanashiError ): """ Raises when every proxy of the pool is evicted """
+
 class RateLimitError( ClientError ): """ Raises when rate limit detected """
 
+class TransportError( KanashiError ): """ Raises when replay transport has no recorded interaction """
+
 class UnsupportedEncryptionVersion( KanashiError ): """ Raises when encryption version is invalid """
 
 class UserNotFoundError( ClientError ): """ Raised when user not found """
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+
+#
+# @author hxAri (hxari)
+# @create 23-12-2024 17:30
+# @github https://github.com/hxAri/Kanashi
+#
+# Kanashi is an Open-Source project for doing various
+# things related to Instagram, e.g Login. Logout, Profile Info,
+# Follow, Unfollow, Media downloader, etc.
+#
+# Kanashi Copyright (c) 2024 - hxAri <hxari@proton.me>
+# Kanashi Licence under GNU General Public Licence v3
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+from asyncio import Future as AsyncFuture, get_running_loop
+from builtins import bool as Bool, int as Int, str as Str
+from threading import Event, Lock
+from typing import ( 
+	Any, 
+	Awaitable, 
+	Callable, 
+	final, 
+	Hashable, 
+	Mapping, 
+	MutableMapping, 
+	Optional, 
+	Tuple, 
+	TypeVar as Var
+)
+
+
+__all__ = [
+	"frozen",
+	"SingleFlight"
+]
+
+
+T = Var( "T" )
+""" Return Type """
+
+
+@final
+class _Call:
+	
+	""" In-flight Call """
+	
+	__slots__ = (
+		"error",
+		"event",
+		"result",
+		"waiters"
+	)
+	
+	error:Optional[BaseException]
+	""" Leader raised exception """
+	
+	event:Event
+	""" Completion event """
+	
+	result:Any
+	""" Leader return value """
+	
+	waiters:Int
+	""" Number of followers """
+	
+	def __init__( self ) -> None:
+		self.error = None
+		self.event = Event()
+		self.result = None
+		self.waiters = 0
+	
+	...
+
+
+@final
+class SingleFlight:
+	
+	"""
+	In-flight Call Coalescing
+	
+	Concurrent calls with the same key share one execution, the
+	first caller executes the callback and the others wait for
+	its result (or its exception). The key is forgotten as soon
+	as the call finished, results are never cached.
+	
+	>>> flight = SingleFlight()
+	>>> result, shared = flight.do( url, request, "GET", url )
+	"""
+	
+	__acalls:MutableMapping[Hashable,AsyncFuture]
+	""" In-flight coroutine calls """
+	
+	__calls:MutableMapping[Hashable,_Call]
+	""" In-flight thread calls """
+	
+	__lock:Lock
+	""" Calls lock """
+	
+	def __init__( self ) -> None:
+		
+		""" Construct method of class SingleFlight """
+		
+		self.__acalls = {}
+		self.__calls = {}
+		self.__lock = Lock()
+	
+	async def ado( self, keyset:Hashable, callback:Callable[...,Awaitable[T]], *args:Any, **kwargs:Any ) -> Tuple[T,Bool]:
+		
+		"""
+		Execute coroutine callback once per in-flight key
+		
+		Parameters:
+			keyset (Hashable):
+				Call key
+			callback (Callable[...,Awaitable[T]]):
+				Coroutine function
+			args (*Any):
+				Callback arguments
+			kwargs (**Any):
+				Callback key arguments
+		
+		Returns:
+			Tuple[T,Bool]:
+				Callback result and whether the result is shared
+		"""
+		
+		future = self.__acalls.get( keyset )
+		if future is not None:
+			return tuple([ await future, True ])
+		future = get_running_loop().create_future()
+		self.__acalls[keyset] = future
+		try:
+			result = await callback( *args, **kwargs )
+			future.set_result( result )
+			return tuple([ result, False ])
+		except BaseException as e:
+			future.set_exception( e )
+			future.exception()
+			raise e
+		finally:
+			del self.__acalls[keyset]
+	
+	def do( self, keyset:Hashable, callback:Callable[...,T], *args:Any, **kwargs:Any ) -> Tuple[T,Bool]:
+		
+		"""
+		Execute callback once per in-flight key
+		
+		Parameters:
+			keyset (Hashable):
+				Call key
+			callback (Callable[...,T]):
+				Callback handler
+			args (*Any):
+				Callback arguments
+			kwargs (**Any):
+				Callback key arguments
+		
+		Returns:
+			Tuple[T,Bool]:
+				Callback result and whether the result is shared
+		"""
+		
+		leader = False
+		with self.__lock:
+			call = self.__calls.get( keyset )
+			if call is not None:
+				call.waiters += 1
+			else:
+				call = _Call()
+				self.__calls[keyset] = call
+				leader = True
+		if leader is False:
+			call.event.wait()
+			if call.error is not None:
+				raise call.error
+			return tuple([ call.result, True ])
+		try:
+			call.result = callback( *args, **kwargs )
+			return tuple([ call.result, False ])
+		except BaseException as e:
+			call.error = e
+			raise e
+		finally:
+			with self.__lock:
+				del self.__calls[keyset]
+			call.event.set()
+	
+	@property
+	def inflight( self ) -> Int:
+		
+		""" Number of in-flight calls """
+		
+		return len( self.__calls ) + len( self.__acalls )
+	
+	...
+
+
+def frozen( mapping:Optional[Mapping[Str,Any]] ) -> Optional[Tuple[Tuple[Str,Str],...]]:
+	
+	"""
+	Return hashable sorted items of mapping, for building call key
+	
+	Parameters:
+		mapping (Optional[Mapping[Str,Any]]):
+			Mapping e.g request headers, cookies or parameters
+	
+	Returns:
+		Optional[Tuple[Tuple[Str,Str],...]]:
+	"""
+	
+	if mapping is None:
+		return None
+	return tuple( sorted( ( str( keyset ), str( value ) ) for keyset, value in mapping.items() ) )
@@ -21,30 +21,46 @@
 # along with this program. If not, see <https://www.gnu.org/licenses/>.
 #
 
-from builtins import int as Int, str as Str
+from builtins import bool as Bool, float as Float, int as Int, str as Str
+from collections import deque
 from concurrent.futures import (
 	CancelledError as ThreadCancelledError, 
+	Executor, 
+	FIRST_COMPLETED, 
 	Future, 
+	ProcessPoolExecutor, 
 	ThreadPoolExecutor, 
-	TimeoutError as ThreadTimeoutError
+	TimeoutError as ThreadTimeoutError, 
+	wait
 )
-from multiprocessing import parent_process as ProcessParent
-from os import getpid
-from time import sleep
+from multiprocessing import get_context as ProcessContext, parent_process as ProcessParent
+from multiprocessing.queues import SimpleQueue
+from os import cpu_count, getpid
+from threading import Event, Lock, Thread
+from time import monotonic, sleep
 from traceback import format_exception
 from typing import ( 
 	Any, 
 	Callable, 
+	Deque, 
+	final, 
 	Iterable, 
-	MutableSequence, 
+	MutableMapping, 
 	Optional, 
-	TypeVar as Var
+	Set, 
+	Tuple, 
+	TypeVar as Var, 
+	Union
 )
 
-from kanashi.common import puts, typeof
+from kanashi.common import colorable, puts, typeof
+from kanashi.logger import Logger
+from kanashi.metrics import metrics
 
 
 __all__ = [
+	"AdaptiveConcurrency",
+	"ProcessExecutor",
 	"ThreadExecutor"
 ]
 
@@ -61,12 +77,575 @@ Kwargs = Var( "Kwargs" )
 T = Var( "T" )
 """ Return Type """
 
+_logger = Logger( __name__ )
+""" Logger Instance """
 
-def ThreadExecutor( name:Str, callback:Callable[[D,Args,Kwargs,Int],T], dataset:Iterable[D], delays:Int=10, sleepy:Int=1, timeout:Int=4, workers:Int=2, *args:Any, **kwargs:Any ) -> Iterable[T]:
+_Started:Optional[SimpleQueue] = None
+""" Started time queue of process pool child """
+
+
+@final
+class AdaptiveConcurrency:
+	
+	"""
+	AIMD Concurrency Controller
+	
+	The limit grows by one every interval while the workers are
+	saturated and healthy, and is cut multiplicatively when request
+	metrics report 429 responses, the error rate is too high or the
+	mean latency inflates beyond tolerance of the best observed.
+	
+	>>> controller = AdaptiveConcurrency( maximum=32, initial=4 )
+	>>> executor = ThreadExecutor( ..., workers=32, adaptive=controller )
+	"""
+	
+	__backoff:Float
+	""" Multiplicative decrease factor """
+	
+	__baseline:Optional[Float]
+	""" Best observed mean latency in seconds """
+	
+	__errors:Float
+	""" Maximum tolerated error rate """
+	
+	__failed:Int
+	""" Failed tasks in current interval """
+	
+	__interval:Float
+	""" Seconds between adjustments """
+	
+	__limit:Int
+	""" Current concurrency limit """
+	
+	__lock:Lock
+	""" Controller lock """
+	
+	__maximum:Int
+	""" Maximum concurrency """
+	
+	__minimum:Int
+	""" Minimum concurrency """
+	
+	__previous:Tuple[Int,Int,Int,Float]
+	""" Requests, ratelimited, errors and latency sum of last adjustment """
+	
+	__saturated:Bool
+	""" Whether in-flight reached the limit in current interval """
+	
+	__succeed:Int
+	""" Succeed tasks in current interval """
+	
+	__tolerance:Float
+	""" Tolerated latency inflation factor """
+	
+	__updated:Float
+	""" Monotonic time of last adjustment """
+	
+	def __init__( self, maximum:Int, minimum:Int=1, initial:Optional[Int]=None, interval:Float=5, backoff:Float=0.5, tolerance:Float=2, errors:Float=0.1 ) -> None:
+		
+		"""
+		Construct method of class AdaptiveConcurrency
+		
+		Parameters:
+			maximum (Int):
+				Maximum concurrency
+			minimum (Int):
+				Minimum concurrency
+			initial (Optional[Int]):
+				Initial concurrency, default is half of maximum
+			interval (Float):
+				Seconds between adjustments
+			backoff (Float):
+				Multiplicative decrease factor
+			tolerance (Float):
+				Tolerated latency inflation factor
+			errors (Float):
+				Maximum tolerated error rate
+		"""
+		
+		self.__backoff = backoff
+		self.__baseline = None
+		self.__errors = errors
+		self.__failed = 0
+		self.__interval = interval
+		self.__maximum = max( 1, maximum )
+		self.__minimum = max( 1, min( minimum, self.__maximum ) )
+		self.__limit = max( self.__minimum, min( self.__maximum, initial if initial is not None else self.__maximum // 2 ) )
+		self.__lock = Lock()
+		self.__previous = self.__sample()
+		self.__saturated = False
+		self.__succeed = 0
+		self.__tolerance = tolerance
+		self.__updated = monotonic()
+	
+	def __sample( self ) -> Tuple[Int,Int,Int,Float]:
+		requests = ratelimited = errors = 0
+		latency = 0
+		for entry in metrics().snapshot( raw=True ).values():
+			requests += entry['requests']
+			ratelimited += entry['statuses'].get( 429, 0 )
+			errors += sum( entry['errors'].values() ) + sum( count for status, count in entry['statuses'].items() if status >= 500 )
+			latency += entry['latency'].total
+		return tuple([ requests, ratelimited, errors, latency ])
+	
+	@property
+	def limit( self ) -> Int: return self.__limit
+	
+	def observe( self, error:Optional[BaseException], inflight:Int ) -> None:
+		
+		"""
+		Observe completed task
+		
+		Parameters:
+			error (Optional[BaseException]):
+				Raised task exception
+			inflight (Int):
+				Number of in-flight tasks before completion
+		"""
+		
+		with self.__lock:
+			if error is None:
+				self.__succeed += 1
+			else:
+				self.__failed += 1
+			if inflight >= self.__limit:
+				self.__saturated = True
+	
+	def update( self ) -> Int:
+		
+		"""
+		Adjust concurrency limit when the interval is elapsed
+		
+		Returns:
+			Int:
+				Current concurrency limit
+		"""
+		
+		with self.__lock:
+			current = monotonic()
+			if current - self.__updated < self.__interval:
+				return self.__limit
+			sample = self.__sample()
+			requests, ratelimited, errors, latency = ( sample[index] - self.__previous[index] for index in range( 4 ) )
+			tasks = self.__succeed + self.__failed
+			rate = max( errors / requests if requests else 0, self.__failed / tasks if tasks else 0 )
+			mean = latency / requests if requests else None
+			if mean is not None:
+				self.__baseline = mean if self.__baseline is None else min( self.__baseline, mean )
+			previous = self.__limit
+			reason = None
+			if ratelimited >= 1:
+				reason = f"ratelimited={ratelimited}"
+			elif rate > self.__errors:
+				reason = f"errors={rate:.2f}"
+			elif mean is not None and mean > self.__baseline * self.__tolerance:
+				reason = f"latency={mean:.3f} baseline={self.__baseline:.3f}"
+			if reason is not None:
+				self.__limit = max( self.__minimum, Int( self.__limit * self.__backoff ) )
+			elif self.__saturated is True:
+				self.__limit = min( self.__maximum, self.__limit +1 )
+			if self.__limit != previous:
+				_logger.info( "Adaptive concurrency {} -> {} reason={} requests={} tasks={}", previous, self.__limit, reason or "healthy", requests, tasks )
+			self.__failed = 0
+			self.__previous = sample
+			self.__saturated = False
+			self.__succeed = 0
+			self.__updated = current
+			return self.__limit
+	
+	...
+
+
+@final
+class _Progress:
+	
+	"""
+	Low-frequency Progress Renderer
+	
+	Counters are updated by future done callbacks and a renderer
+	thread prints them once per-interval, it sleeps on an event
+	so it costs nothing while workers are blocked on I/O.
+	"""
+	
+	__done:Int
+	""" Number of completed futures """
+	
+	__failed:Int
+	""" Number of failed or cancelled futures """
+	
+	__interval:Float
+	""" Seconds between renders """
+	
+	__lock:Lock
+	""" Counters lock """
+	
+	__name:Str
+	""" Executor name """
+	
+	__renderer:Thread
+	""" Renderer thread """
+	
+	__started:Float
+	""" Monotonic time when started """
+	
+	__stopped:Event
+	""" Renderer stop event """
+	
+	__submitted:Int
+	""" Number of submitted futures """
+	
+	def __init__( self, name:Str, interval:Float=1 ) -> None:
+		
+		"""
+		Construct method of class _Progress
+		
+		Parameters:
+			name (Str):
+				Executor name
+			interval (Float):
+				Seconds between renders
+		"""
+		
+		self.__done = 0
+		self.__failed = 0
+		self.__interval = interval
+		self.__lock = Lock()
+		self.__name = name
+		self.__started = monotonic()
+		self.__stopped = Event()
+		self.__submitted = 0
+		self.__renderer = Thread( target=self.__render, name=f"{name} Progress", daemon=True )
+		self.__renderer.start()
+	
+	def __completed( self, future:Future ) -> None:
+		failed = future.cancelled() or future.exception() is not None
+		with self.__lock:
+			self.__done += 1
+			self.__failed += 1 if failed else 0
+	
+	def __render( self ) -> None:
+		interval = self.__interval if colorable() else self.__interval * 10
+		while not self.__stopped.wait( interval ):
+			self.render()
+	
+	def render( self, end:Optional[Str]=None ) -> None:
+		
+		""" Print current progress """
+		
+		with self.__lock:
+			done = self.__done
+			failed = self.__failed
+			inflight = self.__submitted - self.__done
+		elapsed = max( monotonic() - self.__started, 1e-9 )
+		puts( f"{self.__name}: {done} done, {inflight} in-flight, {failed} failed, {done / elapsed:.2f}/s", start="\x0d", end=end if end is not None else ( "" if colorable() else "\x0a" ), thread="T" )
+	
+	def stop( self ) -> None:
+		
+		""" Stop renderer and print final progress """
+		
+		self.__stopped.set()
+		self.__renderer.join()
+		self.render( end="\x0a" )
+	
+	def submit( self, future:Future ) -> Future:
+		
+		""" Track submitted future """
+		
+		with self.__lock:
+			self.__submitted += 1
+		future.add_done_callback( self.__completed )
+		return future
+	
+	...
+
+
+@final
+class _Task:
+	
+	""" Submitted Dataset Item """
+	
+	__slots__ = (
+		"data",
+		"future",
+		"started",
+		"thread"
+	)
+	
+	data:Optional[D]
+	""" Dataset item, kept only for completion order mode """
+	
+	future:Optional[Future]
+	""" Submitted future """
+	
+	started:Optional[Float]
+	""" Monotonic time when the callback is started """
+	
+	thread:Union[Int,Str]
+	""" Thread position number """
+	
+	def __init__( self, data:Optional[D], thread:Union[Int,Str] ) -> None:
+		
+		"""
+		Construct method of class _Task
+		
+		Parameters:
+			data (Optional[D]):
+				Dataset item
+			thread (Int|Str):
+				Thread position number
+		"""
+		
+		self.data = data
+		self.future = None
+		self.started = None
+		self.thread = thread
+	
+	def deadline( self, timeout:Optional[Float] ) -> Optional[Float]:
+		
+		""" Return monotonic deadline, none when not started or unlimited """
+		
+		if self.started is None or timeout is None or timeout <= 0:
+			return None
+		return self.started + timeout
+	
+	...
+
+
+def _outcome( task:_Task ) -> Tuple[Optional[BaseException],Optional[T]]:
+	
+	"""
+	Resolve completed task and report failure
+	
+	Parameters:
+		task (_Task):
+			Completed task
+	
+	Returns:
+		Tuple[Optional[BaseException],Optional[T]]:
+			Raised exception and the result
+	"""
+	
+	try:
+		return tuple([ None, task.future.result( 0 ) ])
+	except ThreadCancelledError as e:
+		puts( f"Future thread worker T<{task.thread}> is cancelled", start="\x0d", thread=task.thread )
+		return tuple([ e, None ])
+	except BaseException as e:
+		traceback = "\x0a".join( format_exception( e ) )
+		puts( f"Future thread worker T<{task.thread}> is raised {typeof( e )}: {traceback}", start="\x0d", thread=task.thread )
+		return tuple([ e, None ])
+
+def _run( task:_Task, callback:Callable[...,T], data:D, *args:Any, **kwargs:Any ) -> T:
+	
+	""" Mark task as started and execute callback """
+	
+	task.started = monotonic()
+	return callback( data, *args, **kwargs )
+
+def _initialize( queue:SimpleQueue ) -> None:
+	
+	""" Keep started time queue in process pool child """
+	
+	global _Started
+	_Started = queue
+
+def _spawn( callback:Callable[...,T], data:D, *args:Any, thread:Union[Int,Str]=0, **kwargs:Any ) -> T:
+	
+	""" Report started time and execute callback in child process with process labelled thread """
+	
+	if _Started is not None:
+		_Started.put( tuple([ thread, monotonic() ]) )
+	return callback( data, *args, thread=f"P<I<{getpid()}>,T<{thread}>>", **kwargs )
+
+def _execute( name:Str, executor:Executor, callback:Callable[...,T], dataset:Iterable[D], delays:Int, sleepy:Int, timeout:Optional[Float], workers:Int, window:Optional[Int], interval:Float, ordered:Bool, adaptive:Optional[AdaptiveConcurrency], started:Optional[SimpleQueue], args:Tuple[Any,...], kwargs:MutableMapping[Str,Any] ) -> Iterable[Union[T,Tuple[D,Union[T,BaseException]]]]:
+	
+	"""
+	Submit dataset into executor and yield the results
+	
+	The task of process pool is marked as started when the child
+	reports it through the started queue, since the child can not
+	share the task and a future is already running while it waits
+	in the call queue.
+	"""
+	
+	abandoned:Set[Future] = set()
+	pending:Deque[_Task] = deque()
+	processes:Bool = isinstance( executor, ProcessPoolExecutor )
+	totals:Int = 0
+	typename:Str = type( executor ).__name__
+	window = max( workers, window if window is not None else workers * 2 )
+	
+	def running() -> Int:
+		return sum( 1 for task in pending if not task.future.done() ) + len( abandoned )
+	
+	def collect() -> Iterable[Union[T,Tuple[D,Union[T,BaseException]]]]:
+		nonlocal abandoned, totals
+		abandoned = set( future for future in abandoned if not future.done() )
+		candidates = [ pending[0] ] if ordered and pending else pending
+		if started is not None:
+			starts = {}
+			while not started.empty():
+				thread, current = started.get()
+				starts[thread] = current
+			for task in pending:
+				if task.started is None and task.thread in starts:
+					task.started = starts[task.thread]
+		waiting = [ task.future for task in pending if not task.future.done() ] + [ *abandoned ]
+		deadlines = [ deadline - monotonic() for deadline in ( task.deadline( timeout ) for task in candidates ) if deadline is not None ]
+		if adaptive is not None or ( processes is True and any( task.started is None for task in candidates ) ):
+			deadlines.append( 1 )
+		if waiting and not any( task.future.done() for task in candidates ):
+			wait( waiting, timeout=max( 0, min( deadlines ) ) if deadlines else None, return_when=FIRST_COMPLETED )
+		current = monotonic()
+		inflight = running()
+		for task in [ *pending ]:
+			if task.future.done():
+				error, result = _outcome( task )
+			elif task.deadline( timeout ) is not None and task.deadline( timeout ) <= current:
+				if task.future.cancel() is False:
+					abandoned.add( task.future )
+				puts( f"Future thread worker T<{task.thread}> is timeout", start="\x0d", thread=task.thread )
+				error, result = ThreadTimeoutError( f"Future thread worker T<{task.thread}> exceeded deadline {timeout}s" ), None
+			elif ordered is True:
+				break
+			else:
+				continue
+			pending.remove( task )
+			totals += 1 if error is None else 0
+			if adaptive is not None:
+				adaptive.observe( error, inflight )
+			if ordered is False:
+				yield tuple([ task.data, error if error is not None else result ])
+			elif error is None:
+				yield result
+	
+	with executor:
+		progress = _Progress( name, interval )
+		process = getpid()
+		parent = ProcessParent()
+		puts( f"Building {typename} with {workers} workers and {window} window for {name}", start="\x0d" )
+		try:
+			try:
+				for position, data in enumerate( dataset, 1 ):
+					thread = position
+					if parent is not None and parent:
+						thread = f"P<I<{process}>,T<{position}>>"
+					task = _Task( data if ordered is False else None, thread )
+					if processes is True:
+						task.future = progress.submit( executor.submit( _spawn, callback, data, *args, thread=thread, **kwargs ) )
+					else:
+						task.future = progress.submit( executor.submit( _run, task, callback, data, *args, thread=thread, **kwargs ) )
+					pending.append( task )
+					del data, task
+					while len( pending ) + len( abandoned ) >= window or ( adaptive is not None and running() >= adaptive.update() ):
+						yield from collect()
+					if delays or sleepy:
+						sleep( delays if position % workers == 0 else sleepy )
+			except GeneratorExit:
+				executor.shutdown( cancel_futures=True )
+				raise
+			except BaseException as e:
+				executor.shutdown( cancel_futures=True )
+				traceback = "\x0a".join( format_exception( e ) )
+				puts( f"Uncaught {typeof( e )}: {traceback}", start="\x0d" )
+				puts( f"{typename} has been shuting down", start="\x0a" )
+			while pending:
+				yield from collect()
+		finally:
+			progress.stop()
+		...
+	puts( f"", start="\x0a", thread="T" )
+	puts( f"A total of {totals} worker threads have been completed", start="\x0d", thread="T" )
+	puts( f"{typename} for {name} stoped", start="\x0d", thread="T" )
+
+def ProcessExecutor( name:Str, callback:Callable[[D,Args,Kwargs,Int],T], dataset:Iterable[D], timeout:Optional[Float]=None, workers:Optional[Int]=None, window:Optional[Int]=None, interval:Float=1, ordered:Bool=True, context:Str="forkserver", *args:Any, **kwargs:Any ) -> Iterable[Union[T,Tuple[D,Union[T,BaseException]]]]:
+	
+	"""
+	Short ProcessPoolExecutor
+	
+	Same interface as the ThreadExecutor for CPU bound callbacks
+	e.g parsing or decoding, the callback, dataset items, arguments
+	and results must be picklable. The thread position passed into
+	the callback is labelled with the child process id.
+	
+	Children are started by forkserver or spawn, fork is refused since
+	the log sink, progress renderer and thread workers may hold locks
+	at fork time. Children import their own session pool, log sink,
+	rate limiter, metrics and coalescing state, so the callback may
+	still send requests, but the metrics of children are not merged back.
+	
+	A hybrid pipeline is built by feeding the ThreadExecutor results
+	as the dataset, so the I/O is done by threads while the parsing
+	is done by processes and both stay lazy and bounded.
+	
+	Parameters:
+		name (Str):
+			Process prefix name
+		callback (Callable[[D,Args,Kwargs],T]):
+			Process callback handler, must be module level function
+		dataset (Iterable[D]):
+			Datasets
+		timeout (Optional[Float]):
+			Deadline per-task in seconds, none or zero for unlimited
+		workers (Optional[Int]):
+			Process workers, default is number of processors
+		window (Optional[Int]):
+			Maximum submitted items not yielded yet, default is twice the workers
+		interval (Float):
+			Seconds between progress renders
+		ordered (Bool):
+			Yield results in submission order, otherwise yield
+			tuple of item and result or exception in completion order
+		context (Str):
+			Multiprocessing start method, forkserver or spawn
+		args (*Any):
+			Callback handler arguments
+		kwargs (**Any):
+			Callback handler key arguments
+	
+	Returns:
+		results (Iterable[T|Tuple[D,T|BaseException]]):
+			Iterable of callback return
+	
+	Examples:
+	>>> pages = ThreadExecutor( name="Fetcher", callback=fetch, dataset=urls, workers=16 )
+	>>> executor = ProcessExecutor(
+	>>>     name="Parser",
+	>>>     callback=parse,
+	>>>     dataset=pages,
+	>>>     workers=4
+	>>> )
+	>>> for result in executor:
+	>>>     print( result )
+	"""
+	
+	if context not in ( "forkserver", "spawn" ):
+		raise ValueError( f"Unsupported process start method {context}, threads may hold locks at fork time" )
+	workers = max( 1, workers if workers is not None else cpu_count() or 1 )
+	mpcontext = ProcessContext( context )
+	if context == "forkserver":
+		mpcontext.set_forkserver_preload([ __name__ ])
+	started = mpcontext.SimpleQueue()
+	executor = ProcessPoolExecutor( workers, mp_context=mpcontext, initializer=_initialize, initargs=( started, ) )
+	yield from _execute( name, executor, callback, dataset, 0, 0, timeout, workers, window, interval, ordered, None, started, args, kwargs )
+
+def ThreadExecutor( name:Str, callback:Callable[[D,Args,Kwargs,Int],T], dataset:Iterable[D], delays:Int=10, sleepy:Int=1, timeout:Optional[Float]=4, workers:Int=2, window:Optional[Int]=None, interval:Float=1, ordered:Bool=True, adaptive:Optional[AdaptiveConcurrency]=None, *args:Any, **kwargs:Any ) -> Iterable[Union[T,Tuple[D,Union[T,BaseException]]]]:
 	
 	"""
 	Short ThreadPoolExecutor
 	
+	The dataset is pulled lazily, only the given window of items
+	is submitted or buffered at once and the next item is pulled
+	after one is yielded, so memory usage stays flat regardless
+	of the dataset size.
+	
+	Results are yielded in submission order by default, when the
+	ordered is false every item is yielded with its result or
+	exception as soon as it completes. The timeout is a deadline
+	per-task counted from when the callback is started, an item
+	which misses its deadline is reported as timeout and its worker
+	keeps counting into the window until it really finishes.
+	
 	Parameters:
 		name (Str):
 			Thread prefix name
@@ -78,17 +657,26 @@ def ThreadExecutor( name:Str, callback:Callable[[D,Args,Kwargs,Int],T], dataset:
 			Thread delat per-workers
 		sleepy (Int):
 			Thread delay per-thread
-		timeout (Int):
-			Thread timeout
+		timeout (Optional[Float]):
+			Deadline per-task in seconds, none or zero for unlimited
 		workers (Int):
 			Thread workers
+		window (Optional[Int]):
+			Maximum submitted items not yielded yet, default is twice the workers
+		interval (Float):
+			Seconds between progress renders
+		ordered (Bool):
+			Yield results in submission order, otherwise yield
+			tuple of item and result or exception in completion order
+		adaptive (Optional[AdaptiveConcurrency]):
+			Concurrency controller, limits running tasks below workers
 		args (*Any):
 			Callback handler arguments
 		kwargs (**Any):
 			Callback handler key arguments
 	
 	Returns:
-		results (Iterable[T]):
+		results (Iterable[T|Tuple[D,T|BaseException]]):
 			Iterable of callback return
 	
 	Examples:
@@ -99,90 +687,12 @@ def ThreadExecutor( name:Str, callback:Callable[[D,Args,Kwargs,Int],T], dataset:
 	>>>     dataset=datasets,
 	>>>     sleepy=0,
 	>>>     workers=10,
-	>>>     workerDelays=4,
-	>>>     workerTimeout=120
+	>>>     window=20,
+	>>>     timeout=120,
+	>>>     ordered=False
 	>>> )
-	>>> for execution in executor:
-	>>>     print( execution )
+	>>> for data, execution in executor:
+	>>>     print( data, execution )
 	"""
 	
-	totals:Int = 0
-	with ThreadPoolExecutor( workers, name ) as executor:
-		futures:MutableSequence[Future] = []
-		process = getpid()
-		parent = ProcessParent()
-		puts( f"Building ThreadPoolExecutor with {workers} workers for {name}", start="\x0d" )
-		try:
-			for thread, data in enumerate( dataset, 1 ):
-				if parent is not None and parent:
-					thread = f"P<I<{process}>,T<{thread}>>"
-				puts( f"Starting thread for {name}", start="\x0d", thread=thread )
-				future = executor.submit( callback, data, *args, thread=thread, **kwargs )
-				futures.append( future )
-				sleep( delays if ( thread ) % workers == 0 else sleepy )
-			while futures and all( future.done() for future in [ *futures ] ) is False:
-				for thread, future in enumerate( [ *futures ], 1 ):
-					if future.running() is True:
-						loading = f"Future thread worker T<{thread}> is running..."
-						length = len( loading )
-						position = -1
-						for i in "\|/-" * 16:
-							if position >= length:
-								position = -1
-							position += 1
-							messages = loading
-							if position >= 1:
-								messageChar = loading[position-1:position]
-								messageChar = messageChar.lower() \
-									if messageChar.isupper() \
-									else messageChar.upper()
-								messagePrefix = loading[0:position-1]
-								messageSuffix = loading[position:]
-								messages = "".join([
-									messagePrefix, 
-									messageChar, 
-									messageSuffix
-								])
-							puts( messages, end="\x20", start="\x0d", thread=i )
-					try:
-						throwned = future.exception( 0 )
-						if isinstance( throwned, BaseException ):
-							traceback = "\x0a".join( format_exception( e ) )
-							puts( f"Future thread worker T<{thread}> is raised {typeof( throwned )}: {traceback}", thread=thread, start="\x0d" )
-							puts( f"Future thread worker T<{thread}> is deleted from futures", thread=thread, start="\x0d" )
-							if future in futures:
-								del futures[futures.index( future )]
-					except ThreadCancelledError:
-						...
-					except TimeoutError:
-						...
-					finally:
-						...
-					...
-				...
-		except BaseException as e:
-			executor.shutdown()
-			traceback = "\x0a".join( format_exception( e ) )
-			puts( f"Uncaught {typeof( e )}: {traceback}", start="\x0d" )
-			puts( f"ThreadPoolExecutor has been shuting down", start="\x0a" )
-		puts( "ThreadPoolExecutor enumerating futures", start="\x0d", thread="T" )
-		for thread, future in enumerate( futures, 1 ):
-			puts( f"Yielding from future thread worker T<{thread}> WT<{timeout}>", start="\x0d", end="", thread=thread )
-			if future.cancelled() is True:
-				puts( f"Future thread worker T<{i+1}> is cancelled", start="\x0d", thread=thread )
-				continue
-			try:
-				yield future.result( timeout )
-				totals+= 1
-			except ThreadCancelledError:
-				puts( f"Future thread worker T<{i+1}> is cancelled", start="\x0d", thread=thread )
-			except ThreadTimeoutError:
-				puts( f"Future thread worker T<{i+1}> is timeout", start="\x0d", thread=thread )
-			except BaseException as e:
-				traceback = "\x0a".join( format_exception( e ) )
-				puts( f"{typeof( e )}: {traceback}", start="\x0d", thread=thread )
-			...
-		...
-	puts( f"", start="\x0a", thread="T" )
-	puts( f"A total of {totals} worker threads have been completed", start="\x0d", thread="T" )
-	puts( f"ThreadPoolExecutor for {name} stoped", start="\x0d", thread="T" )
+	yield from _execute( name, ThreadPoolExecutor( workers, name ), callback, dataset, delays, sleepy, timeout, workers, window, interval, ordered, adaptive, None, args, kwargs )
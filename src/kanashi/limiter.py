@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+
+#
+# @author hxAri (hxari)
+# @create 23-12-2024 17:30
+# @github https://github.com/hxAri/Kanashi
+#
+# Kanashi is an Open-Source project for doing various
+# things related to Instagram, e.g Login. Logout, Profile Info,
+# Follow, Unfollow, Media downloader, etc.
+#
+# Kanashi Copyright (c) 2024 - hxAri <hxari@proton.me>
+# Kanashi Licence under GNU General Public Licence v3
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+from builtins import float as Float, str as Str
+from os import register_at_fork
+from threading import Lock
+from time import monotonic, sleep
+from typing import final, MutableMapping, Optional, Tuple
+from urllib.parse import urlparse
+
+
+__all__ = [
+	"endpoint",
+	"limiter",
+	"RateLimiter",
+	"TokenBucket"
+]
+
+
+@final
+class TokenBucket:
+	
+	"""
+	Thread-safe Token Bucket
+	
+	Tokens are reserved under the lock and the caller waits outside
+	of it, a reservation larger than the available tokens goes into
+	debt, so waiters are served in arrival order.
+	
+	>>> bucket = TokenBucket( rate=2, capacity=5 )
+	>>> bucket.acquire()
+	"""
+	
+	__slots__ = (
+		"__capacity",
+		"__lock",
+		"__rate",
+		"__tokens",
+		"__updated"
+	)
+	
+	__capacity:Float
+	""" Maximum burst tokens """
+	
+	__lock:Lock
+	""" Bucket lock """
+	
+	__rate:Float
+	""" Refill tokens per second """
+	
+	__tokens:Float
+	""" Available tokens, negative is debt """
+	
+	__updated:Float
+	""" Monotonic time of last refill """
+	
+	def __init__( self, rate:Float, capacity:Optional[Float]=None ) -> None:
+		
+		"""
+		Construct method of class TokenBucket
+		
+		Parameters:
+			rate (Float):
+				Refill tokens per second
+			capacity (Optional[Float]):
+				Maximum burst tokens, default is equal with rate
+		"""
+		
+		if rate <= 0:
+			raise ValueError( f"Token bucket rate must be greater than zero, {rate} given" )
+		self.__capacity = Float( capacity if capacity is not None and capacity > 0 else rate )
+		self.__lock = Lock()
+		self.__rate = Float( rate )
+		self.__tokens = self.__capacity
+		self.__updated = monotonic()
+	
+	def __repr__( self ) -> Str:
+		return f"<TokenBucket rate={self.__rate} capacity={self.__capacity} tokens={self.__tokens:.2f} />"
+	
+	def acquire( self, tokens:Float=1 ) -> Float:
+		
+		"""
+		Acquire tokens, block until tokens are available
+		
+		Parameters:
+			tokens (Float):
+				Number of tokens
+		
+		Returns:
+			Float:
+				Seconds waited
+		"""
+		
+		delay = self.reserve( tokens )
+		if delay > 0:
+			sleep( delay )
+		return delay
+	
+	@property
+	def capacity( self ) -> Float: return self.__capacity
+	
+	@property
+	def rate( self ) -> Float: return self.__rate
+	
+	def reserve( self, tokens:Float=1 ) -> Float:
+		
+		"""
+		Reserve tokens without waiting
+		
+		Parameters:
+			tokens (Float):
+				Number of tokens
+		
+		Returns:
+			Float:
+				Seconds to wait before the reservation is usable
+		"""
+		
+		with self.__lock:
+			current = monotonic()
+			self.__tokens = min( self.__capacity, self.__tokens + ( current - self.__updated ) * self.__rate )
+			self.__updated = current
+			self.__tokens -= tokens
+			if self.__tokens >= 0:
+				return 0
+			return -self.__tokens / self.__rate
+	
+	...
+
+
+def endpoint( url:Str ) -> Tuple[Str,Str]:
+	
+	"""
+	Classify request url into host and endpoint class
+	
+	Parameters:
+		url (Str):
+			Request url
+	
+	Returns:
+		Tuple[Str,Str]:
+			Host and endpoint class e.g graphql, api, media, web
+	"""
+	
+	urlparsed = urlparse( url )
+	host = urlparsed.netloc.lower()
+	if host.endswith( "cdninstagram.com" ) or host.endswith( "fbcdn.net" ):
+		return tuple([ host, "media" ])
+	if urlparsed.path.startswith( "/graphql" ) or urlparsed.path.startswith( "/api/graphql" ):
+		return tuple([ host, "graphql" ])
+	if urlparsed.path.startswith( "/api/" ):
+		return tuple([ host, "api" ])
+	return tuple([ host, "web" ])
+
+
+@final
+class RateLimiter:
+	
+	"""
+	Per-host Rate Limiter
+	
+	Every host and endpoint class pair owns its token bucket,
+	endpoint class without rule is not limited.
+	
+	The process limiter allows 1 request per second with burst 5
+	for graphql and api, override it from command line with
+	--ratelimit-<class>=<rate>[,<burst>] or disable with none.
+	
+	>>> ratelimiter = RateLimiter({ "graphql": ( 1, 5 ) })
+	>>> ratelimiter.acquire( "https://www.instagram.com/graphql/query" )
+	"""
+	
+	__buckets:MutableMapping[Tuple[Str,Str],TokenBucket]
+	""" Token bucket per-host and endpoint class """
+	
+	__lock:Lock
+	""" Limiter lock """
+	
+	__rules:MutableMapping[Str,Tuple[Float,Float]]
+	""" Rate and capacity per endpoint class """
+	
+	def __init__( self, rules:Optional[MutableMapping[Str,Tuple[Float,Float]]]=None ) -> None:
+		
+		"""
+		Construct method of class RateLimiter
+		
+		Parameters:
+			rules (Optional[MutableMapping[Str,Tuple[Float,Float]]]):
+				Requests per second and burst capacity per endpoint class
+		"""
+		
+		self.__buckets = {}
+		self.__lock = Lock()
+		self.__rules = { **( rules or {} ) }
+	
+	def acquire( self, url:Str ) -> Float:
+		
+		"""
+		Wait until request to url is allowed
+		
+		Parameters:
+			url (Str):
+				Request url
+		
+		Returns:
+			Float:
+				Seconds waited
+		"""
+		
+		delay = self.reserve( url )
+		if delay > 0:
+			sleep( delay )
+		return delay
+	
+	def bucket( self, url:Str ) -> Optional[TokenBucket]:
+		
+		"""
+		Return token bucket of url
+		
+		Parameters:
+			url (Str):
+				Request url
+		
+		Returns:
+			Optional[TokenBucket]:
+				Token bucket, none when the endpoint class is not limited
+		"""
+		
+		keyset = endpoint( url )
+		bucket = self.__buckets.get( keyset )
+		if bucket is None:
+			rule = self.__rules.get( keyset[1] )
+			if rule is None:
+				return None
+			with self.__lock:
+				bucket = self.__buckets.get( keyset )
+				if bucket is None:
+					bucket = TokenBucket( *rule )
+					self.__buckets[keyset] = bucket
+		return bucket
+	
+	def configure( self, name:Str, rate:Optional[Float], capacity:Optional[Float]=None ) -> None:
+		
+		"""
+		Configure endpoint class rule
+		
+		Parameters:
+			name (Str):
+				Endpoint class name e.g graphql, api, media, web
+			rate (Optional[Float]):
+				Requests per second, none for unlimited
+			capacity (Optional[Float]):
+				Burst capacity
+		"""
+		
+		with self.__lock:
+			if rate is None or rate <= 0:
+				self.__rules.pop( name, None )
+			else:
+				self.__rules[name] = tuple([ rate, capacity if capacity is not None else rate ])
+			for keyset in [ *self.__buckets.keys() ]:
+				if keyset[1] == name:
+					del self.__buckets[keyset]
+	
+	def reserve( self, url:Str ) -> Float:
+		
+		"""
+		Reserve request to url without waiting
+		
+		Parameters:
+			url (Str):
+				Request url
+		
+		Returns:
+			Float:
+				Seconds to wait before sending the request
+		"""
+		
+		bucket = self.bucket( url )
+		if bucket is None:
+			return 0
+		return bucket.reserve()
+	
+	@property
+	def rules( self ) -> MutableMapping[Str,Tuple[Float,Float]]:
+		
+		""" Return copy of endpoint class rules """
+		
+		return { **self.__rules }
+	
+	...
+
+
+_RateLimiter:RateLimiter = RateLimiter({
+	"api": ( 1, 5 ),
+	"graphql": ( 1, 5 )
+})
+""" Process Rate Limiter Instance, media is unlimited by default """
+
+
+def _forked() -> None:
+	
+	""" Rebuild rate limiter in forked child, the rules are kept """
+	
+	global _RateLimiter
+	_RateLimiter = RateLimiter( _RateLimiter.rules )
+
+def limiter() -> RateLimiter:
+	
+	""" Return process rate limiter """
+	
+	return _RateLimiter
+
+
+register_at_fork( after_in_child=_forked )
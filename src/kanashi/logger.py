@@ -21,20 +21,33 @@
 # along with this program. If not, see <https://www.gnu.org/licenses/>.
 #
 
-from builtins import bool as Bool, int as Int, str as Str
+from atexit import register as atexit
+from builtins import bool as Bool, float as Float, int as Int, str as Str
 from datetime import datetime
 from enum import Enum
-from inspect import getframeinfo, stack
-from os import getpid, getuid, makedirs as mkdir
-from os.path import isdir
+from fcntl import flock, LOCK_EX, LOCK_SH, LOCK_UN
+from glob import glob
+from json import dumps as JsonEncoder
+from os import fstat, getpid, getuid, makedirs as mkdir, register_at_fork, remove, rename, stat
+from os.path import dirname, getmtime, isdir, isfile, splitext
 from pwd import getpwuid
 from pytz import timezone
 from pytz.tzinfo import BaseTzInfo
+from pyzstd import ZstdFile
+from queue import Empty, Full, Queue
 from random import randint
+from shutil import copyfileobj
+from sys import _getframe, stderr
+from threading import Event, Lock, Thread
+from time import time
 from typing import (
 	Any, 
 	final, 
 	Generic, 
+	Literal, 
+	MutableMapping, 
+	Optional, 
+	TextIO, 
 	Tuple, 
 	TypeVar as Var, 
 	Union
@@ -48,9 +61,14 @@ from kanashi.constant import BasePath, BaseVenv
 
 __all__ = [
 	"disableStoreLog",
+	"disableStructuredLog",
 	"enableStoreLog",
+	"enableStructuredLog",
 	"Level",
 	"Logger",
+	"LogSink",
+	"Rotation",
+	"sink",
 	"threshold"
 ]
 
@@ -64,9 +82,27 @@ _EnableStore:Bool = True
 _FDatetime:Str = "%Y-%m-%dT%H:%M:%S"
 """ DateTime formatter """
 
+_FMinute:Str = "%Y-%m-%dT%H:%M:"
+""" DateTime formatter until minute, seconds are appended per-line """
+
 _Formatter:Str = "{datetime}{utcoffset} {level} {username} P{pid}:T{thread} --- [{program}] {context} : {linenum} : {message}"
 """ Logging formatter """
 
+_Minute:Tuple[Int,Str,Str] = tuple([ -1, "", "" ])
+""" Cached minute epoch, formatted minute and utcoffset """
+
+_Process:Optional[Str] = None
+""" Cached process id, reset in forked child """
+
+_SinkLock:Lock = Lock()
+""" Log sink creation lock """
+
+_Structured:Bool = False
+""" Logger store log as NDJSON records """
+
+_Username:Optional[Str] = None
+""" Cached os account username """
+
 _Strftime = Var( "_Strftime", bytes, str )
 """ DateTime String Formatted Type """
 
@@ -74,6 +110,22 @@ _Utcoffsets = Var( "_Utcoffsets", bytes, str )
 """ DateTime String of Utcoffset Type """
 
 
+def _exited() -> None:
+	
+	""" Write queued log lines before interpreter exit """
+	
+	if _LogSink is not None:
+		_LogSink.close()
+
+def _forked() -> None:
+	
+	""" Reset process constant caches in forked child """
+	
+	global _LogSink, _Process, _SinkLock
+	_LogSink = None
+	_Process = None
+	_SinkLock = Lock()
+
 def disableStoreLog() -> None:
 	
 	""" Enable store log into file """
@@ -81,6 +133,13 @@ def disableStoreLog() -> None:
 	global _EnableStore
 	_EnableStore = False
 
+def disableStructuredLog() -> None:
+	
+	""" Store log as formatted lines """
+	
+	global _Structured
+	_Structured = False
+
 def enableStoreLog() -> None:
 	
 	""" Enable store log into file """
@@ -88,6 +147,16 @@ def enableStoreLog() -> None:
 	global _EnableStore
 	_EnableStore = True
 
+def enableStructuredLog() -> None:
+	
+	"""
+	Store log as NDJSON records, message arguments are kept as
+	fields and the message is not formatted unless it is printed
+	"""
+	
+	global _Structured
+	_Structured = True
+
 
 class Level( Enum ):
 	
@@ -132,6 +201,515 @@ def threshold( level:Level ) -> None:
 	_Threshlod = level
 
 
+@final
+class Rotation:
+	
+	"""
+	Log File Rotation Policy
+	
+	The active log file is rotated when it grows beyond the size
+	or was opened longer than the interval, and always when the
+	day changes. Rotated segments are compressed with zstd in the
+	background and the oldest archives beyond retention are removed.
+	
+	>>> rotation = Rotation( size=64 << 20, interval=3600, retention=48 )
+	>>> logsink = LogSink( rotation=rotation )
+	"""
+	
+	__slots__ = (
+		"age",
+		"compress",
+		"interval",
+		"retention",
+		"size"
+	)
+	
+	age:Optional[Float]
+	""" Maximum archive age in seconds, none for unlimited """
+	
+	compress:Bool
+	""" Whether rotated segments are compressed with zstd """
+	
+	interval:Optional[Float]
+	""" Maximum seconds per segment, none for daily only """
+	
+	retention:Optional[Int]
+	""" Maximum number of kept archives, none for unlimited """
+	
+	size:Optional[Int]
+	""" Maximum segment size in bytes, none for unlimited """
+	
+	def __init__( self, size:Optional[Int]=64 << 20, interval:Optional[Float]=None, retention:Optional[Int]=30, age:Optional[Float]=None, compress:Bool=True ) -> None:
+		
+		"""
+		Construct method of class Rotation
+		
+		Parameters:
+			size (Optional[Int]):
+				Maximum segment size in bytes
+			interval (Optional[Float]):
+				Maximum seconds per segment
+			retention (Optional[Int]):
+				Maximum number of kept archives
+			age (Optional[Float]):
+				Maximum archive age in seconds
+			compress (Bool):
+				Compress rotated segments with zstd
+		"""
+		
+		self.age = age
+		self.compress = compress
+		self.interval = interval
+		self.retention = retention
+		self.size = size
+	
+	def __repr__( self ) -> Str:
+		return f"<Rotation size={self.size} interval={self.interval} retention={self.retention} age={self.age} compress={self.compress} />"
+	
+	def exceeded( self, written:Int, opened:Float, current:Float ) -> Bool:
+		
+		"""
+		Return whether active segment must be rotated
+		
+		Parameters:
+			written (Int):
+				Segment size in bytes
+			opened (Float):
+				Time when segment was opened
+			current (Float):
+				Current time
+		
+		Returns:
+			Bool:
+		"""
+		
+		if self.size is not None and written >= self.size:
+			return True
+		if self.interval is not None and current - opened >= self.interval:
+			return True
+		return False
+	
+	...
+
+
+def _encode( record:MutableMapping[Str,Any] ) -> Str:
+	
+	"""
+	Encode structured record as JSON line
+	
+	Values which can not be encoded e.g mappings with non string
+	keys, circular references or containers mutated while encoded
+	are replaced with their repr, so a record never fails.
+	
+	Parameters:
+		record (MutableMapping[Str,Any]):
+			Structured record
+	
+	Returns:
+		Str:
+			JSON line
+	"""
+	
+	try:
+		return JsonEncoder( record, default=Str, ensure_ascii=False )
+	except ( RecursionError, RuntimeError, TypeError, ValueError ):
+		pass
+	try:
+		return JsonEncoder( { Str( keyset ): value if isinstance( value, ( Bool, Float, Int, Str ) ) or value is None else repr( value ) for keyset, value in record.items() }, ensure_ascii=False )
+	except Exception:
+		return JsonEncoder( { "record": repr( record ) }, ensure_ascii=False )
+
+def _archive( filename:Str, rotation:Rotation ) -> None:
+	
+	"""
+	Compress rotated log segment and apply retention
+	
+	Parameters:
+		filename (Str):
+			Rotated log segment filename
+		rotation (Rotation):
+			Rotation policy
+	"""
+	
+	try:
+		if rotation.compress is True and isfile( filename ):
+			with open( filename, "rb" ) as source, ZstdFile( f"{filename}.zst.part", "wb" ) as target:
+				copyfileobj( source, target, 1 << 20 )
+			rename( f"{filename}.zst.part", f"{filename}.zst" )
+			remove( filename )
+		extension = splitext( filename )[1]
+		pattern = filename.rsplit( "\x2f", 1 )[0] + f"/{program.lower()}-*.*{extension}" + ( ".zst" if rotation.compress else "" )
+		archives = sorted( glob( pattern ), key=getmtime, reverse=True )
+		current = time()
+		for position, archive in enumerate( archives ):
+			if ( rotation.retention is not None and position >= rotation.retention ) \
+			or ( rotation.age is not None and current - getmtime( archive ) >= rotation.age ):
+				remove( archive )
+	except OSError as e:
+		stderr.write( f"LogSink: {e}\x0a" )
+
+@final
+class LogSink:
+	
+	"""
+	Background Buffered Log Sink
+	
+	Producers only enqueue the formatted line, a single writer
+	thread drains the queue in batches into a long-lived buffered
+	file handle and flushes once per-batch. The queue is bounded,
+	when it is full the line is either dropped and counted or the
+	producer blocks until the writer catches up.
+	
+	When rotation is enabled the log file may be shared by other
+	processes, every batch is written under a shared lock of the
+	log directory and rotation takes the exclusive lock, so a file
+	is never rotated twice nor written after it has been rotated.
+	
+	>>> logsink = LogSink( capacity=8192, policy="drop" )
+	>>> logsink.put( "/path/to/kanashi.log", "Hello World!" )
+	>>> logsink.close()
+	"""
+	
+	__batch:Int
+	""" Maximum lines written per-batch """
+	
+	__closed:Bool
+	""" Whether the sink is closed """
+	
+	__dropped:Int
+	""" Number of dropped lines since last report """
+	
+	__handle:Optional[TextIO]
+	""" Long-lived buffered file handle """
+	
+	__lock:Lock
+	""" Dropped counter lock """
+	
+	__locking:Optional[TextIO]
+	""" Rotation lock file handle shared with other processes """
+	
+	__opened:Optional[Str]
+	""" Filename of opened handle """
+	
+	__policy:Literal["block","drop"]
+	""" Full queue policy """
+	
+	__rotated:Float
+	""" Time when active segment was opened """
+	
+	__rotation:Optional[Rotation]
+	""" Rotation policy, none for never rotate """
+	
+	__verified:Bool
+	""" Whether opened handle is verified in current batch """
+	
+	__written:Int
+	""" Active segment size in bytes """
+	
+	__queue:Queue
+	""" Bounded line queue """
+	
+	__writer:Thread
+	""" Background writer thread """
+	
+	def __init__( self, capacity:Int=8192, policy:Literal["block","drop"]="drop", batch:Int=512, rotation:Optional[Rotation]=None ) -> None:
+		
+		"""
+		Construct method of class LogSink
+		
+		Parameters:
+			capacity (Int):
+				Maximum queued lines
+			policy (Literal["block","drop"]):
+				Full queue policy
+			batch (Int):
+				Maximum lines written per-batch
+			rotation (Optional[Rotation]):
+				Rotation policy, none for never rotate
+		"""
+		
+		if policy not in ( "block", "drop" ):
+			raise ValueError( f"Invalid log sink policy {policy}" )
+		self.__batch = batch
+		self.__closed = False
+		self.__dropped = 0
+		self.__handle = None
+		self.__lock = Lock()
+		self.__locking = None
+		self.__opened = None
+		self.__policy = policy
+		self.__queue = Queue( maxsize=capacity )
+		self.__rotated = 0
+		self.__rotation = rotation
+		self.__verified = False
+		self.__written = 0
+		self.__writer = Thread( target=self.__drain, name="LogSink", daemon=True )
+		self.__writer.start()
+	
+	def __acquire( self, filename:Str ) -> None:
+		if self.__rotation is None:
+			return
+		try:
+			if self.__locking is None:
+				self.__locking = open( f"{dirname( filename )}/.{program.lower()}.lock", "a" )
+			flock( self.__locking, LOCK_SH )
+		except OSError as e:
+			stderr.write( f"LogSink: {e}\x0a" )
+	
+	def __drain( self ) -> None:
+		running = True
+		while running:
+			records = [ self.__queue.get() ]
+			try:
+				while len( records ) < self.__batch:
+					records.append( self.__queue.get_nowait() )
+			except Empty:
+				pass
+			waiters = []
+			lines = [ record for record in records if isinstance( record, tuple ) ]
+			if lines:
+				self.__acquire( lines[0][0] )
+			self.__verified = False
+			try:
+				for record in records:
+					if record is None:
+						running = False
+					elif isinstance( record, Event ):
+						waiters.append( record )
+					else:
+						self.__write( *record )
+				try:
+					if self.__handle is not None:
+						self.__handle.flush()
+				except OSError as e:
+					stderr.write( f"LogSink: {e}\x0a" )
+			finally:
+				self.__release()
+			for waiter in waiters:
+				waiter.set()
+		if self.__handle is not None:
+			self.__handle.close()
+			self.__handle = None
+		if self.__locking is not None:
+			self.__locking.close()
+			self.__locking = None
+	
+	def __moved( self ) -> Bool:
+		try:
+			opened = fstat( self.__handle.fileno() )
+			actual = stat( self.__opened )
+		except FileNotFoundError:
+			return True
+		if opened.st_dev != actual.st_dev or opened.st_ino != actual.st_ino:
+			return True
+		self.__written = actual.st_size
+		return False
+	
+	def __release( self ) -> None:
+		if self.__locking is not None:
+			try:
+				flock( self.__locking, LOCK_UN )
+			except OSError as e:
+				stderr.write( f"LogSink: {e}\x0a" )
+	
+	def __rotate( self, current:Float ) -> None:
+		self.__handle.flush()
+		if self.__locking is not None:
+			flock( self.__locking, LOCK_EX )
+		try:
+			moved = self.__moved()
+			self.__handle.close()
+			self.__handle = None
+			if moved is True:
+				return
+			stamp = datetime.fromtimestamp( current ).strftime( "%Y%m%dT%H%M%S" )
+			basename, extension = splitext( self.__opened )
+			rotated = f"{basename}.{stamp}{extension}"
+			sequence = 0
+			while isfile( rotated ) or isfile( f"{rotated}.zst" ):
+				sequence += 1
+				rotated = f"{basename}.{stamp}-{sequence}{extension}"
+			rename( self.__opened, rotated )
+			Thread( target=_archive, args=( rotated, self.__rotation ), name="LogSinkArchive" ).start()
+		finally:
+			if self.__locking is not None:
+				flock( self.__locking, LOCK_SH )
+	
+	def __write( self, filename:Str, line:Union[MutableMapping[Str,Any],Str] ) -> None:
+		try:
+			if not isinstance( line, Str ):
+				line = _encode( line )
+			current = time()
+			if self.__handle is not None and self.__rotation is not None and self.__verified is False:
+				self.__verified = True
+				if self.__moved() is True:
+					self.__handle.close()
+					self.__handle = None
+			if self.__handle is not None and self.__rotation is not None:
+				if self.__opened != filename or self.__rotation.exceeded( self.__written, self.__rotated, current ):
+					self.__rotate( current )
+			if self.__opened != filename or self.__handle is None:
+				if self.__handle is not None:
+					self.__handle.close()
+				self.__handle = open( filename, "a", encoding="UTF-8", buffering=1 << 16 )
+				self.__opened = filename
+				self.__rotated = current
+				self.__verified = True
+				self.__written = self.__handle.tell()
+			with self.__lock:
+				dropped = self.__dropped
+				self.__dropped = 0
+			if dropped >= 1:
+				self.__written += self.__handle.write( f"LogSink dropped {dropped} lines\x0a" )
+			self.__written += self.__handle.write( line )
+			self.__written += self.__handle.write( "\x0a" )
+		except OSError as e:
+			stderr.write( f"LogSink: {e}\x0a" )
+		except Exception as e:
+			stderr.write( f"LogSink: {type( e ).__name__}: {e}\x0a" )
+	
+	def close( self, timeout:Optional[Float]=5 ) -> None:
+		
+		"""
+		Write queued lines and stop the writer
+		
+		Parameters:
+			timeout (Optional[Float]):
+				Maximum seconds to wait for the writer, none for unlimited
+		"""
+		
+		if self.__closed is True:
+			return
+		self.__closed = True
+		if not self.__writer.is_alive():
+			return
+		try:
+			self.__queue.put( None, timeout=timeout )
+		except Full:
+			stderr.write( "LogSink: writer did not drain the queue before close\x0a" )
+			return
+		self.__writer.join( timeout )
+	
+	@property
+	def dropped( self ) -> Int:
+		
+		""" Number of dropped lines not reported yet """
+		
+		with self.__lock:
+			return self.__dropped
+	
+	def flush( self, timeout:Optional[Float]=None ) -> Bool:
+		
+		"""
+		Wait until all lines queued before are written
+		
+		Parameters:
+			timeout (Optional[Float]):
+				Maximum seconds to wait
+		
+		Returns:
+			Bool:
+				Return true whether lines are written
+		"""
+		
+		if self.__closed is True:
+			return True
+		if not self.__writer.is_alive():
+			return False
+		event = Event()
+		try:
+			self.__queue.put( event, timeout=timeout )
+		except Full:
+			return False
+		return event.wait( timeout )
+	
+	@property
+	def policy( self ) -> Literal["block","drop"]:
+		
+		""" Full queue policy """
+		
+		return self.__policy
+	
+	def put( self, filename:Str, line:Union[MutableMapping[Str,Any],Str] ) -> Bool:
+		
+		"""
+		Queue line to be written
+		
+		Parameters:
+			filename (Str):
+				Log filename
+			line (MutableMapping[Str,Any]|Str):
+				Formatted line without line break, or record which
+				is encoded as JSON by the writer thread, the record
+				must not be mutated after it is queued
+		
+		Returns:
+			Bool:
+				Return false when line is dropped, the block policy
+				only drops when the writer is no longer running
+		"""
+		
+		if self.__closed is True:
+			return False
+		record = tuple([ filename, line ])
+		if self.__policy == "block":
+			while self.__writer.is_alive():
+				try:
+					self.__queue.put( record, timeout=1 )
+					return True
+				except Full:
+					continue
+		else:
+			try:
+				self.__queue.put_nowait( record )
+				return True
+			except Full:
+				pass
+		with self.__lock:
+			self.__dropped += 1
+		return False
+	
+	@property
+	def rotation( self ) -> Optional[Rotation]:
+		
+		""" Rotation policy """
+		
+		return self.__rotation
+	
+	...
+
+
+_LogSink:Optional[LogSink] = None
+""" Log Sink Instance, created on first stored line """
+
+
+def sink( capacity:Optional[Int]=None, policy:Optional[Literal["block","drop"]]=None, rotation:Optional[Rotation]=None ) -> LogSink:
+	
+	"""
+	Return log sink, reconfigure when capacity, policy or rotation is given
+	
+	Parameters:
+		capacity (Optional[Int]):
+			Maximum queued lines
+		policy (Optional[Literal["block","drop"]]):
+			Full queue policy
+		rotation (Optional[Rotation]):
+			Rotation policy
+	
+	Returns:
+		LogSink:
+	"""
+	
+	global _LogSink
+	with _SinkLock:
+		if _LogSink is not None and ( capacity is not None or policy is not None or rotation is not None ):
+			_LogSink.close()
+			_LogSink = LogSink( capacity or 8192, policy or _LogSink.policy, rotation=rotation or _LogSink.rotation )
+		elif _LogSink is None:
+			_LogSink = LogSink( capacity or 8192, policy or "drop", rotation=rotation or Rotation() )
+		return _LogSink
+
+
 class Logger( Generic[_Context] ):
 	
 	"""
@@ -149,8 +727,8 @@ class Logger( Generic[_Context] ):
 	__context:_Context
 	""" Application context """
 	
-	__filename:Str
-	""" Logging stored contents """
+	__contextname:Optional[Str]
+	""" Resolved application context name """
 	
 	__formatter:Str
 	""" Logging message format """
@@ -170,12 +748,11 @@ class Logger( Generic[_Context] ):
 				Logger output format
 		"""
 		
-		currtime = datetime.now()
 		self.__basepath = f"{BasePath}/logging"
 		if not isdir( self.basepath ):
 			mkdir( self.basepath )
 		self.__context = context
-		self.__filename = currtime.strftime( f"{self.basepath}/{program.lower()}-%Y-%m-%d.log" )
+		self.__contextname = None
 		self.__formatter = formatter
 		self.__timezone = timezone( TzLocalzoneName() )
 	
@@ -193,14 +770,17 @@ class Logger( Generic[_Context] ):
 		
 		""" Logger context """
 		
-		context = self.__context
-		if not isinstance( context, Str ):
-			if not hasattr( context, "__qualname__" ):
-				context = type( context )
-			if hasattr( context, "__qualname__" ):
-				return f"{context.__module__}.{context.__qualname__}"
-			return f"{context.__module__}.{context.__name__}"
-		return context
+		if self.__contextname is None:
+			context = self.__context
+			if not isinstance( context, Str ):
+				if not hasattr( context, "__qualname__" ):
+					context = type( context )
+				if hasattr( context, "__qualname__" ):
+					context = f"{context.__module__}.{context.__qualname__}"
+				else:
+					context = f"{context.__module__}.{context.__name__}"
+			self.__contextname = context
+		return self.__contextname
 	
 	def critical( self, message:Str, *args:Any, **kwargs:Any ) -> None:
 		self.write( Level.CRITICAL, message, *args, **kwargs )
@@ -215,9 +795,9 @@ class Logger( Generic[_Context] ):
 	@property
 	def filename( self ) -> Str:
 		
-		""" Logger filename """
+		""" Logger filename of current day """
 		
-		return self.__filename
+		return f"{self.basepath}/{program.lower()}-{self.utcoffset()[0][:10]}.log"
 	
 	@final
 	@property
@@ -247,21 +827,35 @@ class Logger( Generic[_Context] ):
 		
 		""" Current os account username """
 		
-		return getpwuid( getuid() )[0]
+		global _Username
+		if _Username is None:
+			_Username = getpwuid( getuid() )[0]
+		return _Username
 	
 	def utcoffset( self ) -> Tuple[_Strftime,_Utcoffsets]:
 		
-		""" Return formatted datetime and utcoffset """
+		"""
+		Return formatted datetime and utcoffset
+		
+		The timezone lookup and formatting is done once per-minute,
+		only the seconds are formatted per-line.
+		"""
 		
-		localtime = datetime.now( self.timezone )
-		utfoffset = localtime.utcoffset()
-		seconds = utfoffset.total_seconds()
-		hours, remainder = divmod( seconds, 3600 )
-		minutes = remainder // 60
-		operator = "+" if seconds >= 0 else "-"
-		offsets = f"{operator}{int(hours):02}:{int(minutes):02}"
-		strftime = localtime.strftime( _FDatetime )
-		return tuple([ strftime, offsets ])
+		global _Minute
+		current = time()
+		minute, second = divmod( Int( current ), 60 )
+		cached = _Minute
+		if cached[0] != minute:
+			localtime = datetime.fromtimestamp( minute * 60, self.timezone )
+			utfoffset = localtime.utcoffset()
+			seconds = utfoffset.total_seconds()
+			hours, remainder = divmod( abs( seconds ), 3600 )
+			minutes = remainder // 60
+			operator = "+" if seconds >= 0 else "-"
+			offsets = f"{operator}{int(hours):02}:{int(minutes):02}"
+			cached = tuple([ minute, localtime.strftime( _FMinute ), offsets ])
+			_Minute = cached
+		return tuple([ f"{cached[1]}{second:02}", cached[2] ])
 	
 	def warning( self, message:Str, *args:Any, **kwargs:Any ) -> None:
 		self.write( Level.WARNING, message, *args, **kwargs )
@@ -284,21 +878,42 @@ class Logger( Generic[_Context] ):
 				Logger key argument message
 		"""
 		
-		stacks = stack()
-		progpid = str( getpid() )
-		inframe = getframeinfo( stacks[2][0] )
-		linenum = str( inframe.lineno )
-		context = f"{self.context}.{inframe.function}"
+		global _Process
+		if isinstance( level, Int ):
+			level = Level( value=0 )
+		console = not isinstance( level, Str ) and level.value >= _Threshlod.value
+		if _EnableStore is False and console is False:
+			return
+		if _Process is None:
+			_Process = str( getpid() )
+		progpid = _Process
+		inframe = _getframe( 2 )
+		linenum = str( inframe.f_lineno )
+		context = f"{self.context}.{inframe.f_code.co_name}"
 		context = context \
 			.replace( "__main__", program.lower() ) \
 			.replace( "<module>", "invoke" )
 		strftime, offsets = self.utcoffset()
 		levelname = level
-		if isinstance( level, Int ):
-			level = Level( value=0 )
 		if isinstance( level, Level ):
 			levelname = level.name
 		thread = str( thread )
+		if _EnableStore is True and _Structured is True:
+			( _LogSink or sink() ).put( f"{self.basepath}/{program.lower()}-{strftime[:10]}.ndjson", _encode({
+				**kwargs,
+				"datetime": f"{strftime}{offsets}",
+				"level": levelname,
+				"username": self.username,
+				"pid": progpid,
+				"thread": thread,
+				"program": program,
+				"context": context,
+				"linenum": inframe.f_lineno,
+				"message": message,
+				"args": args
+			}))
+			if console is False:
+				return
 		username = self.username
 		formatted = self.formatter.format(
 			datetime=strftime,
@@ -312,12 +927,9 @@ class Logger( Generic[_Context] ):
 			pid=progpid[:6].ljust( 6 ),
 			message=message.format( *args, **kwargs )
 		)
-		if _EnableStore is True:
-			with open( self.filename, "a", encoding="UTF-8" ) as fopen:
-				fopen.write( formatted.replace( "\x0a", "\\n" ) )
-				fopen.write( "\x0a" )
-				fopen.close()
-		if not isinstance( level, Str ) and level.value >= _Threshlod.value:
+		if _EnableStore is True and _Structured is False:
+			( _LogSink or sink() ).put( f"{self.basepath}/{program.lower()}-{strftime[:10]}.log", formatted.replace( "\x0a", "\\n" ) )
+		if console is True:
 			print( f"\x0d{colorize( formatted )}" \
 				.replace( BasePath, "{basepath}" ) \
 				.replace( BaseVenv, "{virtual}" )
@@ -325,3 +937,7 @@ class Logger( Generic[_Context] ):
 		...
 	
 	...
+
+
+atexit( _exited )
+register_at_fork( after_in_child=_forked )
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+
+#
+# @author hxAri (hxari)
+# @create 23-12-2024 17:30
+# @github https://github.com/hxAri/Kanashi
+#
+# Kanashi is an Open-Source project for doing various
+# things related to Instagram, e.g Login. Logout, Profile Info,
+# Follow, Unfollow, Media downloader, etc.
+#
+# Kanashi Copyright (c) 2024 - hxAri <hxari@proton.me>
+# Kanashi Licence under GNU General Public Licence v3
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+from bisect import bisect_left
+from builtins import bool as Bool, float as Float, int as Int, str as Str
+from json import dumps as JsonEncoder
+from os import register_at_fork
+from threading import Lock
+from typing import ( 
+	Any, 
+	final, 
+	Literal, 
+	MutableMapping, 
+	MutableSequence, 
+	Optional, 
+	Sequence
+)
+from urllib.parse import parse_qs, urlparse
+
+from kanashi.limiter import endpoint as classify
+
+
+__all__ = [
+	"endpoint",
+	"Histogram",
+	"metrics",
+	"Registry"
+]
+
+
+Buckets:Sequence[Float] = ( 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60 )
+""" Default latency histogram buckets in seconds """
+
+
+def endpoint( url:Str, payload:Optional[Any]=None ) -> Str:
+	
+	"""
+	Return metrics endpoint label of request
+	
+	GraphQL requests are labelled with their doc_id, any other
+	request is labelled with its host and endpoint class.
+	
+	Parameters:
+		url (Str):
+			Request url
+		payload (Optional[Any]):
+			Request payload or form data
+	
+	Returns:
+		Str:
+			Endpoint label e.g graphql:8845758582119845, scontent.cdninstagram.com:media
+	"""
+	
+	host, name = classify( url )
+	if name == "graphql":
+		docId = None
+		if isinstance( payload, MutableMapping ):
+			docId = payload.get( "doc_id" )
+		if docId is None:
+			docId = parse_qs( urlparse( url ).query ).get( "doc_id", [ None ] )[0]
+		if docId is not None:
+			return f"graphql:{docId}"
+	return f"{host}:{name}"
+
+
+@final
+class Histogram:
+	
+	""" Cumulative Bucket Histogram """
+	
+	__slots__ = (
+		"buckets",
+		"count",
+		"counts",
+		"total"
+	)
+	
+	buckets:Sequence[Float]
+	""" Upper bounds of buckets """
+	
+	count:Int
+	""" Number of observations """
+	
+	counts:MutableSequence[Int]
+	""" Observations per-bucket, last is overflow """
+	
+	total:Float
+	""" Sum of observations """
+	
+	def __init__( self, buckets:Sequence[Float]=Buckets ) -> None:
+		
+		"""
+		Construct method of class Histogram
+		
+		Parameters:
+			buckets (Sequence[Float]):
+				Sorted upper bounds of buckets
+		"""
+		
+		self.buckets = buckets
+		self.count = 0
+		self.counts = [ 0 ] * ( len( buckets ) +1 )
+		self.total = 0
+	
+	def observe( self, value:Float ) -> None:
+		
+		""" Add observation """
+		
+		self.counts[bisect_left( self.buckets, value )] += 1
+		self.count += 1
+		self.total += value
+	
+	def quantile( self, q:Float ) -> Optional[Float]:
+		
+		"""
+		Estimate quantile by linear interpolation inside bucket
+		
+		Parameters:
+			q (Float):
+				Quantile between zero and one
+		
+		Returns:
+			Optional[Float]:
+				Estimated value, none when there is no observation
+		"""
+		
+		if self.count == 0:
+			return None
+		rank = q * self.count
+		cumulative = 0
+		for position, count in enumerate( self.counts ):
+			if cumulative + count >= rank and count >= 1:
+				if position >= len( self.buckets ):
+					return self.buckets[-1]
+				lower = self.buckets[position -1] if position >= 1 else 0
+				upper = self.buckets[position]
+				return lower + ( upper - lower ) * ( rank - cumulative ) / count
+			cumulative += count
+		return self.buckets[-1]
+	
+	...
+
+
+@final
+class Registry:
+	
+	"""
+	In-process Request Metrics Registry
+	
+	>>> registry = metrics()
+	>>> registry.observe( "graphql:123", 200, 0.42, 1024 )
+	>>> print( registry.dump( "prometheus" ) )
+	"""
+	
+	__endpoints:MutableMapping[Str,MutableMapping[Str,Any]]
+	""" Metrics per-endpoint """
+	
+	__lock:Lock
+	""" Registry lock """
+	
+	def __init__( self ) -> None:
+		
+		""" Construct method of class Registry """
+		
+		self.__endpoints = {}
+		self.__lock = Lock()
+	
+	def __entry( self, name:Str ) -> MutableMapping[Str,Any]:
+		if name not in self.__endpoints:
+			self.__endpoints[name] = {
+				"bytes": 0,
+				"errors": {},
+				"latency": Histogram(),
+				"requests": 0,
+				"retries": 0,
+				"statuses": {},
+				"streamed": 0,
+				"transfer": 0
+			}
+		return self.__endpoints[name]
+	
+	def dump( self, format:Literal[ "json", "prometheus" ]="json" ) -> Str:
+		
+		"""
+		Dump metrics
+		
+		Parameters:
+			format (Literal["json","prometheus"]):
+				Output format
+		
+		Returns:
+			Str:
+				Formatted metrics
+		"""
+		
+		if format == "prometheus":
+			return self.prometheus()
+		return JsonEncoder( self.snapshot(), indent=4 )
+	
+	def error( self, name:Str, error:BaseException, retried:Bool=False ) -> None:
+		
+		"""
+		Record request exception
+		
+		Parameters:
+			name (Str):
+				Endpoint label
+			error (BaseException):
+				Raised exception
+			retried (Bool):
+				Whether the attempt will be retried
+		"""
+		
+		keyset = type( error ).__name__
+		with self.__lock:
+			entry = self.__entry( name )
+			entry['errors'][keyset] = entry['errors'].get( keyset, 0 ) +1
+			entry['retries'] += 1 if retried else 0
+	
+	def observe( self, name:Str, status:Int, latency:Float, received:Int=0, retried:Bool=False ) -> None:
+		
+		"""
+		Record completed request
+		
+		Parameters:
+			name (Str):
+				Endpoint label
+			status (Int):
+				Response status code
+			latency (Float):
+				Seconds from send until response is ready
+			received (Int):
+				Received body bytes
+			retried (Bool):
+				Whether the attempt will be retried
+		"""
+		
+		with self.__lock:
+			entry = self.__entry( name )
+			entry['bytes'] += received
+			entry['latency'].observe( latency )
+			entry['requests'] += 1
+			entry['retries'] += 1 if retried else 0
+			entry['statuses'][status] = entry['statuses'].get( status, 0 ) +1
+	
+	def prometheus( self ) -> Str:
+		
+		""" Return metrics in Prometheus text exposition format """
+		
+		lines = []
+		snapshot = self.snapshot( raw=True )
+		for keyset, metric, description in [
+			( "requests", "kanashi_requests_total", "Total requests" ),
+			( "retries", "kanashi_request_retries_total", "Total retried attempts" ),
+			( "bytes", "kanashi_response_bytes_total", "Total received body bytes" ),
+			( "streamed", "kanashi_response_streamed_bytes_total", "Total received streamed body bytes" ),
+			( "transfer", "kanashi_response_transfer_seconds_total", "Total seconds spent receiving streamed bodies" )
+		]:
+			lines.append( f"# HELP {metric} {description}" )
+			lines.append( f"# TYPE {metric} counter" )
+			for name, entry in snapshot.items():
+				lines.append( f"{metric}{{endpoint=\"{name}\"}} {entry[keyset]}" )
+		lines.append( "# HELP kanashi_request_status_total Responses by status code" )
+		lines.append( "# TYPE kanashi_request_status_total counter" )
+		for name, entry in snapshot.items():
+			for status, count in sorted( entry['statuses'].items() ):
+				lines.append( f"kanashi_request_status_total{{endpoint=\"{name}\",code=\"{status}\"}} {count}" )
+		lines.append( "# HELP kanashi_request_errors_total Request exceptions by type" )
+		lines.append( "# TYPE kanashi_request_errors_total counter" )
+		for name, entry in snapshot.items():
+			for error, count in sorted( entry['errors'].items() ):
+				lines.append( f"kanashi_request_errors_total{{endpoint=\"{name}\",error=\"{error}\"}} {count}" )
+		lines.append( "# HELP kanashi_request_latency_seconds Request latency" )
+		lines.append( "# TYPE kanashi_request_latency_seconds histogram" )
+		for name, entry in snapshot.items():
+			histogram = entry['latency']
+			cumulative = 0
+			for bound, count in zip( [ *histogram.buckets, "+Inf" ], histogram.counts ):
+				cumulative += count
+				lines.append( f"kanashi_request_latency_seconds_bucket{{endpoint=\"{name}\",le=\"{bound}\"}} {cumulative}" )
+			lines.append( f"kanashi_request_latency_seconds_sum{{endpoint=\"{name}\"}} {histogram.total}" )
+			lines.append( f"kanashi_request_latency_seconds_count{{endpoint=\"{name}\"}} {histogram.count}" )
+		return "\x0a".join( lines ) + "\x0a"
+	
+	def reset( self ) -> None:
+		
+		""" Reset all metrics """
+		
+		with self.__lock:
+			self.__endpoints = {}
+	
+	def snapshot( self, raw:Bool=False ) -> MutableMapping[Str,MutableMapping[Str,Any]]:
+		
+		"""
+		Return copy of metrics per-endpoint
+		
+		Parameters:
+			raw (Bool):
+				Keep latency as Histogram instead of summary
+		
+		Returns:
+			MutableMapping[Str,MutableMapping[Str,Any]]:
+		"""
+		
+		results = {}
+		with self.__lock:
+			for name, entry in self.__endpoints.items():
+				histogram = Histogram( entry['latency'].buckets )
+				histogram.count = entry['latency'].count
+				histogram.counts = [ *entry['latency'].counts ]
+				histogram.total = entry['latency'].total
+				results[name] = {
+					**entry,
+					"errors": { **entry['errors'] },
+					"latency": histogram,
+					"statuses": { **entry['statuses'] }
+				}
+		if raw is False:
+			for name, entry in results.items():
+				histogram = entry['latency']
+				failures = sum( count for status, count in entry['statuses'].items() if status >= 400 ) + sum( entry['errors'].values() )
+				attempts = entry['requests'] + sum( entry['errors'].values() )
+				entry['latency'] = {
+					"count": histogram.count,
+					"mean": histogram.total / histogram.count if histogram.count else None,
+					"p50": histogram.quantile( 0.5 ),
+					"p90": histogram.quantile( 0.9 ),
+					"p99": histogram.quantile( 0.99 )
+				}
+				entry['errorRate'] = failures / attempts if attempts else 0
+				entry['throughput'] = entry['streamed'] / entry['transfer'] if entry['transfer'] else None
+		return results
+	
+	def transfer( self, name:Str, received:Int, seconds:Float ) -> None:
+		
+		"""
+		Record streamed body transfer
+		
+		Parameters:
+			name (Str):
+				Endpoint label
+			received (Int):
+				Received body bytes
+			seconds (Float):
+				Seconds spent receiving body
+		"""
+		
+		with self.__lock:
+			entry = self.__entry( name )
+			entry['bytes'] += received
+			entry['streamed'] += received
+			entry['transfer'] += seconds
+	
+	...
+
+
+_Registry:Registry = Registry()
+""" Process Metrics Registry Instance """
+
+
+def _forked() -> None:
+	
+	""" Reset metrics registry in forked child, the parent keeps its own counters """
+	
+	global _Registry
+	_Registry = Registry()
+
+def metrics() -> Registry:
+	
+	""" Return process metrics registry """
+	
+	return _Registry
+
+
+register_at_fork( after_in_child=_forked )
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+
+#
+# @author hxAri (hxari)
+# @create 23-12-2024 17:30
+# @github https://github.com/hxAri/Kanashi
+#
+# Kanashi is an Open-Source project for doing various
+# things related to Instagram, e.g Login. Logout, Profile Info,
+# Follow, Unfollow, Media downloader, etc.
+#
+# Kanashi Copyright (c) 2024 - hxAri <hxari@proton.me>
+# Kanashi Licence under GNU General Public Licence v3
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+from builtins import int as Int, str as Str
+from os import register_at_fork
+from requests import Session
+from requests.adapters import HTTPAdapter
+from threading import local as ThreadLocal, Lock
+from time import monotonic
+from typing import Any, Callable, final, MutableMapping, Optional
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+__all__ = [
+	"AdapterFactory",
+	"PoolAdapter",
+	"PoolStats",
+	"SessionPool",
+	"sessions"
+]
+
+
+@final
+class PoolStats:
+	
+	""" Connection Pool Statistics """
+	
+	__hosts:MutableMapping[Str,MutableMapping[Str,Int]]
+	""" Statistics per-host """
+	
+	__lock:Lock
+	""" Statistics lock """
+	
+	def __init__( self ) -> None:
+		
+		""" Construct method of class PoolStats """
+		
+		self.__hosts = {}
+		self.__lock = Lock()
+	
+	def count( self, host:Str, keyset:Str ) -> None:
+		
+		"""
+		Increment host statistic counter
+		
+		Parameters:
+			host (Str):
+				Connection pool host
+			keyset (Str):
+				Counter name e.g hits, connections, evictions
+		"""
+		
+		with self.__lock:
+			if host not in self.__hosts:
+				self.__hosts[host] = { "hits": 0, "connections": 0, "evictions": 0 }
+			self.__hosts[host][keyset] += 1
+	
+	@property
+	def mapping( self ) -> MutableMapping[Str,Any]:
+		
+		""" Return snapshot of statistics """
+		
+		with self.__lock:
+			hosts = { host: { **counter } for host, counter in self.__hosts.items() }
+		totals = { "hits": 0, "connections": 0, "evictions": 0 }
+		for counter in hosts.values():
+			for keyset, value in counter.items():
+				totals[keyset] += value
+		return { **totals, "hosts": hosts }
+	
+	def reset( self ) -> None:
+		
+		""" Reset all statistics """
+		
+		with self.__lock:
+			self.__hosts = {}
+	
+	...
+
+
+def _PoolClass( base:type, stats:PoolStats, idle:Int ) -> type:
+	
+	"""
+	Build urllib3 connection pool class with statistics
+	
+	Parameters:
+		base (type):
+			Base urllib3 connection pool class
+		stats (PoolStats):
+			Statistics container
+		idle (Int):
+			Maximum idle seconds before keep-alive connection evicted
+	
+	Returns:
+		type:
+			Connection pool class
+	"""
+	
+	class ConnectionPool( base ):
+		
+		def _get_conn( self, timeout:Optional[float]=None ) -> Any:
+			conn = base._get_conn( self, timeout=timeout )
+			released = getattr( conn, "_kanashiReleased", None )
+			if released is not None:
+				del conn._kanashiReleased
+				if monotonic() - released >= idle:
+					conn.close()
+					stats.count( self.host, "evictions" )
+					stats.count( self.host, "connections" )
+				elif getattr( conn, "sock", None ) is None:
+					stats.count( self.host, "connections" )
+				else:
+					stats.count( self.host, "hits" )
+			return conn
+		
+		def _new_conn( self ) -> Any:
+			stats.count( self.host, "connections" )
+			return base._new_conn( self )
+		
+		def _put_conn( self, conn:Any ) -> None:
+			if conn is not None:
+				conn._kanashiReleased = monotonic()
+			base._put_conn( self, conn )
+		
+	ConnectionPool.__name__ = base.__name__
+	ConnectionPool.__qualname__ = base.__qualname__
+	return ConnectionPool
+
+
+class PoolAdapter( HTTPAdapter ):
+	
+	""" HTTP Adapter with Keep-Alive Statistics """
+	
+	idle:Int
+	""" Maximum idle seconds of keep-alive connection """
+	
+	stats:PoolStats
+	""" Connection pool statistics """
+	
+	def __init__( self, stats:PoolStats, idle:Int=30, **kwargs:Any ) -> None:
+		
+		"""
+		Construct method of class PoolAdapter
+		
+		Parameters:
+			stats (PoolStats):
+				Connection pool statistics
+			idle (Int):
+				Maximum idle seconds of keep-alive connection
+			kwargs (**Any):
+				HTTPAdapter key arguments
+		"""
+		
+		self.idle = idle
+		self.stats = stats
+		HTTPAdapter.__init__( self, **kwargs )
+	
+	def __setstate__( self, state:MutableMapping[Str,Any] ) -> None:
+		self.idle = state.pop( "idle", 30 )
+		self.stats = state.pop( "stats", PoolStats() )
+		HTTPAdapter.__setstate__( self, state )
+	
+	def init_poolmanager( self, connections:Int, maxsize:Int, block:bool=False, **kwargs:Any ) -> None:
+		HTTPAdapter.init_poolmanager( self, connections, maxsize, block=block, **kwargs )
+		self.poolmanager.pool_classes_by_scheme = {
+			"http": _PoolClass( HTTPConnectionPool, self.stats, self.idle ),
+			"https": _PoolClass( HTTPSConnectionPool, self.stats, self.idle )
+		}
+	
+	...
+
+
+AdapterFactory = Callable[...,HTTPAdapter]
+""" Adapter Factory Type, called with PoolAdapter key arguments """
+
+
+@final
+class SessionPool:
+	
+	"""
+	HTTP Session Pool Implementation
+	
+	Every thread owns its Session (cookies are not shared between
+	workers) but all sessions are mounted on the same adapter, so
+	keep-alive connections are reused across threads per-host.
+	
+	>>> pool = SessionPool( workers=10 )
+	>>> session = pool.session()
+	>>> session.get( "https://www.instagram.com" )
+	>>> pool.stats
+	"""
+	
+	__adapter:HTTPAdapter
+	""" Shared HTTP adapter """
+	
+	__factory:AdapterFactory
+	""" Shared HTTP adapter factory """
+	
+	__generation:Int
+	""" Adapter generation, changed when pool resized """
+	
+	__hosts:Int
+	""" Maximum number of cached host pools """
+	
+	__idle:Int
+	""" Maximum idle seconds of keep-alive connection """
+	
+	__local:ThreadLocal
+	""" Thread local sessions """
+	
+	__lock:Lock
+	""" Pool lock """
+	
+	__stats:PoolStats
+	""" Connection pool statistics """
+	
+	__workers:Int
+	""" Maximum keep-alive connection per-host """
+	
+	def __init__( self, workers:Int=10, hosts:Int=16, idle:Int=30 ) -> None:
+		
+		"""
+		Construct method of class SessionPool
+		
+		Parameters:
+			workers (Int):
+				Maximum keep-alive connection per-host, should be equal with worker threads
+			hosts (Int):
+				Maximum number of cached host pools
+			idle (Int):
+				Maximum idle seconds of keep-alive connection
+		"""
+		
+		self.__factory = PoolAdapter
+		self.__generation = 0
+		self.__hosts = hosts
+		self.__idle = idle
+		self.__local = ThreadLocal()
+		self.__lock = Lock()
+		self.__stats = PoolStats()
+		self.__workers = max( 1, workers )
+		self.__adapter = self.adapter()
+	
+	def adapter( self ) -> HTTPAdapter:
+		
+		""" Create new shared adapter """
+		
+		return self.__factory( 
+			stats=self.__stats, 
+			idle=self.__idle, 
+			pool_connections=self.__hosts, 
+			pool_maxsize=self.__workers 
+		)
+	
+	def close( self ) -> None:
+		
+		""" Close all keep-alive connections """
+		
+		with self.__lock:
+			self.__adapter.close()
+			self.__adapter = self.adapter()
+			self.__generation += 1
+	
+	def resize( self, workers:Int ) -> None:
+		
+		"""
+		Resize keep-alive connection per-host
+		
+		Parameters:
+			workers (Int):
+				Maximum keep-alive connection per-host
+		"""
+		
+		workers = max( 1, workers )
+		with self.__lock:
+			if workers == self.__workers:
+				return
+			self.__workers = workers
+			self.__adapter.close()
+			self.__adapter = self.adapter()
+			self.__generation += 1
+	
+	def session( self ) -> Session:
+		
+		""" Return current thread session """
+		
+		session = getattr( self.__local, "session", None )
+		generation = getattr( self.__local, "generation", None )
+		if session is None or generation != self.__generation:
+			with self.__lock:
+				adapter = self.__adapter
+				generation = self.__generation
+			session = Session()
+			session.mount( "http://", adapter )
+			session.mount( "https://", adapter )
+			self.__local.session = session
+			self.__local.generation = generation
+		return session
+	
+	@property
+	def stats( self ) -> MutableMapping[Str,Any]:
+		
+		""" Return snapshot of pool statistics """
+		
+		return { **self.__stats.mapping, "workers": self.__workers }
+	
+	def transport( self, factory:Optional[AdapterFactory]=None ) -> None:
+		
+		"""
+		Replace the transport adapter of all sessions
+		
+		Parameters:
+			factory (Optional[AdapterFactory]):
+				Adapter factory, none for default PoolAdapter
+		"""
+		
+		with self.__lock:
+			self.__factory = factory if factory is not None else PoolAdapter
+			self.__adapter.close()
+			self.__adapter = self.adapter()
+			self.__generation += 1
+	
+	@property
+	def workers( self ) -> Int:
+		
+		""" Maximum keep-alive connection per-host """
+		
+		return self.__workers
+	
+	...
+
+
+_SessionPool:Optional[SessionPool] = None
+""" Process Session Pool Instance """
+
+_SessionPoolLock:Lock = Lock()
+""" Process Session Pool Lock """
+
+
+def _forked() -> None:
+	
+	"""
+	Drop session pool inherited by forked child
+	
+	The inherited connections share sockets with the parent
+	so the child must open its own instead of reusing them.
+	"""
+	
+	global _SessionPool, _SessionPoolLock
+	_SessionPool = None
+	_SessionPoolLock = Lock()
+
+def sessions() -> SessionPool:
+	
+	""" Return process session pool """
+	
+	global _SessionPool
+	if _SessionPool is None:
+		with _SessionPoolLock:
+			if _SessionPool is None:
+				_SessionPool = SessionPool()
+	return _SessionPool
+
+
+register_at_fork( after_in_child=_forked )
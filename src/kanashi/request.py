@@ -21,17 +21,14 @@
 # along with this program. If not, see <https://www.gnu.org/licenses/>.
 #
 
-from brotli import decompress as BrotliDecompress, error as BrotliError
 from builtins import bool as Bool, int as Int, str as Str
-from gzip import BadGzipFile, decompress as GzipDecompress
-from pyzstd import decompress as ZstdDecompress, ZstdError
-from requests import Session
 from requests.exceptions import (
+	ChunkedEncodingError as RequestChunkedEncodingError, 
 	ConnectionError as RequestConnectionError, 
-	ConnectTimeout as RequestConnectionTimeout, 
-	RequestException as RequestError
+	Timeout as RequestTimeoutError
 )
-from time import sleep
+from os import register_at_fork
+from time import monotonic, sleep
 from traceback import format_exception
 from typing import ( 
 	Any, 
@@ -42,14 +39,20 @@ from typing import (
 )
 from urllib.parse import urlparse
 from urllib3.exceptions import (
-	ConnectionError as UrllibConnectionError,
-	ConnectTimeoutError as UrllibConnectTimeoutError,
-	RequestError as UrllibRequestError,
-	NewConnectionError as UrllibNewConnectionError
+	ProtocolError as UrllibProtocolError,
+	TimeoutError as UrllibTimeoutError
 )
 
 from kanashi.common import typeof
+from kanashi.decoder import decode, DecoderError
+from kanashi.errors import ProxyUnavailableError
+from kanashi.flight import frozen, SingleFlight
+from kanashi.limiter import limiter
 from kanashi.logger import Logger
+from kanashi.metrics import endpoint, metrics
+from kanashi.pool import sessions
+from kanashi.proxies import proxypool
+from kanashi.retry import Retry
 from kanashi.typing import Response
 
 
@@ -58,11 +61,31 @@ __all__ = [
 ]
 
 
+_Flights:SingleFlight = SingleFlight()
+""" In-flight Request Coalescing """
+
 _logger = Logger( __name__ )
 """ Logger Instance """
 
+_Retryable = (
+	RequestChunkedEncodingError,
+	RequestConnectionError,
+	RequestTimeoutError,
+	UrllibProtocolError,
+	UrllibTimeoutError,
+	*DecoderError
+)
+""" Retryable Request Exceptions """
+
 
-def request( method:Str, url:Str, auth:Optional[Tuple[Str,Str]]=None, data:Optional[MutableMapping[Str,Any]]=None, files:Optional[MutableMapping[Str,Any]]=None, cookies:Optional[MutableMapping[Str,Str]]=None, headers:Optional[MutableMapping[Str,Str]]=None, params:Optional[MutableMapping[Str,Str]]=None, payload:Optional[MutableMapping[Str,Any]]=None, proxies:Optional[MutableMapping[Str,Str]]=None, stream:Bool=False, verify:Optional[Bool]=None, timeout:Optional[Int]=None, tries:Int=10, thread:Union[Int,Str]=0 ) -> Optional[Response]:
+def _forked() -> None:
+	
+	""" Reset in-flight request coalescing in forked child """
+	
+	global _Flights
+	_Flights = SingleFlight()
+
+def request( method:Str, url:Str, auth:Optional[Tuple[Str,Str]]=None, data:Optional[MutableMapping[Str,Any]]=None, files:Optional[MutableMapping[Str,Any]]=None, cookies:Optional[MutableMapping[Str,Str]]=None, headers:Optional[MutableMapping[Str,Str]]=None, params:Optional[MutableMapping[Str,Str]]=None, payload:Optional[MutableMapping[Str,Any]]=None, proxies:Optional[MutableMapping[Str,Str]]=None, stream:Bool=False, verify:Optional[Bool]=None, timeout:Optional[Int]=None, tries:Int=10, retry:Optional[Retry]=None, coalesce:Bool=True, thread:Union[Int,Str]=0 ) -> Optional[Response]:
 	
 	"""
 	Send HTTP Request
@@ -87,56 +110,83 @@ def request( method:Str, url:Str, auth:Optional[Tuple[Str,Str]]=None, data:Optio
 		payload (Optional[MutableMapping[Str,Any]]):
 			Http request application/json
 		proxies (Optional[MutableMapping[Str,Any]]):
-			Http request proxies
+			Http request proxies, when not given and the proxy pool
+			is configured the proxy is assigned by account session
+			or thread position number
 		stream (Bool):
-			Allow request stream
+			Allow request stream, the response body is not read
+			and must be consumed with Response.iterate
 		verify (Optional[Bool]):
 			Verify http request
 		timeout (Optional[Int]):
 			Http request timeout
 		tries (Int):
-			Http request timeout tries
+			Http request maximum attempts, used when retry is not given
+		retry (Optional[Retry]):
+			Http request retry policy
+		coalesce (Bool):
+			Share one in-flight fetch between identical concurrent
+			GET requests, every follower receives its own copy of
+			the response and streamed requests are never shared
 		thread (Int|Str):
 			Current thread position number
 	
 	Returns:
 		response (Optional[Response]):
 			Request response
+	
+	Raises:
+		ExceptionGroup:
+			Raises when all retryable attempts are failed
+		ProxyUnavailableError:
+			Raises when proxy pool is configured and every proxy is evicted
 	"""
 	
-	counter = 0
-	session = Session()
+	if coalesce is True and stream is False and method in ( "GET", "HEAD" ) and data is None and files is None and payload is None:
+		keyset = tuple([ method, url, frozen( params ), frozen( headers ), frozen( cookies ), frozen( proxies ), auth ])
+		response, shared = _Flights.do( keyset, request, method, url, auth=auth, cookies=cookies, headers=headers, params=params, proxies=proxies, verify=verify, timeout=timeout, tries=tries, retry=retry, coalesce=False, thread=thread )
+		if shared is True and response is not None:
+			_logger.debug( "Shared in-flight {} url=\"{}\"", method, url, thread=thread )
+			return response.copy()
+		return response
+	attempt = 0
+	label = endpoint( url, payload if payload is not None else data )
+	policy = retry if retry is not None else Retry( tries=tries )
+	pool = proxypool() if not proxies else None
+	proxy = None
+	session = sessions().session()
+	started = monotonic()
 	throwned = []
-	throwable = [
-		RequestConnectionError, 
-		RequestConnectionTimeout, 
-		RequestError,
-		UrllibConnectionError,
-		UrllibConnectTimeoutError,
-		UrllibRequestError,
-		UrllibNewConnectionError
-	]
-	continueable = ( 
-		RequestConnectionError, 
-		RequestConnectionTimeout, 
-		UrllibConnectionError,
-		UrllibConnectTimeoutError,
-		UrllibNewConnectionError
-	)
-	if tries <= 0:
-		tries = 10
 	urlparsed = urlparse( url )
 	urlsimple = f"{urlparsed.scheme}://{urlparsed.netloc}{urlparsed.path}"
-	while counter <= 10:
-		_logger.warning( "Request {} url=\"{}\"", method, urlsimple, thread=thread )
+	anonymous = not cookies or "sessionid" not in cookies
+	sticky = object() if anonymous else cookies['sessionid']
+	while True:
+		attempt += 1
+		waited = limiter().acquire( url )
+		if waited > 0:
+			_logger.debug( "Rate limited {} url=\"{}\" delay={:.2f}", method, urlsimple, waited, thread=thread )
+		_logger.warning( "Request {method} url=\"{url}\"", method=method, url=urlsimple, attempt=attempt, thread=thread )
+		sent = monotonic()
 		try:
+			if pool is not None:
+				proxy = pool.assign( sticky )
+				while proxy is None:
+					delay = pool.delay()
+					if delay is None:
+						raise ProxyUnavailableError( f"Every proxy of the pool is evicted, refused to send {method} request to url=\"{urlsimple}\" directly" )
+					_logger.warning( "Waiting proxy cooldown {} url=\"{}\" delay={:.2f}", method, urlsimple, delay, thread=thread )
+					sleep( delay )
+					proxy = pool.assign( sticky )
+				proxies = proxy.mapping
+				sent = monotonic()
 			response = session.request( 
 				url=url, 
 				auth=auth,
 				data=data, 
 				files=files,
 				json=payload, 
-				stream=stream,
+				stream=True,
 				method=method, 
 				cookies=cookies, 
 				headers=headers, 
@@ -144,7 +194,17 @@ def request( method:Str, url:Str, auth:Optional[Tuple[Str,Str]]=None, data:Optio
 				proxies=proxies,
 				params=params 
 			)
-			_logger.warning( "Response {} url=\"{}\" code={}", method, urlsimple, response.status_code, thread=thread )
+			_logger.warning( "Response {method} url=\"{url}\" code={status} duration={duration:.3f}", method=method, url=urlsimple, status=response.status_code, duration=monotonic() - sent, endpoint=label, thread=thread )
+			if pool is not None and proxy is not None:
+				pool.report( proxy, monotonic() - sent, response.status_code )
+			if policy.retryable( response.status_code, method ):
+				delay = policy.delay( attempt, started, response.headers.get( "Retry-After" ) )
+				if delay is not None:
+					_logger.warning( "Retrying {} url=\"{}\" code={} attempt={} delay={:.2f}", method, urlsimple, response.status_code, attempt, delay, thread=thread )
+					metrics().observe( label, response.status_code, monotonic() - sent, retried=True )
+					response.close()
+					sleep( delay )
+					continue
 			encoding = response.headers['Content-Encoding'] \
 				if "Content-Encoding" in response.headers \
 				else None
@@ -154,24 +214,35 @@ def request( method:Str, url:Str, auth:Optional[Tuple[Str,Str]]=None, data:Optio
 				parts = response.headers['Content-Type'].split( "\x3b" )
 				characterSet = parts[1].strip( "\x20" ).split( "\x3d" ).pop() if len( parts ) >= 2 else None
 				contentType = parts[0].strip( "\x20" )
+			if stream is True:
+				metrics().observe( label, response.status_code, monotonic() - sent )
+				return Response(
+					url=response.url,
+					type=contentType,
+					status=response.status_code,
+					payload=payload if payload is not None else data,
+					content=None,
+					cookies=response.cookies,
+					headers=response.headers,
+					charset=characterSet,
+					encoding=encoding,
+					stream=response
+				)
+			content = bytearray()
 			try:
 				if encoding is not None:
 					_logger.warning( "Trying to decompress content={} url=\"{}\"", encoding, urlsimple, thread=thread )
-					content = response._content
-					match encoding:
-						case "br":
-							content = BrotliDecompress( response.content )
-						case "gzip":
-							content = GzipDecompress( response.content )
-						case "zstd":
-							content = ZstdDecompress( response.content )
-					response._content = content
-				...
-			except( BadGzipFile, BrotliError, ZstdError ) as e:
-				_logger.critical( "{}: {}", typeof( e ), "\x0a".join( format_exception( e ) ), thread=thread )
+				for chunk in decode( response.raw, encoding ):
+					content.extend( chunk )
+			except DecoderError:
+				response.close()
+				raise
+			response._content = bytes( content )
+			response._content_consumed = True
+			metrics().observe( label, response.status_code, monotonic() - sent, len( content ) )
+			del content
 			return Response(
 				url=response.url,
-				text=response.text,
 				type=contentType,
 				status=response.status_code,
 				payload=payload if payload is not None else data,
@@ -181,17 +252,26 @@ def request( method:Str, url:Str, auth:Optional[Tuple[Str,Str]]=None, data:Optio
 				charset=characterSet,
 				encoding=encoding
 			)
-		except BaseException as e:
-			instance = type( e )
-			throwable.append( e )
+		except _Retryable as e:
+			throwned.append( e )
 			_logger.error( "{}: {}", typeof( e ), "\x0a".join( format_exception( e ) ), thread=thread )
-			if instance in throwable:
-				if isinstance( e, continueable ):
-					counter += 1
-					sleep( 2 )
-					continue
-			if throwned:
+			delay = policy.delay( attempt, started )
+			if pool is not None and proxy is not None:
+				pool.report( proxy, error=e )
+			metrics().error( label, e, retried=delay is not None )
+			if delay is None:
 				raise ExceptionGroup( f"An error occurred while sending a {method} request to url=\"{urlsimple}\"", throwned ) from e
+			_logger.warning( "Retrying {} url=\"{}\" attempt={} delay={:.2f}", method, urlsimple, attempt, delay, thread=thread )
+			sleep( delay )
+		except BaseException as e:
+			_logger.error( "{}: {}", typeof( e ), "\x0a".join( format_exception( e ) ), thread=thread )
+			metrics().error( label, e )
 			raise e
+		finally:
+			if pool is not None and anonymous is True:
+				pool.release( sticky )
+			session.cookies.clear()
 	...
 
+
+register_at_fork( after_in_child=_forked )
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+
+#
+# @author hxAri (hxari)
+# @create 23-12-2024 17:30
+# @github https://github.com/hxAri/Kanashi
+#
+# Kanashi is an Open-Source project for doing various
+# things related to Instagram, e.g Login. Logout, Profile Info,
+# Follow, Unfollow, Media downloader, etc.
+#
+# Kanashi Copyright (c) 2024 - hxAri <hxari@proton.me>
+# Kanashi Licence under GNU General Public Licence v3
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+from builtins import bool as Bool, float as Float, int as Int, str as Str
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from random import uniform
+from time import monotonic
+from typing import final, FrozenSet, Iterable, Optional
+
+
+__all__ = [
+	"Idempotent",
+	"Retry"
+]
+
+
+Idempotent:FrozenSet[Str] = frozenset([ "GET", "HEAD", "OPTIONS" ])
+""" Idempotent request methods retried by default """
+
+
+@final
+class Retry:
+	
+	"""
+	HTTP Request Retry Policy
+	
+	Delays grow exponentially with full jitter, so workers that
+	failed at the same time do not retry at the same time, the
+	Retry-After header is honoured when the server sends it.
+	Response statuses are only retried for idempotent methods, a
+	non-idempotent request e.g POST may already be acted by the
+	server, so it must be enabled explicitly.
+	
+	>>> policy = Retry( tries=5, backoff=0.5, maximum=30, deadline=120 )
+	>>> started = monotonic()
+	>>> delay = policy.delay( attempt, started, response.headers.get( "Retry-After" ) )
+	>>> if delay is None:
+	>>>     raise error
+	>>> sleep( delay )
+	>>> policy = Retry( methods=[ *Idempotent, "POST" ] )
+	"""
+	
+	__slots__ = (
+		"backoff",
+		"deadline",
+		"maximum",
+		"methods",
+		"statuses",
+		"tries"
+	)
+	
+	backoff:Float
+	""" Base delay in seconds """
+	
+	deadline:Optional[Float]
+	""" Total seconds allowed for all attempts """
+	
+	maximum:Float
+	""" Maximum delay in seconds per attempt """
+	
+	methods:FrozenSet[Str]
+	""" Request methods retried on retryable response status """
+	
+	statuses:FrozenSet[Int]
+	""" Retryable response status codes """
+	
+	tries:Int
+	""" Maximum number of attempts """
+	
+	def __init__( self, tries:Int=10, backoff:Float=0.5, maximum:Float=30, deadline:Optional[Float]=300, statuses:Iterable[Int]=( 429, 500, 502, 503, 504 ), methods:Iterable[Str]=Idempotent ) -> None:
+		
+		"""
+		Construct method of class Retry
+		
+		Parameters:
+			tries (Int):
+				Maximum number of attempts
+			backoff (Float):
+				Base delay in seconds
+			maximum (Float):
+				Maximum delay in seconds per attempt
+			deadline (Optional[Float]):
+				Total seconds allowed for all attempts, none is unlimited
+			statuses (Iterable[Int]):
+				Retryable response status codes
+			methods (Iterable[Str]):
+				Request methods retried on retryable response status
+		"""
+		
+		self.backoff = max( 0, backoff )
+		self.deadline = deadline
+		self.maximum = max( self.backoff, maximum )
+		self.methods = frozenset( method.upper() for method in methods )
+		self.statuses = frozenset( statuses )
+		self.tries = tries if tries >= 1 else 10
+	
+	def __repr__( self ) -> Str:
+		return f"<Retry tries={self.tries} backoff={self.backoff} maximum={self.maximum} deadline={self.deadline} />"
+	
+	def after( self, value:Optional[Str] ) -> Optional[Float]:
+		
+		"""
+		Parse Retry-After header value
+		
+		Parameters:
+			value (Optional[Str]):
+				Retry-After header value, seconds or http date
+		
+		Returns:
+			Optional[Float]:
+				Seconds to wait, none when value is invalid
+		"""
+		
+		if not value:
+			return None
+		value = value.strip( "\x20" )
+		if value.isdigit():
+			return Float( value )
+		try:
+			retryAt = parsedate_to_datetime( value )
+		except ( TypeError, ValueError ):
+			return None
+		if retryAt.tzinfo is None:
+			retryAt = retryAt.replace( tzinfo=timezone.utc )
+		return max( 0, ( retryAt - datetime.now( timezone.utc ) ).total_seconds() )
+	
+	def delay( self, attempt:Int, started:Float, after:Optional[Str]=None ) -> Optional[Float]:
+		
+		"""
+		Return seconds to wait before next attempt
+		
+		Parameters:
+			attempt (Int):
+				Number of attempts already done
+			started (Float):
+				Monotonic time of first attempt
+			after (Optional[Str]):
+				Retry-After header value
+		
+		Returns:
+			Optional[Float]:
+				Seconds to wait, none when retry is exhausted
+		"""
+		
+		if attempt >= self.tries:
+			return None
+		delay = uniform( 0, min( self.maximum, self.backoff * ( 1 << min( attempt -1, 32 ) ) ) )
+		retryAfter = self.after( after )
+		if retryAfter is not None:
+			delay = retryAfter + uniform( 0, self.backoff )
+		if self.deadline is not None:
+			if monotonic() - started + delay > self.deadline:
+				return None
+		return delay
+	
+	def retryable( self, status:Int, method:Str="GET" ) -> Bool:
+		
+		"""
+		Return whether response status is retryable
+		
+		Parameters:
+			status (Int):
+				Response status code
+			method (Str):
+				Request method
+		
+		Returns:
+			Bool:
+		"""
+		
+		return status in self.statuses and method.upper() in self.methods
+	
+	...
@@ -0,0 +1,504 @@
+#!/usr/bin/env python3
+
+#
+# @author hxAri (hxari)
+# @create 23-12-2024 17:30
+# @github https://github.com/hxAri/Kanashi
+#
+# Kanashi is an Open-Source project for doing various
+# things related to Instagram, e.g Login. Logout, Profile Info,
+# Follow, Unfollow, Media downloader, etc.
+#
+# Kanashi Copyright (c) 2024 - hxAri <hxari@proton.me>
+# Kanashi Licence under GNU General Public Licence v3
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+from builtins import bytes as Bytes, float as Float, int as Int, str as Str
+from email.message import Message
+from hashlib import sha256
+from io import BytesIO, RawIOBase
+from json import dumps as JsonEncoder, loads as JsonDecoder
+from os import makedirs as mkdir, remove, replace
+from os.path import isdir, isfile
+from requests import PreparedRequest, Response as RequestResponse
+from requests.adapters import HTTPAdapter
+from tempfile import mkstemp
+from threading import Lock
+from time import sleep
+from typing import ( 
+	Any, 
+	final, 
+	MutableMapping, 
+	MutableSequence, 
+	Optional, 
+	Sequence 
+)
+from urllib.parse import parse_qsl
+from urllib3 import HTTPHeaderDict, HTTPResponse
+
+from kanashi.constant import BasePath
+from kanashi.errors import TransportError
+from kanashi.logger import Logger
+from kanashi.pool import PoolAdapter, PoolStats
+
+
+__all__ = [
+	"Cassette",
+	"RecordAdapter",
+	"ReplayAdapter",
+	"SamplesPath"
+]
+
+
+_logger = Logger( __name__ )
+""" Logger Instance """
+
+SamplesPath:Str = f"{BasePath}/resources/samples"
+""" Cassettes stored pathname """
+
+
+def _keyset( request:PreparedRequest, fields:Optional[Sequence[Str]]=None ) -> Str:
+	
+	"""
+	Return interaction key of prepared request
+	
+	The Range and If-Range headers are part of the key, so every
+	byte range of the same url is recorded as its own interaction.
+	
+	Parameters:
+		request (PreparedRequest):
+			Prepared request
+		fields (Optional[Sequence[Str]]):
+			Body fields included into the key, none for the whole body
+	
+	Returns:
+		Str:
+			Interaction key
+	"""
+	
+	body = request.body if request.body is not None else b""
+	if isinstance( body, Str ):
+		body = body.encode( "UTF-8" )
+	if not isinstance( body, ( bytes, bytearray ) ):
+		body = b""
+	if fields is not None:
+		body = _fields( request, Bytes( body ), fields )
+	parts = [ request.method.encode(), request.url.encode(), body ]
+	for keyset in ( "Range", "If-Range" ):
+		if keyset in request.headers:
+			parts.append( f"{keyset}: {request.headers[keyset]}".encode() )
+	return sha256( b"\x0a".join( parts ) ).hexdigest()
+
+
+def _fields( request:PreparedRequest, body:Bytes, fields:Sequence[Str] ) -> Bytes:
+	
+	"""
+	Return canonical body of selected fields
+	
+	JSON and form encoded bodies are parsed and only the selected
+	fields are kept, so volatile values e.g timestamps or nonces
+	do not change the interaction key. Any other body is ignored.
+	
+	Parameters:
+		request (PreparedRequest):
+			Prepared request
+		body (Bytes):
+			Encoded request body
+		fields (Sequence[Str]):
+			Body fields included into the key
+	
+	Returns:
+		Bytes:
+			Canonical body
+	"""
+	
+	mapping = None
+	content = request.headers.get( "Content-Type", "" )
+	try:
+		if "json" in content:
+			mapping = JsonDecoder( body )
+		elif "x-www-form-urlencoded" in content:
+			mapping = dict( parse_qsl( body.decode( "UTF-8" ), keep_blank_values=True ) )
+	except ( UnicodeDecodeError, ValueError ):
+		mapping = None
+	if not isinstance( mapping, dict ):
+		return b""
+	selected = { keyset: mapping[keyset] for keyset in fields if keyset in mapping }
+	return JsonEncoder( selected, sort_keys=True ).encode( "UTF-8" )
+
+
+@final
+class Cassette:
+	
+	"""
+	Recorded HTTP Exchanges
+	
+	Interactions are appended into cassette.jsonl and the raw
+	(still encoded) bodies are stored by its sha256 digest, so
+	replay exercises the same decoding path as the network.
+	
+	>>> cassette = Cassette( "profile-posts", fields=[ "query_hash", "variables" ] )
+	>>> cassette.interactions
+	"""
+	
+	__cursors:MutableMapping[Str,Int]
+	""" Replay cursor per-interaction key """
+	
+	__interactions:MutableMapping[Str,MutableSequence[MutableMapping[Str,Any]]]
+	""" Recorded interactions per-key """
+	
+	__lock:Lock
+	""" Cassette lock """
+	
+	fields:Optional[Sequence[Str]]
+	""" Body fields included into interaction key, none for the whole body """
+	
+	pathname:Str
+	""" Cassette pathname """
+	
+	def __init__( self, name:Str, pathname:Str=SamplesPath, fields:Optional[Sequence[Str]]=None ) -> None:
+		
+		"""
+		Construct method of class Cassette
+		
+		Parameters:
+			name (Str):
+				Cassette name
+			pathname (Str):
+				Cassettes stored pathname
+			fields (Optional[Sequence[Str]]):
+				Body fields included into interaction key, none for the whole body
+		"""
+		
+		self.__cursors = {}
+		self.fields = [ *fields ] if fields is not None else None
+		self.__interactions = {}
+		self.__lock = Lock()
+		self.pathname = f"{pathname}/{name}"
+		if not isdir( self.pathname ):
+			mkdir( self.pathname, exist_ok=True )
+		if isfile( self.index ):
+			with open( self.index, "r", encoding="UTF-8" ) as fopen:
+				for line in fopen:
+					if line.strip():
+						interaction = JsonDecoder( line )
+						self.__interactions.setdefault( interaction['key'], [] ).append( interaction )
+				fopen.close()
+	
+	def append( self, interaction:MutableMapping[Str,Any] ) -> None:
+		
+		"""
+		Append recorded interaction
+		
+		Parameters:
+			interaction (MutableMapping[Str,Any]):
+				Recorded interaction
+		"""
+		
+		with self.__lock:
+			self.__interactions.setdefault( interaction['key'], [] ).append( interaction )
+			with open( self.index, "a", encoding="UTF-8" ) as fopen:
+				fopen.write( JsonEncoder( interaction ) )
+				fopen.write( "\x0a" )
+				fopen.close()
+	
+	def body( self, digest:Str ) -> Str:
+		
+		""" Return body filename of digest """
+		
+		return f"{self.pathname}/{digest}"
+	
+	def keyset( self, request:PreparedRequest ) -> Str:
+		
+		"""
+		Return interaction key of prepared request
+		
+		Parameters:
+			request (PreparedRequest):
+				Prepared request
+		
+		Returns:
+			Str:
+				Interaction key
+		"""
+		
+		return _keyset( request, self.fields )
+	
+	@property
+	def index( self ) -> Str:
+		
+		""" Cassette index filename """
+		
+		return f"{self.pathname}/cassette.jsonl"
+	
+	@property
+	def interactions( self ) -> Int:
+		
+		""" Number of recorded interactions """
+		
+		return sum( len( values ) for values in self.__interactions.values() )
+	
+	def next( self, keyset:Str ) -> Optional[MutableMapping[Str,Any]]:
+		
+		"""
+		Return next recorded interaction of key, the last
+		interaction is repeated when the key is exhausted
+		
+		Parameters:
+			keyset (Str):
+				Interaction key
+		
+		Returns:
+			Optional[MutableMapping[Str,Any]]:
+				Recorded interaction, none when never recorded
+		"""
+		
+		with self.__lock:
+			interactions = self.__interactions.get( keyset )
+			if not interactions:
+				return None
+			cursor = self.__cursors.get( keyset, 0 )
+			self.__cursors[keyset] = cursor +1
+			return interactions[min( cursor, len( interactions ) -1 )]
+	
+	...
+
+
+class _Original:
+	
+	""" Minimal http.client response for cookie extraction """
+	
+	def __init__( self, headers:MutableSequence[MutableSequence[Str]] ) -> None:
+		self.msg = Message()
+		for keyset, value in headers:
+			self.msg[keyset] = value
+	
+	def isclosed( self ) -> bool:
+		return True
+	
+	...
+
+
+class _Throttled( BytesIO ):
+	
+	""" Body reader limited by bandwidth """
+	
+	def __init__( self, content:Bytes, bandwidth:Optional[Float] ) -> None:
+		BytesIO.__init__( self, content )
+		self.bandwidth = bandwidth
+	
+	def read( self, size:Optional[Int]=-1 ) -> Bytes:
+		chunk = BytesIO.read( self, size )
+		if self.bandwidth and chunk:
+			sleep( len( chunk ) / self.bandwidth )
+		return chunk
+	
+	...
+
+
+class _Recorder( RawIOBase ):
+	
+	"""
+	Body reader which tees the raw body into the cassette
+	
+	The interaction is appended once the body is fully read, a
+	body closed before its end is discarded and never recorded.
+	"""
+	
+	def __init__( self, source:HTTPResponse, cassette:Cassette, interaction:MutableMapping[Str,Any] ) -> None:
+		RawIOBase.__init__( self )
+		descriptor, self.temporary = mkstemp( dir=cassette.pathname )
+		self.cassette = cassette
+		self.digest = sha256()
+		self.finished = False
+		self.handle = open( descriptor, "wb" )
+		self.interaction = interaction
+		self.source = source
+	
+	def __finish( self ) -> None:
+		self.finished = True
+		self.handle.close()
+		digest = self.digest.hexdigest()
+		replace( self.temporary, self.cassette.body( digest ) )
+		self.cassette.append({ **self.interaction, "body": digest })
+		self.source.release_conn()
+		_logger.debug( "Recorded {} url=\"{}\" code={}", self.interaction['method'], self.interaction['url'], self.interaction['status'] )
+	
+	def close( self ) -> None:
+		if self.closed:
+			return
+		try:
+			if self.finished is False:
+				self.read( 1 )
+		finally:
+			if self.finished is False:
+				self.handle.close()
+				remove( self.temporary )
+				self.source.close()
+			RawIOBase.close( self )
+	
+	def read( self, size:Optional[Int]=-1 ) -> Bytes:
+		if self.finished is True:
+			return b""
+		chunk = self.source.read( size if size is not None and size >= 0 else None, decode_content=False )
+		if chunk:
+			self.digest.update( chunk )
+			self.handle.write( chunk )
+		else:
+			self.__finish()
+		return chunk
+	
+	def readable( self ) -> bool:
+		return True
+	
+	def readinto( self, buffer:Any ) -> Int:
+		chunk = self.read( len( buffer ) )
+		buffer[:len( chunk )] = chunk
+		return len( chunk )
+	
+	...
+
+
+class RecordAdapter( PoolAdapter ):
+	
+	"""
+	Recording Transport Adapter
+	
+	Requests are sent to the network as usual and the raw body is
+	written into the cassette while the caller streams it, so the
+	body is never buffered in memory.
+	
+	>>> sessions().transport( RecordAdapter.factory( Cassette( "posts" ) ) )
+	"""
+	
+	cassette:Cassette
+	""" Recording cassette """
+	
+	def __init__( self, cassette:Cassette, stats:PoolStats, idle:Int=30, **kwargs:Any ) -> None:
+		
+		"""
+		Construct method of class RecordAdapter
+		
+		Parameters:
+			cassette (Cassette):
+				Recording cassette
+			stats (PoolStats):
+				Connection pool statistics
+			idle (Int):
+				Maximum idle seconds of keep-alive connection
+			kwargs (**Any):
+				HTTPAdapter key arguments
+		"""
+		
+		self.cassette = cassette
+		PoolAdapter.__init__( self, stats, idle, **kwargs )
+	
+	@staticmethod
+	def factory( cassette:Cassette ) -> Any:
+		
+		""" Return adapter factory for SessionPool.transport """
+		
+		return lambda **kwargs: RecordAdapter( cassette, **kwargs )
+	
+	def send( self, request:PreparedRequest, stream:bool=False, **kwargs:Any ) -> RequestResponse:
+		response = PoolAdapter.send( self, request, stream=True, **kwargs )
+		headers = [ [ keyset, value ] for keyset, value in response.raw.headers.items() ]
+		interaction = {
+			"key": self.cassette.keyset( request ),
+			"method": request.method,
+			"url": request.url,
+			"status": response.status_code,
+			"reason": response.reason,
+			"headers": headers
+		}
+		response.raw = HTTPResponse(
+			body=_Recorder( response.raw, self.cassette, interaction ),
+			headers=HTTPHeaderDict( headers ),
+			status=response.status_code,
+			reason=response.reason,
+			preload_content=False,
+			decode_content=False
+		)
+		return response
+	
+	...
+
+
+class ReplayAdapter( HTTPAdapter ):
+	
+	"""
+	Replaying Transport Adapter
+	
+	Nothing is sent to the network, exchanges are served from
+	the cassette with configurable latency and bandwidth.
+	
+	>>> sessions().transport( ReplayAdapter.factory( Cassette( "posts" ), latency=0.2, bandwidth=1 << 20 ) )
+	"""
+	
+	bandwidth:Optional[Float]
+	""" Replay bandwidth in bytes per second, none is unlimited """
+	
+	cassette:Cassette
+	""" Replaying cassette """
+	
+	latency:Float
+	""" Replay latency in seconds before response headers """
+	
+	def __init__( self, cassette:Cassette, latency:Float=0, bandwidth:Optional[Float]=None, **kwargs:Any ) -> None:
+		
+		"""
+		Construct method of class ReplayAdapter
+		
+		Parameters:
+			cassette (Cassette):
+				Replaying cassette
+			latency (Float):
+				Replay latency in seconds before response headers
+			bandwidth (Optional[Float]):
+				Replay bandwidth in bytes per second, none is unlimited
+			kwargs (**Any):
+				Ignored PoolAdapter key arguments
+		"""
+		
+		self.bandwidth = bandwidth
+		self.cassette = cassette
+		self.latency = latency
+		HTTPAdapter.__init__( self )
+	
+	@staticmethod
+	def factory( cassette:Cassette, latency:Float=0, bandwidth:Optional[Float]=None ) -> Any:
+		
+		""" Return adapter factory for SessionPool.transport """
+		
+		return lambda **kwargs: ReplayAdapter( cassette, latency=latency, bandwidth=bandwidth )
+	
+	def send( self, request:PreparedRequest, stream:bool=False, **kwargs:Any ) -> RequestResponse:
+		interaction = self.cassette.next( self.cassette.keyset( request ) )
+		if interaction is None:
+			raise TransportError( f"No recorded interaction for {request.method} url=\"{request.url}\"" )
+		if self.latency > 0:
+			sleep( self.latency )
+		with open( self.cassette.body( interaction['body'] ), "rb" ) as fopen:
+			content = fopen.read()
+			fopen.close()
+		raw = HTTPResponse(
+			body=_Throttled( content, self.bandwidth ),
+			headers=HTTPHeaderDict( interaction['headers'] ),
+			status=interaction['status'],
+			reason=interaction['reason'],
+			preload_content=False,
+			decode_content=False,
+			original_response=_Original( interaction['headers'] )
+		)
+		return self.build_response( request, raw )
+	
+	...
@@ -27,7 +27,20 @@ from re import IGNORECASE
 from re import match
 from requests.cookies import RequestsCookieJar
 from requests.structures import CaseInsensitiveDict
-from typing import Any, final, MutableMapping, MutableSequence, Union
+from time import monotonic
+from typing import (
+	Any, 
+	AsyncIterable, 
+	final, 
+	Iterable, 
+	MutableMapping, 
+	MutableSequence, 
+	Optional, 
+	Union
+)
+
+from kanashi.decoder import adecode, decode
+from kanashi.metrics import endpoint, metrics
 
 
 __all__ = [
@@ -35,17 +48,44 @@ __all__ = [
 ]
 
 
+_Unparsed:object = object()
+""" Sentinel of unparsed json content """
+
+
 @final
 class Response:
 	
-	""" HTTP Request Typing Implementation """
+	"""
+	HTTP Request Typing Implementation
+	
+	The text is decoded on first access and the json is parsed
+	at most once, binary response never pays for decoding.
+	"""
+	
+	__slots__ = (
+		"__json",
+		"__text",
+		"charset",
+		"content",
+		"cookies",
+		"encoding",
+		"headers",
+		"payload",
+		"status",
+		"stream",
+		"type",
+		"url"
+	)
+	
+	__json:Any
+	""" HTTP Response parsed json cache """
+	
+	__text:Optional[Str]
+	""" HTTP Response decoded text cache """
 	
 	url:Str
 	""" HTTP Request URL """
 	
-	text:Str
-	""" HTTP Response content raw """
-	
 	type:Str
 	""" HTTP Response content type """
 	
@@ -70,7 +110,10 @@ class Response:
 	encoding:Str
 	""" HTTP Response content encoding """
 	
-	def __init__( self, url:Str, text:Str, type:Str, status:Int, payload:Any, content:Bytes, cookies:RequestsCookieJar, headers:CaseInsensitiveDict, charset:Str, encoding:Str ) -> None:
+	stream:Optional[Any]
+	""" HTTP Response unread body stream, requests or aiohttp response """
+	
+	def __init__( self, url:Str, type:Str, status:Int, payload:Any, content:Bytes, cookies:RequestsCookieJar, headers:CaseInsensitiveDict, charset:Str, encoding:Str, text:Optional[Str]=None, stream:Optional[Any]=None ) -> None:
 		
 		"""
 		Construct method of class Response
@@ -78,8 +121,6 @@ class Response:
 		Parameters:
 			url (Str):
 				Request url
-			text (Str):
-				Request response text
 			type (Str):
 				Request response content type
 			status (Int):
@@ -96,10 +137,15 @@ class Response:
 				Request response content character set
 			encoding (Str):
 				Request response content encoding
+			text (Optional[Str]):
+				Request response text, decoded from content when omitted
+			stream (Optional[Any]):
+				Request response unread body stream
 		"""
 		
+		self.__json = _Unparsed
+		self.__text = text
 		self.url = url
-		self.text = text
 		self.type = type
 		self.status = status
 		self.payload = payload
@@ -108,10 +154,73 @@ class Response:
 		self.headers = headers
 		self.charset = charset
 		self.encoding = encoding
+		self.stream = stream
 	
 	def __repr__( self ) -> Str:
 		return f"<Response url=\"{self.url}\" type={self.type} status={self.status} charset={self.charset} encoding={self.encoding} />"
 	
+	async def aiterate( self, size:Int=65536 ) -> AsyncIterable[Bytes]:
+		
+		"""
+		Iterate response body chunks of asynchronous request
+		
+		Parameters:
+			size (Int):
+				Maximum chunk size in bytes
+		
+		Returns:
+			chunks (AsyncIterable[Bytes]):
+				Async iterable of response body chunks
+		"""
+		
+		if self.stream is None:
+			for chunk in self.iterate( size ):
+				yield chunk
+			return
+		received = 0
+		started = monotonic()
+		try:
+			async for chunk in adecode( self.stream.content, self.encoding, size ):
+				received += len( chunk )
+				yield chunk
+		finally:
+			metrics().transfer( endpoint( self.url, self.payload ), received, monotonic() - started )
+			self.close()
+	
+	def copy( self ) -> "Response":
+		
+		"""
+		Return copy of buffered response
+		
+		Headers and cookies are copied and the json is parsed again
+		by the copy, so a caller mutating its response or parsed json
+		does not affect the others.
+		
+		Returns:
+			Response:
+		"""
+		
+		return Response(
+			url=self.url,
+			type=self.type,
+			status=self.status,
+			payload=self.payload,
+			content=self.content,
+			cookies=self.cookies.copy() if self.cookies is not None else None,
+			headers=CaseInsensitiveDict( self.headers ) if self.headers is not None else None,
+			charset=self.charset,
+			encoding=self.encoding,
+			text=self.__text
+		)
+	
+	def close( self ) -> None:
+		
+		""" Release the response body stream connection """
+		
+		if self.stream is not None:
+			self.stream.close()
+			self.stream = None
+	
 	@property
 	def isApplicationJson( self ) -> Bool:
 		return match( "^(?:application/json)$", self.type if self.type is not None else "", IGNORECASE ) is not None
@@ -120,10 +229,56 @@ class Response:
 	def isJavaScript( self ) -> Bool:
 		return match( "^(?:text/javascript)$", self.type if self.type is not None else "", IGNORECASE ) is not None
 	
+	def iterate( self, size:Int=65536 ) -> Iterable[Bytes]:
+		
+		"""
+		Iterate response body chunks
+		
+		Parameters:
+			size (Int):
+				Maximum chunk size in bytes
+		
+		Returns:
+			chunks (Iterable[Bytes]):
+				Iterable of response body chunks
+		"""
+		
+		if self.stream is None:
+			if self.content:
+				for position in range( 0, len( self.content ), size ):
+					yield self.content[position:position+size]
+			return
+		received = 0
+		started = monotonic()
+		try:
+			for chunk in decode( self.stream.raw, self.encoding, size ):
+				received += len( chunk )
+				yield chunk
+			self.stream._content_consumed = True
+		finally:
+			metrics().transfer( endpoint( self.url, self.payload ), received, monotonic() - started )
+			self.close()
+	
 	@property
 	def json( self ) -> Union[MutableMapping[Str,Any],MutableSequence[Any]]:
-		if self.content and self.isApplicationJson is True:
-			return JsonDecoder( self.content )
-		return None
+		if self.__json is _Unparsed:
+			decoded = None
+			if self.content and self.isApplicationJson is True:
+				decoded = JsonDecoder( self.content )
+			self.__json = decoded
+		return self.__json
+	
+	@property
+	def text( self ) -> Optional[Str]:
+		
+		""" HTTP Response content decoded text """
+		
+		if self.__text is None and self.content is not None:
+			charset = self.charset if self.charset else "UTF-8"
+			try:
+				self.__text = self.content.decode( charset, errors="replace" )
+			except LookupError:
+				self.__text = self.content.decode( "UTF-8", errors="replace" )
+		return self.__text
 	
 	...
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+#
+# @author hxAri (hxari)
+# @create 23-12-2024 17:30
+# @github https://github.com/hxAri/Kanashi
+#
+# Kanashi is an Open-Source project for doing various
+# things related to Instagram, e.g Login. Logout, Profile Info,
+# Follow, Unfollow, Media downloader, etc.
+#
+# Kanashi Copyright (c) 2024 - hxAri <hxari@proton.me>
+# Kanashi Licence under GNU General Public Licence v3
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+from builtins import int as Int, str as Str
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from os.path import abspath, dirname
+from sys import path as paths
+from threading import Lock, Thread
+from typing import Callable, Iterable, MutableMapping, MutableSequence
+
+from pytest import fixture
+
+paths.insert( 0, dirname( dirname( abspath( __file__ ) ) ) )
+
+from kanashi.common import colorable
+from kanashi.logger import disableStoreLog, Level, threshold
+
+
+class Handler( BaseHTTPRequestHandler ):
+	
+	""" Local Stub Server Request Handler """
+	
+	protocol_version = "HTTP/1.1"
+	
+	def __dispatch( self ) -> None:
+		route = self.server.routes.get( self.path.split( "\x3f" )[0] )
+		if "Content-Length" in self.headers:
+			self.rfile.read( Int( self.headers['Content-Length'] ) )
+		with self.server.lock:
+			self.server.requests.append( tuple([ self.command, self.path, { **self.headers } ]) )
+		if route is None:
+			self.respond( 404, b"" )
+			return
+		route( self )
+	
+	def do_GET( self ) -> None: self.__dispatch()
+	
+	def do_HEAD( self ) -> None: self.__dispatch()
+	
+	def do_POST( self ) -> None: self.__dispatch()
+	
+	def log_message( self, *args:object ) -> None: ...
+	
+	def respond( self, status:Int, body:bytes, headers:MutableMapping[Str,Str]={} ) -> None:
+		
+		""" Send complete response """
+		
+		self.send_response( status )
+		for keyset, value in headers.items():
+			self.send_header( keyset, value )
+		if "Content-Length" not in headers:
+			self.send_header( "Content-Length", Str( len( body ) ) )
+		self.end_headers()
+		if self.command != "HEAD":
+			self.wfile.write( body )
+	
+	...
+
+
+class Server:
+	
+	""" Local Stub Server """
+	
+	def __init__( self ) -> None:
+		self.httpd = ThreadingHTTPServer( ( "127.0.0.1", 0 ), Handler )
+		self.httpd.daemon_threads = True
+		self.httpd.lock = Lock()
+		self.httpd.requests = []
+		self.httpd.routes = {}
+		self.thread = Thread( target=self.httpd.serve_forever, daemon=True )
+		self.thread.start()
+	
+	@property
+	def requests( self ) -> MutableSequence[object]: return self.httpd.requests
+	
+	def route( self, path:Str, handler:Callable[[Handler],None] ) -> None: self.httpd.routes[path] = handler
+	
+	def url( self, path:Str ) -> Str: return f"http://127.0.0.1:{self.httpd.server_address[1]}{path}"
+	
+	...
+
+
+@fixture( autouse=True, scope="session" )
+def quiet() -> Iterable[None]:
+	
+	""" Disable colors and stored logs while testing """
+	
+	colorable( False )
+	disableStoreLog()
+	threshold( Level.DISABLE )
+	yield
+
+@fixture
+def server() -> Iterable[Server]:
+	
+	""" Local stub http server """
+	
+	server = Server()
+	yield server
+	server.httpd.shutdown()
+	server.httpd.server_close()
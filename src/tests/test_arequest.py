@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+#
+# @author hxAri (hxari)
+# @create 23-12-2024 17:30
+# @github https://github.com/hxAri/Kanashi
+#
+# Kanashi is an Open-Source project for doing various
+# things related to Instagram, e.g Login. Logout, Profile Info,
+# Follow, Unfollow, Media downloader, etc.
+#
+# Kanashi Copyright (c) 2024 - hxAri <hxari@proton.me>
+# Kanashi Licence under GNU General Public Licence v3
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+from asyncio import run
+from gzip import compress
+from os.path import abspath, dirname
+from subprocess import run as execute
+from sys import executable
+from typing import Any, Awaitable
+
+from pytest import raises
+
+from kanashi.arequest import aclose, arequest
+from kanashi.errors import DecoderUnsupportedError, ProxyUnavailableError
+from kanashi.metrics import endpoint, metrics
+from kanashi.proxies import configure, ProxyPool
+from kanashi.downloader import asave
+from kanashi.retry import Retry
+
+
+def complete( awaitable:Awaitable[Any] ) -> Any:
+	
+	""" Run awaitable and close the event loop client session """
+	
+	async def wrapper() -> Any:
+		try:
+			return await awaitable
+		finally:
+			await aclose()
+	return run( wrapper() )
+
+
+def test_arequest_decodes_json( server ) -> None:
+	server.route( "/json", lambda handler: handler.respond( 200, compress( b"{\"id\":1}" ), { "Content-Encoding": "gzip", "Content-Type": "application/json" } ) )
+	response = complete( arequest( "GET", server.url( "/json" ), coalesce=False ) )
+	assert response.status == 200
+	assert response.json == { "id": 1 }
+
+def test_arequest_retries_server_errors( server ) -> None:
+	statuses = [ 503, 200 ]
+	server.route( "/flaky", lambda handler: handler.respond( statuses.pop( 0 ), b"ok" ) )
+	response = complete( arequest( "GET", server.url( "/flaky" ), retry=Retry( tries=3, backoff=0 ), coalesce=False ) )
+	assert response.status == 200
+	assert response.content == b"ok"
+	assert len( server.requests ) == 2
+
+def test_arequest_raises_when_retries_exhausted( server ) -> None:
+	server.route( "/broken", lambda handler: handler.respond( 200, b"not a gzip stream", { "Content-Encoding": "gzip" } ) )
+	with raises( ExceptionGroup ):
+		complete( arequest( "GET", server.url( "/broken" ), retry=Retry( tries=2, backoff=0 ), coalesce=False ) )
+
+def test_arequest_records_unretryable_errors( server ) -> None:
+	server.route( "/compress", lambda handler: handler.respond( 200, b"compressed", { "Content-Encoding": "compress" } ) )
+	metrics().reset()
+	with raises( DecoderUnsupportedError ):
+		complete( arequest( "GET", server.url( "/compress" ), retry=Retry( tries=3, backoff=0 ), coalesce=False ) )
+	assert len( server.requests ) == 1
+	assert metrics().snapshot()[endpoint( server.url( "/compress" ) )]['errors'] == { "DecoderUnsupportedError": 1 }
+
+def test_arequest_through_explicit_proxy( server ) -> None:
+	server.route( "http://proxied.test/ok", lambda handler: handler.respond( 200, b"proxied" ) )
+	response = complete( arequest( "GET", "http://proxied.test/ok", proxies={ "http": server.url( "" ) }, coalesce=False ) )
+	assert response.status == 200
+	assert response.content == b"proxied"
+	assert server.requests[0][1] == "http://proxied.test/ok"
+
+def test_arequest_refuses_direct_connection( server ) -> None:
+	server.route( "/direct", lambda handler: handler.respond( 200, b"direct" ) )
+	pool = ProxyPool([ "http://127.0.0.1:9" ], evict=1 )
+	pool.report( pool.proxies[0], status=429 )
+	configure( pool )
+	try:
+		with raises( ProxyUnavailableError ):
+			complete( arequest( "GET", server.url( "/direct" ), coalesce=False ) )
+		assert server.requests == []
+	finally:
+		configure( None )
+
+def test_asave_streams_media( server, tmp_path ) -> None:
+	body = bytes( range( 256 ) ) * 512
+	server.route( "/media.jpg", lambda handler: handler.respond( 200, body ) )
+	filename = tmp_path / "media.jpg"
+	assert complete( asave( server.url( "/media.jpg" ), str( filename ), size=4096 ) ) is True
+	assert filename.read_bytes() == body
+
+def test_blocking_downloader_does_not_require_aiohttp() -> None:
+	script = f"import sys; sys.path.insert( 0, {dirname( dirname( abspath( __file__ ) ) )!r} ); sys.modules['aiohttp'] = None; import kanashi.downloader"
+	completed = execute([ executable, "-c", script ], capture_output=True )
+	assert completed.returncode == 0, completed.stderr.decode()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+#
+# @author hxAri (hxari)
+# @create 23-12-2024 17:30
+# @github https://github.com/hxAri/Kanashi
+#
+# Kanashi is an Open-Source project for doing various
+# things related to Instagram, e.g Login. Logout, Profile Info,
+# Follow, Unfollow, Media downloader, etc.
+#
+# Kanashi Copyright (c) 2024 - hxAri <hxari@proton.me>
+# Kanashi Licence under GNU General Public Licence v3
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+
+from kanashi.common import colorable, colorize
+
+
+def test_colorize_is_skipped_when_not_colorable() -> None:
+	colorable( False )
+	assert colorize( "Request GET url=\"https://www.instagram.com\"" ) == "Request GET url=\"https://www.instagram.com\""
+
+def test_colorize_when_colorable() -> None:
+	colorable( True )
+	try:
+		colorized = colorize( "Request GET url=\"https://www.instagram.com\" 200" )
+		assert "\x1b[" in colorized
+		assert colorize( "Request GET url=\"https://www.instagram.com\" 200" ) == colorized
+		assert colorize( "plain", "\x1b[1;31m" ) == "\x1b[1;31mplain"
+		assert colorize( "GET 200" ) == "\x1b[0mGET \x1b[1;38;5;61m200\x1b[0m\x1b[0m"
+	finally:
+		colorable( False )
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+#
+# @author hxAri (hxari)
+# @create 23-12-2024 17:30
+# @github https://github.com/hxAri/Kanashi
+#
+# Kanashi is an Open-Source project for doing various
+# things related to Instagram, e.g Login. Logout, Profile Info,
+# Follow, Unfollow, Media downloader, etc.
+#
+# Kanashi Copyright (c) 2024 - hxAri <hxari@proton.me>
+# Kanashi Licence under GNU General Public Licence v3
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+from asyncio import run
+from builtins import bool as Bool, bytes as Bytes, int as Int, str as Str
+from gzip import compress as gzip
+from zlib import compress as deflate
+
+from brotli import compress as brotli
+from pytest import mark, raises
+from pyzstd import compress as zstd
+from typing import AsyncIterable, Callable, Iterable
+
+from kanashi.decoder import adecode, decode, Decoder, DecoderError
+from kanashi.errors import DecoderUnsupportedError
+
+
+Body:Bytes = b"kanashi " * 4096
+""" Decoded Body Sample """
+
+Encodings = [
+	( "br", brotli ),
+	( "deflate", deflate ),
+	( "gzip", gzip ),
+	( "zstd", zstd )
+]
+""" Encoding and compressor pairs """
+
+
+class Raw:
+	
+	""" Urllib3 Raw Response Stub """
+	
+	def __init__( self, content:Bytes ) -> None:
+		self.content = content
+	
+	def stream( self, size:Int, decode_content:Bool ) -> Iterable[Bytes]:
+		for position in range( 0, len( self.content ), size ):
+			yield self.content[position:position+size]
+	
+	...
+
+
+class Reader:
+	
+	""" Aiohttp Stream Reader Stub """
+	
+	def __init__( self, content:Bytes ) -> None:
+		self.content = content
+	
+	async def iter_chunked( self, size:Int ) -> AsyncIterable[Bytes]:
+		for position in range( 0, len( self.content ), size ):
+			yield self.content[position:position+size]
+	
+	...
+
+
+@mark.parametrize( "encoding,compress", Encodings )
+def test_decode_chunked( encoding:Str, compress:Callable[[Bytes],Bytes] ) -> None:
+	assert b"".join( decode( Raw( compress( Body ) ), encoding, size=7 ) ) == Body
+
+@mark.parametrize( "encoding,compress", Encodings )
+def test_adecode_chunked( encoding:Str, compress:Callable[[Bytes],Bytes] ) -> None:
+	async def collect() -> Bytes:
+		return b"".join([ chunk async for chunk in adecode( Reader( compress( Body ) ), encoding, size=7 ) ])
+	assert run( collect() ) == Body
+
+@mark.parametrize( "encoding,compress", Encodings )
+def test_truncated_content_raises( encoding:Str, compress:Callable[[Bytes],Bytes] ) -> None:
+	content = compress( Body )
+	with raises( DecoderError ):
+		b"".join( decode( Raw( content[:len( content ) // 2] ), encoding ) )
+
+def test_stacked_encodings_are_decoded_in_reverse() -> None:
+	assert b"".join( decode( Raw( brotli( gzip( Body ) ) ), "gzip, br" ) ) == Body
+
+def test_identity_and_empty_content() -> None:
+	decoder = Decoder( "identity" )
+	assert decoder.identity is True
+	assert decoder.decompress( b"plain" ) == b"plain"
+	assert Decoder( "gzip" ).flush() == b""
+
+def test_unsupported_encoding_is_flagged() -> None:
+	assert Decoder( "compress" ).supported is False
+
+def test_adecode_refuses_unsupported_encoding() -> None:
+	async def collect() -> Bytes:
+		return b"".join([ chunk async for chunk in adecode( Reader( Body ), "compress" ) ])
+	with raises( DecoderUnsupportedError ):
+		run( collect() )
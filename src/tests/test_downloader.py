@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+
+#
+# @author hxAri (hxari)
+# @create 23-12-2024 17:30
+# @github https://github.com/hxAri/Kanashi
+#
+# Kanashi is an Open-Source project for doing various
+# things related to Instagram, e.g Login. Logout, Profile Info,
+# Follow, Unfollow, Media downloader, etc.
+#
+# Kanashi Copyright (c) 2024 - hxAri <hxari@proton.me>
+# Kanashi Licence under GNU General Public Licence v3
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+from builtins import bool as Bool, bytes as Bytes, int as Int, str as Str
+from gzip import compress
+from os.path import isfile
+from time import monotonic
+from typing import Callable, MutableMapping, Optional
+
+from kanashi.downloader import _throttle, budget, PartialSuffix, save, SegmentSuffix
+from kanashi.limiter import TokenBucket
+
+
+Body:Bytes = bytes( range( 256 ) ) * 1024
+""" Media Body Sample """
+
+
+def ranged( body:Bytes, encoding:Optional[Str]=None, ignore:Bool=False, failed:Optional[Int]=None ) -> Callable[[object],None]:
+	
+	""" Build stub route serving body with byte range support """
+	
+	def route( handler:object ) -> None:
+		headers:MutableMapping[Str,Str] = {}
+		value = handler.headers.get( "Range" )
+		if value is None or ignore is True:
+			handler.respond( 200, body )
+			return
+		start, end = value.removeprefix( "bytes=" ).split( "-" )
+		if failed is not None and Int( start ) == failed and end:
+			handler.respond( 200, body )
+			return
+		start = Int( start )
+		end = Int( end ) if end else len( body ) -1
+		if start >= len( body ):
+			handler.respond( 416, b"", { "Content-Range": f"bytes */{len( body )}" } )
+			return
+		content = body[start:end+1]
+		if encoding is not None:
+			content = compress( content )
+			headers['Content-Encoding'] = encoding
+		headers['Content-Range'] = f"bytes {start}-{end}/{len( body )}"
+		handler.respond( 206, content, headers )
+	return route
+
+
+def test_save_streams_into_file( server, tmp_path ) -> None:
+	server.route( "/media.jpg", ranged( Body ) )
+	filename = str( tmp_path / "media.jpg" )
+	assert save( server.url( "/media.jpg" ), filename, size=1000 ) is True
+	assert open( filename, "rb" ).read() == Body
+	assert not isfile( f"{filename}{PartialSuffix}" )
+
+def test_save_resumes_partial_with_identity_range( server, tmp_path ) -> None:
+	server.route( "/media.jpg", ranged( Body ) )
+	filename = str( tmp_path / "media.jpg" )
+	with open( f"{filename}{PartialSuffix}", "wb" ) as fopen:
+		fopen.write( Body[:1000] )
+	assert save( server.url( "/media.jpg" ), filename ) is True
+	assert open( filename, "rb" ).read() == Body
+	headers = server.requests[-1][2]
+	assert headers['Range'] == "bytes=1000-"
+	assert headers['Accept-Encoding'] == "identity"
+
+def test_save_restarts_when_range_is_ignored( server, tmp_path ) -> None:
+	server.route( "/media.jpg", ranged( Body, ignore=True ) )
+	filename = str( tmp_path / "media.jpg" )
+	with open( f"{filename}{PartialSuffix}", "wb" ) as fopen:
+		fopen.write( b"stale" )
+	assert save( server.url( "/media.jpg" ), filename ) is True
+	assert open( filename, "rb" ).read() == Body
+
+def test_save_refuses_encoded_range( server, tmp_path ) -> None:
+	server.route( "/media.jpg", ranged( Body, encoding="gzip" ) )
+	filename = str( tmp_path / "media.jpg" )
+	with open( f"{filename}{PartialSuffix}", "wb" ) as fopen:
+		fopen.write( Body[:1000] )
+	assert save( server.url( "/media.jpg" ), filename ) is False
+	assert not isfile( filename )
+	assert not isfile( f"{filename}{PartialSuffix}" )
+
+def test_save_commits_complete_partial_on_416( server, tmp_path ) -> None:
+	server.route( "/media.jpg", ranged( Body ) )
+	filename = str( tmp_path / "media.jpg" )
+	with open( f"{filename}{PartialSuffix}", "wb" ) as fopen:
+		fopen.write( Body )
+	assert save( server.url( "/media.jpg" ), filename ) is True
+	assert open( filename, "rb" ).read() == Body
+
+def test_save_downloads_segments( server, tmp_path ) -> None:
+	server.route( "/media.jpg", ranged( Body ) )
+	filename = str( tmp_path / "media.jpg" )
+	assert save( server.url( "/media.jpg" ), filename, segments=4, threshold=1 ) is True
+	assert open( filename, "rb" ).read() == Body
+	assert not isfile( f"{filename}{PartialSuffix}{SegmentSuffix}" )
+	assert sorted( request[2]['Range'] for request in server.requests[1:] ) == sorted( f"bytes={start}-{start + 65535}" for start in range( 0, len( Body ), 65536 ) )
+
+def test_failed_segments_keep_completed_prefix_for_resume( server, tmp_path ) -> None:
+	length = len( Body ) // 4
+	server.route( "/media.jpg", ranged( Body, failed=length * 2 ) )
+	filename = str( tmp_path / "media.jpg" )
+	partial = f"{filename}{PartialSuffix}"
+	assert save( server.url( "/media.jpg" ), filename, segments=4, threshold=1 ) is False
+	assert open( partial, "rb" ).read() == Body[:length * 2]
+	assert not isfile( f"{partial}{SegmentSuffix}" )
+	server.route( "/media.jpg", ranged( Body ) )
+	assert save( server.url( "/media.jpg" ), filename, segments=4, threshold=1 ) is True
+	assert server.requests[-1][2]['Range'] == f"bytes={length * 2}-"
+	assert open( filename, "rb" ).read() == Body
+
+def test_failed_first_segment_keeps_nothing( server, tmp_path ) -> None:
+	server.route( "/media.jpg", ranged( Body, failed=0 ) )
+	filename = str( tmp_path / "media.jpg" )
+	assert save( server.url( "/media.jpg" ), filename, segments=4, threshold=1 ) is False
+	assert not isfile( f"{filename}{PartialSuffix}" )
+	assert not isfile( f"{filename}{PartialSuffix}{SegmentSuffix}" )
+
+def test_throttle_charges_budget_and_cap() -> None:
+	assert _throttle( 1 << 20, None ) == 0
+	budget( 1 << 10 )
+	try:
+		assert _throttle( 1 << 10, None ) == 0
+		assert 0.9 <= _throttle( 1 << 10, None ) <= 1
+		assert 2.9 <= _throttle( 1 << 10, TokenBucket( 1 << 8 ) ) <= 3
+	finally:
+		budget( None )
+	assert _throttle( 1 << 20, None ) == 0
+
+def test_save_respects_per_file_rate( server, tmp_path ) -> None:
+	server.route( "/media.jpg", lambda handler: handler.respond( 200, Body ) )
+	started = monotonic()
+	assert save( server.url( "/media.jpg" ), f"{tmp_path}/media.jpg", rate=len( Body ) // 2 ) is True
+	assert monotonic() - started >= 0.9
+	with open( f"{tmp_path}/media.jpg", "rb" ) as fopen:
+		assert fopen.read() == Body
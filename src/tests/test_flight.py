@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+#
+# @author hxAri (hxari)
+# @create 23-12-2024 17:30
+# @github https://github.com/hxAri/Kanashi
+#
+# Kanashi is an Open-Source project for doing various
+# things related to Instagram, e.g Login. Logout, Profile Info,
+# Follow, Unfollow, Media downloader, etc.
+#
+# Kanashi Copyright (c) 2024 - hxAri <hxari@proton.me>
+# Kanashi Licence under GNU General Public Licence v3
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+from asyncio import gather, run, sleep as asleep
+from builtins import bool as Bool, int as Int, str as Str
+from threading import Event, Thread
+from time import sleep
+from typing import Callable, MutableSequence, Tuple, TypeVar as Var, Union
+
+from kanashi.flight import frozen, SingleFlight
+from kanashi.request import request
+
+
+T = Var( "T" )
+""" Callback Return Type """
+
+
+
+def concurrently( flight:SingleFlight, callback:Callable[[],T], release:Event, followers:Int=3 ) -> MutableSequence[Tuple[Union[T,BaseException],Bool]]:
+	
+	""" Call the leader then followers while the leader is blocked """
+	
+	results = []
+	def call() -> None:
+		try:
+			results.append( flight.do( "keyset", callback ) )
+		except BaseException as e:
+			results.append( tuple([ e, None ]) )
+	threads = [ Thread( target=call ) ]
+	threads[0].start()
+	while flight.inflight == 0:
+		sleep( 0.001 )
+	threads.extend( Thread( target=call ) for _ in range( followers ) )
+	for thread in threads[1:]:
+		thread.start()
+	sleep( 0.1 )
+	release.set()
+	for thread in threads:
+		thread.join()
+	return results
+
+def test_concurrent_calls_share_one_execution() -> None:
+	calls = []
+	flight = SingleFlight()
+	release = Event()
+	def callback() -> Str:
+		calls.append( 1 )
+		release.wait( 5 )
+		return "result"
+	results = concurrently( flight, callback, release )
+	assert len( calls ) == 1
+	assert sorted( shared for _, shared in results ) == [ False, True, True, True ]
+	assert all( result == "result" for result, _ in results )
+	assert flight.inflight == 0
+
+def test_leader_exception_is_shared() -> None:
+	flight = SingleFlight()
+	release = Event()
+	def callback() -> None:
+		release.wait( 5 )
+		raise ValueError( "failed" )
+	results = concurrently( flight, callback, release, followers=2 )
+	assert len( results ) == 3
+	assert all( isinstance( result, ValueError ) for result, _ in results )
+	assert flight.inflight == 0
+
+def test_results_are_not_cached() -> None:
+	flight = SingleFlight()
+	assert flight.do( "keyset", lambda: 1 ) == ( 1, False )
+	assert flight.do( "keyset", lambda: 2 ) == ( 2, False )
+
+def test_async_calls_share_one_execution() -> None:
+	flight = SingleFlight()
+	calls = []
+	async def callback() -> Str:
+		calls.append( 1 )
+		await asleep( 0.05 )
+		return "result"
+	async def main() -> MutableSequence[Tuple[Str,Bool]]:
+		return await gather( *( flight.ado( "keyset", callback ) for _ in range( 3 ) ) )
+	results = run( main() )
+	assert len( calls ) == 1
+	assert [ shared for _, shared in results ] == [ False, True, True ]
+
+def test_frozen_mapping() -> None:
+	assert frozen( None ) is None
+	assert frozen({ "b": 2, "a": "1" }) == ( ( "a", "1" ), ( "b", "2" ) )
+
+def test_identical_requests_are_coalesced( server ) -> None:
+	release = Event()
+	def slow( handler ) -> None:
+		release.wait( 5 )
+		handler.respond( 200, b"{\"items\":[]}", { "Content-Type": "application/json" } )
+	server.route( "/slow", slow )
+	responses = []
+	threads = [ Thread( target=lambda: responses.append( request( "GET", server.url( "/slow" ) ) ) ) for _ in range( 3 ) ]
+	for thread in threads:
+		thread.start()
+	sleep( 0.2 )
+	release.set()
+	for thread in threads:
+		thread.join()
+	assert [ response.content for response in responses ] == [ b"{\"items\":[]}" ] * 3
+	assert len( server.requests ) == 1
+	assert len( set( id( response ) for response in responses ) ) == 3
+	responses[0].json['items'].append( 1 )
+	responses[0].headers['X-Mutated'] = "1"
+	assert [ response.json for response in responses[1:] ] == [ { "items": [] } ] * 2
+	assert all( "X-Mutated" not in response.headers for response in responses[1:] )
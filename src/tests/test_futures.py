@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+
+#
+# @author hxAri (hxari)
+# @create 23-12-2024 17:30
+# @github https://github.com/hxAri/Kanashi
+#
+# Kanashi is an Open-Source project for doing various
+# things related to Instagram, e.g Login. Logout, Profile Info,
+# Follow, Unfollow, Media downloader, etc.
+#
+# Kanashi Copyright (c) 2024 - hxAri <hxari@proton.me>
+# Kanashi Licence under GNU General Public Licence v3
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+
+from concurrent.futures import Future, TimeoutError as ThreadTimeoutError
+from os.path import abspath, dirname
+from pytest import raises
+from subprocess import run as execute
+from sys import executable
+from threading import Lock
+from time import sleep
+
+from kanashi.futures import _Progress, AdaptiveConcurrency, ProcessExecutor, ThreadExecutor
+from kanashi.metrics import metrics
+
+
+def square( data:int, *args, thread=0, **kwargs ) -> int:
+	return data * data
+
+def slept( seconds:float, *args, thread=0, **kwargs ) -> float:
+	sleep( seconds )
+	return seconds
+
+
+def test_thread_window_bounds_pulled_items() -> None:
+	pulled = 0
+	consumed = 0
+	def dataset():
+		nonlocal pulled
+		for data in range( 50 ):
+			pulled += 1
+			yield data
+	for result in ThreadExecutor( "Window", square, dataset(), delays=0, sleepy=0, timeout=None, workers=2, window=4 ):
+		assert result == consumed * consumed
+		consumed += 1
+		assert pulled - consumed <= 4
+	assert consumed == 50
+
+def test_progress_counts_futures( capsys ) -> None:
+	progress = _Progress( "Progress", interval=60 )
+	futures = [ progress.submit( Future() ) for _ in range( 3 ) ]
+	futures[0].set_result( 1 )
+	futures[1].set_exception( ValueError() )
+	progress.stop()
+	assert "Progress: 2 done, 1 in-flight, 1 failed" in capsys.readouterr().out
+
+def test_thread_ordered_results() -> None:
+	results = ThreadExecutor( "Ordered", slept, [ 0.3, 0.2, 0.1, 0 ], delays=0, sleepy=0, timeout=None, workers=4 )
+	assert list( results ) == [ 0.3, 0.2, 0.1, 0 ]
+
+def test_thread_completion_order_results() -> None:
+	results = ThreadExecutor( "Unordered", slept, [ 0.3, 0.2, 0.1, 0 ], delays=0, sleepy=0, timeout=None, workers=4, ordered=False )
+	assert list( results ) == [ ( 0, 0 ), ( 0.1, 0.1 ), ( 0.2, 0.2 ), ( 0.3, 0.3 ) ]
+
+def test_thread_deadline_exceeded() -> None:
+	results = dict( ThreadExecutor( "Deadline", slept, [ 1, 0 ], delays=0, sleepy=0, timeout=0.3, workers=2, ordered=False ) )
+	assert results[0] == 0
+	assert isinstance( results[1], ThreadTimeoutError )
+	assert list( ThreadExecutor( "Deadline", slept, [ 1, 0 ], delays=0, sleepy=0, timeout=0.3, workers=2 ) ) == [ 0 ]
+
+def test_thread_deadline_counts_from_start() -> None:
+	results = ThreadExecutor( "Queued", slept, [ 0.3, 0.3, 0.3 ], delays=0, sleepy=0, timeout=0.5, workers=1, window=3 )
+	assert list( results ) == [ 0.3, 0.3, 0.3 ]
+
+def test_adaptive_grows_when_saturated() -> None:
+	controller = AdaptiveConcurrency( maximum=4, initial=2, interval=0 )
+	controller.observe( None, 2 )
+	assert controller.update() == 3
+	assert controller.update() == 3
+	controller.observe( None, 3 )
+	controller.update()
+	controller.observe( None, 4 )
+	assert controller.update() == 4
+	controller.observe( None, 4 )
+	assert controller.update() == 4
+
+def test_adaptive_backs_off_on_ratelimit_and_errors() -> None:
+	metrics().reset()
+	controller = AdaptiveConcurrency( maximum=16, minimum=2, initial=8, interval=0 )
+	metrics().observe( "graphql:1", 429, 0.1 )
+	assert controller.update() == 4
+	for _ in range( 3 ):
+		controller.observe( ValueError(), 4 )
+	controller.observe( None, 4 )
+	assert controller.update() == 2
+	metrics().observe( "graphql:1", 429, 0.1 )
+	assert controller.update() == 2
+	metrics().reset()
+
+def test_thread_adaptive_limits_running_tasks() -> None:
+	lock = Lock()
+	running = peak = 0
+	def tracked( data, *args, thread=0, **kwargs ):
+		nonlocal running, peak
+		with lock:
+			running += 1
+			peak = max( peak, running )
+		sleep( 0.05 )
+		with lock:
+			running -= 1
+		return data
+	controller = AdaptiveConcurrency( maximum=8, initial=2, interval=60 )
+	results = ThreadExecutor( "Adaptive", tracked, range( 12 ), delays=0, sleepy=0, timeout=None, workers=8, adaptive=controller )
+	assert list( results ) == [ *range( 12 ) ]
+	assert peak <= 2
+
+def test_process_executor_refuses_fork() -> None:
+	with raises( ValueError ):
+		next( ProcessExecutor( "Parser", square, [ 1 ], context="fork" ) )
+
+def test_constant_base_path_ignores_working_directory( tmp_path ) -> None:
+	source = dirname( dirname( abspath( __file__ ) ) )
+	script = f"import sys; sys.path.append( {source!r} ); from kanashi.constant import BasePath; print( BasePath )"
+	completed = execute([ executable, "-c", script ], cwd=tmp_path, capture_output=True, text=True )
+	assert completed.returncode == 0, completed.stderr
+	assert completed.stdout.strip() == dirname( source )
+
+def test_process_executor_results() -> None:
+	assert list( ProcessExecutor( "Parser", square, range( 6 ), workers=2 ) ) == [ data * data for data in range( 6 ) ]
+
+def test_process_deadline_counts_from_child_start() -> None:
+	
+	""" The second item waits in the call queue while the first is running """
+	
+	def dataset():
+		yield 0.8
+		yield 0.8
+		sleep( 0.3 )
+		yield 0.01
+	results = list( ProcessExecutor( "Parser", slept, dataset(), timeout=1.2, workers=1, window=3, ordered=False ) )
+	assert sorted( result for data, result in results ) == [ 0.01, 0.8, 0.8 ]
+
+def test_process_deadline_exceeded() -> None:
+	results = list( ProcessExecutor( "Parser", slept, [ 2, 0.1 ], timeout=0.5, workers=2, ordered=False ) )
+	assert dict( results )[0.1] == 0.1
+	assert isinstance( dict( results )[2], ThreadTimeoutError )
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+#
+# @author hxAri (hxari)
+# @create 23-12-2024 17:30
+# @github https://github.com/hxAri/Kanashi
+#
+# Kanashi is an Open-Source project for doing various
+# things related to Instagram, e.g Login. Logout, Profile Info,
+# Follow, Unfollow, Media downloader, etc.
+#
+# Kanashi Copyright (c) 2024 - hxAri <hxari@proton.me>
+# Kanashi Licence under GNU General Public Licence v3
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+from threading import Thread
+from time import monotonic
+
+from pytest import raises
+
+from kanashi.limiter import endpoint, RateLimiter, TokenBucket
+
+
+def test_bucket_allows_burst_then_goes_into_debt() -> None:
+	bucket = TokenBucket( rate=10, capacity=3 )
+	assert [ bucket.reserve() for _ in range( 3 ) ] == [ 0, 0, 0 ]
+	assert 0.09 <= bucket.reserve() <= 0.11
+	assert 0.19 <= bucket.reserve() <= 0.21
+
+def test_bucket_rejects_non_positive_rate() -> None:
+	with raises( ValueError ):
+		TokenBucket( rate=0 )
+
+def test_bucket_throughput_across_threads() -> None:
+	bucket = TokenBucket( rate=100, capacity=1 )
+	started = monotonic()
+	threads = [ Thread( target=lambda: [ bucket.acquire() for _ in range( 10 ) ] ) for _ in range( 4 ) ]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	assert monotonic() - started >= 0.35
+
+def test_endpoint_classes() -> None:
+	assert endpoint( "https://www.instagram.com/graphql/query" )[1] == "graphql"
+	assert endpoint( "https://www.instagram.com/api/v1/users/web_profile_info/" )[1] == "api"
+	assert endpoint( "https://scontent.cdninstagram.com/v/t51/a.jpg" )[1] == "media"
+
+def test_limiter_buckets_per_rule() -> None:
+	limiter = RateLimiter({ "graphql": ( 1, 2 ) })
+	assert limiter.bucket( "https://scontent.cdninstagram.com/a.jpg" ) is None
+	bucket = limiter.bucket( "https://www.instagram.com/graphql/query" )
+	assert bucket is limiter.bucket( "https://www.instagram.com/graphql/query" )
+	assert limiter.reserve( "https://www.instagram.com/graphql/query" ) == 0
+	limiter.configure( "graphql", None )
+	assert limiter.bucket( "https://www.instagram.com/graphql/query" ) is None
+	assert limiter.rules == {}
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+
+#
+# @author hxAri (hxari)
+# @create 23-12-2024 17:30
+# @github https://github.com/hxAri/Kanashi
+#
+# Kanashi is an Open-Source project for doing various
+# things related to Instagram, e.g Login. Logout, Profile Info,
+# Follow, Unfollow, Media downloader, etc.
+#
+# Kanashi Copyright (c) 2024 - hxAri <hxari@proton.me>
+# Kanashi Licence under GNU General Public Licence v3
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+
+from builtins import str as Str
+from glob import glob
+from json import loads as JsonDecoder
+from os import getpid
+from os.path import basename
+from pytest import fixture, mark, raises
+from time import monotonic, sleep
+
+from kanashi import logger as logging
+from kanashi.logger import (
+	disableStoreLog, 
+	disableStructuredLog, 
+	enableStoreLog, 
+	enableStructuredLog, 
+	Logger, 
+	LogSink, 
+	Rotation 
+)
+
+
+def lines( directory ) -> list:
+	results = []
+	for filename in sorted( glob( f"{directory}/kanashi-*.log" ) ):
+		with open( filename, "r", encoding="UTF-8" ) as fopen:
+			results.extend( fopen.read().splitlines() )
+	return results
+
+def test_sink_writes_and_flushes( tmp_path ) -> None:
+	logsink = LogSink( policy="block" )
+	filename = f"{tmp_path}/kanashi-2024-12-23.log"
+	for position in range( 10 ):
+		logsink.put( filename, f"line {position}" )
+	logsink.put( filename, { "message": "structured" } )
+	assert logsink.flush( 5 ) is True
+	assert lines( tmp_path ) == [ *[ f"line {position}" for position in range( 10 ) ], "{\"message\": \"structured\"}" ]
+	logsink.close()
+	assert logsink.put( filename, "closed" ) is False
+
+def test_sink_rejects_unknown_policy() -> None:
+	with raises( ValueError ):
+		LogSink( policy="unknown" )
+
+def test_dropped_lines_are_counted( tmp_path ) -> None:
+	logsink = LogSink( capacity=1, policy="drop" )
+	filename = f"{tmp_path}/kanashi-2024-12-23.log"
+	accepted = sum( 1 for position in range( 2000 ) if logsink.put( filename, f"line {position}" ) )
+	logsink.flush( 5 )
+	written = lines( tmp_path )
+	reported = sum( int( line.split()[2] ) for line in written if line.startswith( "LogSink dropped" ) )
+	assert len([ line for line in written if line.startswith( "line" ) ]) == accepted
+	assert reported + logsink.dropped == 2000 - accepted
+	logsink.close()
+
+def test_block_policy_applies_back_pressure( tmp_path ) -> None:
+	logsink = LogSink( capacity=1, policy="block", batch=1 )
+	filename = f"{tmp_path}/kanashi-2024-12-23.log"
+	assert all( logsink.put( filename, f"line {position}" ) for position in range( 500 ) )
+	assert logsink.flush( 5 ) is True
+	assert lines( tmp_path ) == [ f"line {position}" for position in range( 500 ) ]
+	assert logsink.dropped == 0
+	logsink.close()
+
+def test_flush_waits_for_queued_lines( tmp_path ) -> None:
+	logsink = LogSink( policy="block" )
+	filename = f"{tmp_path}/kanashi-2024-12-23.log"
+	logsink.put( filename, "queued" )
+	assert logsink.flush( 5 ) is True
+	assert lines( tmp_path ) == [ "queued" ]
+	logsink.close()
+	assert logsink.flush( 5 ) is True
+
+@mark.filterwarnings( "ignore::pytest.PytestUnhandledThreadExceptionWarning" )
+def test_close_after_writer_failure( tmp_path ) -> None:
+	def failed( *args ) -> None:
+		raise SystemExit()
+	for policy in [ "block", "drop" ]:
+		logsink = LogSink( capacity=2, policy=policy )
+		logsink._LogSink__write = failed
+		filename = f"{tmp_path}/kanashi-2024-12-23.log"
+		logsink.put( filename, "fatal" )
+		for _ in range( 50 ):
+			if logsink.flush( 0.1 ) is False:
+				break
+		for position in range( 4 ):
+			logsink.put( filename, f"line {position}" )
+		assert logsink.put( filename, "dropped" ) is False
+		started = monotonic()
+		logsink.close( timeout=1 )
+		assert monotonic() - started < 2
+
+def test_rotation_by_size( tmp_path ) -> None:
+	logsink = LogSink( policy="block", batch=1, rotation=Rotation( size=64, retention=None, compress=False ) )
+	filename = f"{tmp_path}/kanashi-2024-12-23.log"
+	for position in range( 20 ):
+		logsink.put( filename, f"line {position:02d} {'x' * 16}" )
+	logsink.close()
+	rotated = [ basename( name ) for name in glob( f"{tmp_path}/kanashi-2024-12-23.*.log" ) ]
+	assert len( rotated ) >= 3
+	assert sorted( lines( tmp_path ) ) == sorted( f"line {position:02d} {'x' * 16}" for position in range( 20 ) )
+
+def test_rotation_compresses_segments( tmp_path ) -> None:
+	logsink = LogSink( policy="block", batch=1, rotation=Rotation( size=16, retention=None ) )
+	filename = f"{tmp_path}/kanashi-2024-12-23.log"
+	for position in range( 3 ):
+		logsink.put( filename, f"line {position} {'x' * 16}" )
+	logsink.close()
+	for _ in range( 50 ):
+		if len( glob( f"{tmp_path}/*.zst" ) ) == 2:
+			break
+		sleep( 0.1 )
+	assert len( glob( f"{tmp_path}/*.zst" ) ) == 2
+
+def test_shared_file_rotation_keeps_every_line( tmp_path ) -> None:
+	
+	""" Sinks open their own lock file description, as separate processes do """
+	
+	rotation = Rotation( size=256, retention=None, compress=False )
+	sinks = [ LogSink( policy="block", batch=4, rotation=rotation ) for _ in range( 3 ) ]
+	filename = f"{tmp_path}/kanashi-2024-12-23.log"
+	expected = []
+	for position in range( 300 ):
+		line = f"sink {position % 3} line {position:03d}"
+		sinks[position % 3].put( filename, line )
+		expected.append( line )
+	for logsink in sinks:
+		logsink.close()
+	assert sorted( lines( tmp_path ) ) == sorted( expected )
+
+@fixture
+def collected( monkeypatch ):
+	
+	""" Collect stored log lines instead of writing them """
+	
+	records = []
+	class Collector:
+		def put( self, filename, line ) -> bool:
+			records.append( tuple([ filename, line ]) )
+			return True
+	monkeypatch.setattr( logging, "_LogSink", Collector() )
+	enableStoreLog()
+	try:
+		yield records
+	finally:
+		disableStructuredLog()
+		disableStoreLog()
+
+def test_write_reports_caller_frame( collected ) -> None:
+	def caller() -> int:
+		Logger( "tests" ).info( "Hello {}", "World" )
+		return caller.__code__.co_firstlineno +1
+	linenum = caller()
+	filename, line = collected.pop()
+	assert filename.endswith( ".log" )
+	assert f"P{getpid()}" in line
+	assert " tests.caller" in line
+	assert f" : {linenum}" in line
+	assert line.endswith( ": Hello World" )
+
+def test_structured_record_defers_formatting( collected ) -> None:
+	enableStructuredLog()
+	Logger( "tests" ).info( "Response {method} {status}", method="GET", status=200 )
+	filename, record = collected.pop()
+	record = JsonDecoder( record )
+	assert filename.endswith( ".ndjson" )
+	assert record['message'] == "Response {method} {status}"
+	assert record['method'] == "GET"
+	assert record['status'] == 200
+	assert record['level'] == "INFO"
+
+def test_structured_record_is_encoded_by_caller( collected ) -> None:
+	enableStructuredLog()
+	circular = []
+	circular.append( circular )
+	Logger( "tests" ).info( "Values {}", { ( 1, 2 ): 3 }, circular, pid="forged", context="forged" )
+	filename, record = collected.pop()
+	record = JsonDecoder( record )
+	assert record['pid'] == Str( getpid() )
+	assert record['message'] == "Values {}"
+	assert record['context'].startswith( "tests." )
+	assert record['args'] == repr( tuple([ { ( 1, 2 ): 3 }, circular ]) )
+
+def test_writer_survives_unencodable_record( tmp_path ) -> None:
+	logsink = LogSink( policy="block" )
+	filename = f"{tmp_path}/kanashi-2024-12-23.ndjson"
+	logsink.put( filename, { "args": tuple([ { ( 1, 2 ): 3 } ]) } )
+	logsink.put( filename, "after" )
+	assert logsink.flush( 5 ) is True
+	logsink.close()
+	with open( filename, "r", encoding="UTF-8" ) as fopen:
+		assert fopen.read().splitlines() == [ "{\"args\": \"({(1, 2): 3},)\"}", "after" ]
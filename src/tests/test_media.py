@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+#
+# @author hxAri (hxari)
+# @create 23-12-2024 17:30
+# @github https://github.com/hxAri/Kanashi
+#
+# Kanashi is an Open-Source project for doing various
+# things related to Instagram, e.g Login. Logout, Profile Info,
+# Follow, Unfollow, Media downloader, etc.
+#
+# Kanashi Copyright (c) 2024 - hxAri <hxari@proton.me>
+# Kanashi Licence under GNU General Public Licence v3
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+from builtins import bytes as Bytes
+from hashlib import md5
+from os.path import isfile
+
+from pytest import importorskip
+
+importorskip( "kanashi.client" )
+
+from kanashi.command.media import expand, tally, transfer
+from kanashi.futures import ThreadExecutor
+
+
+Body:Bytes = b"kanashi" * 1024
+""" Media Body Sample """
+
+
+def stored( pathname:str, name:str, extension:str ) -> str:
+	return f"{pathname}/{md5( name.encode() ).hexdigest()}.{extension}"
+
+
+def test_expand_yields_targets_and_skips_broken_timelines( tmp_path ) -> None:
+	timelines = iter([
+		{ "id": "1", "__typename": "GraphImage", "image": "http://localhost/one.jpg" },
+		{ "id": "2" },
+		[
+			{ "id": "3_1", "__typename": "GraphImage", "image": "http://localhost/three.jpg" }
+		]
+	])
+	targets = list( expand( timelines, f"{tmp_path}" ) )
+	assert targets == [
+		tuple([ "http://localhost/one.jpg", f"{tmp_path}/GraphImage/1" ]),
+		tuple([ "http://localhost/three.jpg", f"{tmp_path}/GraphImage/3" ])
+	]
+
+def test_transfer_reports_downloaded_skipped_and_failed( server, tmp_path ) -> None:
+	server.route( "/media/image.jpg", lambda handler: handler.respond( 200, Body, { "Content-Type": "image/jpeg" } ) )
+	pathname = f"{tmp_path}/GraphImage/1"
+	assert transfer( tuple([ server.url( "/media/image.jpg" ), pathname ]) ) is True
+	assert open( stored( pathname, "image", "jpg" ), "rb" ).read() == Body
+	assert transfer( tuple([ server.url( "/media/image.jpg" ), pathname ]) ) is None
+	assert transfer( tuple([ server.url( "/media/missing.jpg" ), pathname ]) ) is False
+	assert isfile( stored( pathname, "missing", "jpg" ) ) is False
+	assert len( server.requests ) == 2
+
+def test_pipeline_counts_skipped_separately( server, tmp_path ) -> None:
+	server.route( "/media/one.jpg", lambda handler: handler.respond( 200, Body ) )
+	server.route( "/media/two.jpg", lambda handler: handler.respond( 200, Body ) )
+	timelines = [
+		{ "id": "1", "__typename": "GraphImage", "image": server.url( "/media/one.jpg" ) },
+		{ "id": "2", "__typename": "GraphImage", "image": server.url( "/media/two.jpg" ) },
+		{ "id": "3", "__typename": "GraphImage", "image": server.url( "/media/gone.jpg" ) }
+	]
+	transfer( tuple([ server.url( "/media/one.jpg" ), f"{tmp_path}/GraphImage/1" ]) )
+	executor = ThreadExecutor( name="Pipeline", callback=transfer, dataset=expand( timelines, f"{tmp_path}" ), workers=2, delays=0, sleepy=0, timeout=0 )
+	assert tally( executor ) == tuple([ 1, 1, 1 ])
+	assert isfile( stored( f"{tmp_path}/GraphImage/2", "two", "jpg" ) ) is True
+
+def test_tally_counts_results() -> None:
+	assert tally([ True, None, False, True, None ]) == tuple([ 2, 2, 1 ])
+	assert tally([]) == tuple([ 0, 0, 0 ])
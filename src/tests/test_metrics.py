@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+#
+# @author hxAri (hxari)
+# @create 23-12-2024 17:30
+# @github https://github.com/hxAri/Kanashi
+#
+# Kanashi is an Open-Source project for doing various
+# things related to Instagram, e.g Login. Logout, Profile Info,
+# Follow, Unfollow, Media downloader, etc.
+#
+# Kanashi Copyright (c) 2024 - hxAri <hxari@proton.me>
+# Kanashi Licence under GNU General Public Licence v3
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+
+from json import loads as JsonDecoder
+from pytest import approx
+
+from kanashi.metrics import endpoint, Histogram, Registry
+
+
+def test_endpoint_labels() -> None:
+	assert endpoint( "https://www.instagram.com/graphql/query", { "doc_id": "123" } ) == "graphql:123"
+	assert endpoint( "https://www.instagram.com/graphql/query?doc_id=456" ) == "graphql:456"
+	assert endpoint( "https://www.instagram.com/graphql/query" ) == "www.instagram.com:graphql"
+	assert endpoint( "https://scontent.cdninstagram.com/v/a.jpg" ) == "scontent.cdninstagram.com:media"
+
+def test_histogram_quantiles() -> None:
+	histogram = Histogram([ 1, 2, 4 ])
+	assert histogram.quantile( 0.5 ) is None
+	for value in [ 0.5, 1.5, 1.5, 3 ]:
+		histogram.observe( value )
+	assert histogram.counts == [ 1, 2, 1, 0 ]
+	assert histogram.quantile( 0.5 ) == approx( 1.5 )
+	assert histogram.quantile( 1 ) == approx( 4 )
+	histogram.observe( 10 )
+	assert histogram.quantile( 1 ) == 4
+
+def test_registry_snapshot() -> None:
+	registry = Registry()
+	registry.observe( "graphql:1", 200, 0.1, 100 )
+	registry.observe( "graphql:1", 500, 0.2, 10, retried=True )
+	registry.error( "graphql:1", TimeoutError(), retried=True )
+	registry.transfer( "graphql:1", 1000, 2 )
+	entry = registry.snapshot()['graphql:1']
+	assert entry['requests'] == 2
+	assert entry['retries'] == 2
+	assert entry['bytes'] == 1110
+	assert entry['statuses'] == { 200: 1, 500: 1 }
+	assert entry['errors'] == { "TimeoutError": 1 }
+	assert entry['errorRate'] == approx( 2 / 3 )
+	assert entry['throughput'] == 500
+	assert entry['latency']['count'] == 2
+	registry.reset()
+	assert registry.snapshot() == {}
+
+def test_registry_dumps() -> None:
+	registry = Registry()
+	registry.observe( "graphql:1", 200, 0.02, 5 )
+	assert JsonDecoder( registry.dump( "json" ) )['graphql:1']['requests'] == 1
+	prometheus = registry.dump( "prometheus" )
+	assert "kanashi_requests_total{endpoint=\"graphql:1\"} 1" in prometheus
+	assert "kanashi_request_status_total{endpoint=\"graphql:1\",code=\"200\"} 1" in prometheus
+	assert "kanashi_request_latency_seconds_bucket{endpoint=\"graphql:1\",le=\"+Inf\"} 1" in prometheus
+	assert "kanashi_request_latency_seconds_count{endpoint=\"graphql:1\"} 1" in prometheus
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+#
+# @author hxAri (hxari)
+# @create 23-12-2024 17:30
+# @github https://github.com/hxAri/Kanashi
+#
+# Kanashi is an Open-Source project for doing various
+# things related to Instagram, e.g Login. Logout, Profile Info,
+# Follow, Unfollow, Media downloader, etc.
+#
+# Kanashi Copyright (c) 2024 - hxAri <hxari@proton.me>
+# Kanashi Licence under GNU General Public Licence v3
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+from threading import Thread
+
+from requests import Request as RequestsRequest
+
+from kanashi.pool import PoolStats, SessionPool
+
+
+def test_sessions_are_per_thread_and_share_adapter() -> None:
+	pool = SessionPool( workers=4 )
+	sessions = []
+	threads = [ Thread( target=lambda: sessions.append( pool.session() ) ) for _ in range( 2 ) ]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	assert sessions[0] is not sessions[1]
+	assert sessions[0].get_adapter( "https://" ) is sessions[1].get_adapter( "https://" )
+	assert pool.session() is pool.session()
+
+def test_resize_renews_thread_session() -> None:
+	pool = SessionPool( workers=2 )
+	session = pool.session()
+	pool.resize( 2 )
+	assert pool.session() is session
+	pool.resize( 8 )
+	assert pool.session() is not session
+	assert pool.stats['workers'] == 8
+
+def test_resize_grows_shared_adapter_maxsize() -> None:
+	pool = SessionPool( workers=2 )
+	adapter = pool.session().get_adapter( "https://" )
+	assert adapter.poolmanager.connection_pool_kw['maxsize'] == 2
+	pool.resize( 16 )
+	sessions = []
+	threads = [ Thread( target=lambda: sessions.append( pool.session() ) ) for _ in range( 4 ) ]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	adapters = set( session.get_adapter( "https://" ) for session in [ *sessions, pool.session() ] )
+	assert len( adapters ) == 1
+	resized = adapters.pop()
+	assert resized is not adapter
+	assert resized.poolmanager.connection_pool_kw['maxsize'] == 16
+	assert resized.get_connection_with_tls_context( RequestsRequest( "GET", "https://localhost/" ).prepare(), True ).pool.maxsize == 16
+	pool.close()
+
+def test_keep_alive_connection_is_reused( server ) -> None:
+	server.route( "/", lambda handler: handler.respond( 200, b"ok" ) )
+	pool = SessionPool( workers=2 )
+	for _ in range( 3 ):
+		response = pool.session().get( server.url( "/" ) )
+		assert response.content == b"ok"
+	stats = pool.stats
+	assert stats['connections'] == 1
+	assert stats['hits'] == 2
+	pool.close()
+
+def test_pool_stats_totals_per_host() -> None:
+	stats = PoolStats()
+	stats.count( "a", "hits" )
+	stats.count( "b", "hits" )
+	stats.count( "b", "evictions" )
+	mapping = stats.mapping
+	assert mapping['hits'] == 2
+	assert mapping['evictions'] == 1
+	assert mapping['hosts']['b'] == { "hits": 1, "connections": 0, "evictions": 1 }
+	stats.reset()
+	assert stats.mapping['hits'] == 0
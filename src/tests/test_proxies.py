@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+#
+# @author hxAri (hxari)
+# @create 23-12-2024 17:30
+# @github https://github.com/hxAri/Kanashi
+#
+# Kanashi is an Open-Source project for doing various
+# things related to Instagram, e.g Login. Logout, Profile Info,
+# Follow, Unfollow, Media downloader, etc.
+#
+# Kanashi Copyright (c) 2024 - hxAri <hxari@proton.me>
+# Kanashi Licence under GNU General Public Licence v3
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+
+from pytest import raises
+from time import monotonic
+
+from kanashi.errors import ProxyUnavailableError
+from kanashi.proxies import configure, ProxyPool, proxypool
+from kanashi.request import request
+
+
+def test_assign_is_sticky_and_prefers_unassigned() -> None:
+	pool = ProxyPool([ "http://a", "http://b" ])
+	first = pool.assign( "first" )
+	assert pool.assign( "first" ) is first
+	second = pool.assign( "second" )
+	assert second is not first
+	pool.release( "first" )
+	assert pool.stats[first.url]['assigned'] == 0
+
+def test_failures_cool_down_and_reassign() -> None:
+	pool = ProxyPool([ "http://a", "http://b" ], cooldown=60, threshold=2 )
+	proxy = pool.assign( "key" )
+	pool.report( proxy, 0.1, 200 )
+	pool.report( proxy, status=502 )
+	assert pool.assign( "key" ) is proxy
+	pool.report( proxy, error=ConnectionError() )
+	assert pool.stats[proxy.url]['available'] is False
+	assert pool.stats[proxy.url]['cooldowns'] == 1
+	assert pool.assign( "key" ) is not proxy
+
+def test_ratelimit_evicts_after_repeated_cooldowns() -> None:
+	pool = ProxyPool([ "http://a" ], cooldown=0, evict=2 )
+	proxy = pool.assign( "key" )
+	pool.report( proxy, status=429 )
+	assert pool.assign( "key" ) is proxy
+	pool.report( proxy, status=429 )
+	assert proxy.evicted is True
+	assert pool.assign( "key" ) is None
+
+def test_latency_moving_average() -> None:
+	pool = ProxyPool([ "http://a" ], alpha=0.5 )
+	proxy = pool.assign( "key" )
+	pool.report( proxy, 1.0, 200 )
+	pool.report( proxy, 3.0, 200 )
+	assert proxy.latency == 2.0
+	assert proxy.requests == 2
+
+def test_forked_drops_sticky_keys() -> None:
+	pool = ProxyPool([ "http://a" ])
+	proxy = pool.assign( "key" )
+	pool.forked()
+	assert proxy.assigned == 0
+	assert pool.stats[proxy.url]['assigned'] == 0
+
+def test_request_reports_to_configured_pool( server ) -> None:
+	server.route( "http://proxied.test/ok", lambda handler: handler.respond( 200, b"proxied" ) )
+	configure( ProxyPool([ server.url( "" ) ]) )
+	try:
+		response = request( "GET", "http://proxied.test/ok", coalesce=False )
+		assert response.content == b"proxied"
+		assert proxypool().stats[server.url( "" )]['requests'] == 1
+		response = request( "GET", "http://proxied.test/ok", proxies={ "http": server.url( "" ) }, coalesce=False )
+		assert response.content == b"proxied"
+		assert proxypool().stats[server.url( "" )]['requests'] == 1
+	finally:
+		configure( None )
+
+def test_delay_until_next_proxy() -> None:
+	pool = ProxyPool([ "http://a", "http://b" ], cooldown=60, evict=2 )
+	assert pool.delay() == 0
+	for proxy in pool.proxies:
+		pool.report( proxy, status=429 )
+	assert 59 <= pool.delay() <= 60
+	for proxy in pool.proxies:
+		proxy.resumed = 0
+		pool.report( proxy, status=429 )
+	assert pool.delay() is None
+
+def test_anonymous_requests_do_not_grow_sticky_keys( server ) -> None:
+	server.route( "http://proxied.test/ok", lambda handler: handler.respond( 200, b"proxied" ) )
+	pool = ProxyPool([ server.url( "" ) ])
+	configure( pool )
+	try:
+		for position in range( 20 ):
+			request( "GET", "http://proxied.test/ok", coalesce=False, thread=position )
+			request( "GET", "http://proxied.test/ok", coalesce=False, thread=f"{position}:S1" )
+		assert pool._ProxyPool__sticky == {}
+		assert pool.stats[server.url( "" )]['assigned'] == 0
+		assert pool.stats[server.url( "" )]['requests'] == 40
+	finally:
+		configure( None )
+
+def test_session_keeps_sticky_proxy( server ) -> None:
+	server.route( "http://proxied.test/ok", lambda handler: handler.respond( 200, b"proxied" ) )
+	pool = ProxyPool([ server.url( "" ) ])
+	configure( pool )
+	try:
+		request( "GET", "http://proxied.test/ok", cookies={ "sessionid": "1" }, coalesce=False )
+		assert pool.stats[server.url( "" )]['assigned'] == 1
+	finally:
+		configure( None )
+
+def test_request_waits_for_cooled_down_proxy( server ) -> None:
+	server.route( "http://proxied.test/ok", lambda handler: handler.respond( 200, b"proxied" ) )
+	pool = ProxyPool([ server.url( "" ) ], cooldown=0.5 )
+	pool.report( pool.proxies[0], status=429 )
+	configure( pool )
+	try:
+		started = monotonic()
+		assert request( "GET", "http://proxied.test/ok", coalesce=False ).content == b"proxied"
+		assert monotonic() - started >= 0.4
+		assert server.requests[0][1] == "http://proxied.test/ok"
+	finally:
+		configure( None )
+
+def test_request_refuses_direct_connection( server ) -> None:
+	server.route( "/direct", lambda handler: handler.respond( 200, b"direct" ) )
+	pool = ProxyPool([ "http://127.0.0.1:9" ], evict=1 )
+	pool.report( pool.proxies[0], status=429 )
+	configure( pool )
+	try:
+		with raises( ProxyUnavailableError ):
+			request( "GET", server.url( "/direct" ), coalesce=False )
+		assert server.requests == []
+	finally:
+		configure( None )
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+#
+# @author hxAri (hxari)
+# @create 23-12-2024 17:30
+# @github https://github.com/hxAri/Kanashi
+#
+# Kanashi is an Open-Source project for doing various
+# things related to Instagram, e.g Login. Logout, Profile Info,
+# Follow, Unfollow, Media downloader, etc.
+#
+# Kanashi Copyright (c) 2024 - hxAri <hxari@proton.me>
+# Kanashi Licence under GNU General Public Licence v3
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+from gzip import compress
+from json import dumps as JsonEncoder
+
+from pytest import raises
+from requests.structures import CaseInsensitiveDict
+
+from kanashi.request import request
+from kanashi.retry import Retry
+from kanashi.typing import Response
+
+
+def test_response_decodes_text_lazily_and_parses_json_once() -> None:
+	response = Response( url="http://localhost", type="application/json", status=200, payload=None, content=b"{\"name\":\"kanashi\"}", cookies=None, headers=CaseInsensitiveDict(), charset="utf-8", encoding=None )
+	assert response.isApplicationJson is True
+	assert response.text == "{\"name\":\"kanashi\"}"
+	assert response.json is response.json
+	assert response.json == { "name": "kanashi" }
+
+def test_response_malformed_json_raises_on_every_access() -> None:
+	response = Response( url="http://localhost", type="application/json", status=200, payload=None, content=b"{\"name\":", cookies=None, headers=CaseInsensitiveDict(), charset="utf-8", encoding=None )
+	for _ in range( 2 ):
+		with raises( ValueError ):
+			response.json
+
+def test_request_decodes_gzip_body( server ) -> None:
+	body = JsonEncoder({ "status": "ok" }).encode()
+	server.route( "/gzip", lambda handler: handler.respond( 200, compress( body ), { "Content-Encoding": "gzip", "Content-Type": "application/json; charset=utf-8" } ) )
+	response = request( "GET", server.url( "/gzip" ), coalesce=False )
+	assert response.status == 200
+	assert response.content == body
+	assert response.json == { "status": "ok" }
+
+def test_request_retries_corrupted_body( server ) -> None:
+	attempts = []
+	body = b"complete body"
+	def corrupted( handler ) -> None:
+		attempts.append( handler.path )
+		content = compress( body ) if len( attempts ) >= 2 else compress( body )[:-12]
+		handler.respond( 200, content, { "Content-Encoding": "gzip" } )
+	server.route( "/corrupted", corrupted )
+	response = request( "GET", server.url( "/corrupted" ), retry=Retry( tries=3, backoff=0 ), coalesce=False )
+	assert len( attempts ) == 2
+	assert response.content == body
+
+def test_request_raises_when_body_is_never_decodable( server ) -> None:
+	server.route( "/broken", lambda handler: handler.respond( 200, b"not a gzip stream", { "Content-Encoding": "gzip" } ) )
+	with raises( ExceptionGroup ):
+		request( "GET", server.url( "/broken" ), retry=Retry( tries=2, backoff=0 ), coalesce=False )
+	assert len( server.requests ) == 2
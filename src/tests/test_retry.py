@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+#
+# @author hxAri (hxari)
+# @create 23-12-2024 17:30
+# @github https://github.com/hxAri/Kanashi
+#
+# Kanashi is an Open-Source project for doing various
+# things related to Instagram, e.g Login. Logout, Profile Info,
+# Follow, Unfollow, Media downloader, etc.
+#
+# Kanashi Copyright (c) 2024 - hxAri <hxari@proton.me>
+# Kanashi Licence under GNU General Public Licence v3
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from time import monotonic
+
+from kanashi.request import request
+from kanashi.retry import Idempotent, Retry
+
+
+def test_retryable_statuses() -> None:
+	retry = Retry()
+	assert retry.retryable( 429 ) is True
+	assert retry.retryable( 503 ) is True
+	assert retry.retryable( 404 ) is False
+
+def test_statuses_are_retried_for_idempotent_methods() -> None:
+	retry = Retry()
+	assert retry.retryable( 503, "HEAD" ) is True
+	assert retry.retryable( 503, "POST" ) is False
+	assert retry.retryable( 429, "POST" ) is False
+	assert Retry( methods=[ *Idempotent, "post" ] ).retryable( 503, "POST" ) is True
+
+def test_post_is_not_resent_by_default( server ) -> None:
+	server.route( "/follow", lambda handler: handler.respond( 502, b"" ) )
+	response = request( "POST", server.url( "/follow" ), data={ "id": "1" }, retry=Retry( tries=3, backoff=0 ) )
+	assert response.status == 502
+	assert len( server.requests ) == 1
+	response = request( "POST", server.url( "/follow" ), data={ "id": "1" }, retry=Retry( tries=3, backoff=0, methods=[ "POST" ] ) )
+	assert len( server.requests ) == 4
+
+def test_delay_is_bounded_by_exponential_backoff() -> None:
+	retry = Retry( tries=10, backoff=0.5, maximum=2, deadline=None )
+	started = monotonic()
+	for attempt in range( 1, 9 ):
+		assert 0 <= retry.delay( attempt, started ) <= min( 2, 0.5 * ( 1 << ( attempt -1 ) ) )
+
+def test_delay_is_none_when_exhausted() -> None:
+	retry = Retry( tries=3, backoff=0 )
+	assert retry.delay( 2, monotonic() ) is not None
+	assert retry.delay( 3, monotonic() ) is None
+
+def test_delay_respects_deadline() -> None:
+	retry = Retry( tries=10, backoff=1, deadline=5 )
+	assert retry.delay( 1, monotonic() - 10 ) is None
+
+def test_retry_after_seconds_and_http_date() -> None:
+	retry = Retry( backoff=0, deadline=None )
+	assert retry.delay( 1, monotonic(), "7" ) == 7
+	retryAt = format_datetime( datetime.now( timezone.utc ) + timedelta( seconds=30 ), usegmt=True )
+	assert 25 <= retry.after( retryAt ) <= 30
+	assert retry.after( "invalid" ) is None
+	assert retry.after( None ) is None
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+#
+# @author hxAri (hxari)
+# @create 23-12-2024 17:30
+# @github https://github.com/hxAri/Kanashi
+#
+# Kanashi is an Open-Source project for doing various
+# things related to Instagram, e.g Login. Logout, Profile Info,
+# Follow, Unfollow, Media downloader, etc.
+#
+# Kanashi Copyright (c) 2024 - hxAri <hxari@proton.me>
+# Kanashi Licence under GNU General Public Licence v3
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# any later version.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+
+from gzip import compress
+from os import listdir
+from json import dumps as JsonEncoder
+from pytest import raises
+from requests import Request
+
+from kanashi.errors import TransportError
+from kanashi.pool import SessionPool
+from kanashi.transport import _keyset, Cassette, RecordAdapter, ReplayAdapter
+
+
+def prepare( body:str, content:str="application/x-www-form-urlencoded" ):
+	return Request( "POST", "https://www.instagram.com/graphql/query", data=body, headers={ "Content-Type": content } ).prepare()
+
+def test_keyset_hashes_whole_body_by_default() -> None:
+	assert _keyset( prepare( "doc_id=1&ts=1" ) ) != _keyset( prepare( "doc_id=1&ts=2" ) )
+
+def test_keyset_hashes_selected_fields() -> None:
+	fields = [ "doc_id", "variables" ]
+	assert _keyset( prepare( "doc_id=1&ts=1" ), fields ) == _keyset( prepare( "ts=2&doc_id=1" ), fields )
+	assert _keyset( prepare( "doc_id=1&ts=1" ), fields ) != _keyset( prepare( "doc_id=2&ts=1" ), fields )
+	json = lambda values: prepare( JsonEncoder( values ), "application/json" )
+	assert _keyset( json({ "doc_id": 1, "nonce": "a" }), fields ) == _keyset( json({ "nonce": "b", "doc_id": 1 }), fields )
+
+def test_record_then_replay( server, tmp_path ) -> None:
+	body = compress( b"{\"ok\":true}" )
+	server.route( "/graphql", lambda handler: handler.respond( 200, body, { "Content-Encoding": "gzip", "Content-Type": "application/json" } ) )
+	cassette = Cassette( "graphql", pathname=str( tmp_path ), fields=[ "doc_id" ] )
+	pool = SessionPool( workers=1 )
+	pool.transport( RecordAdapter.factory( cassette ) )
+	response = pool.session().post( server.url( "/graphql" ), data={ "doc_id": "1", "ts": "1" } )
+	assert response.json() == { "ok": True }
+	assert response.raw._fp.closed is True
+	assert cassette.interactions == 1
+	pool.transport( ReplayAdapter.factory( Cassette( "graphql", pathname=str( tmp_path ), fields=[ "doc_id" ] ) ) )
+	response = pool.session().post( server.url( "/graphql" ), data={ "doc_id": "1", "ts": "2" } )
+	assert response.json() == { "ok": True }
+	assert len( server.requests ) == 1
+	with raises( TransportError ):
+		pool.session().post( server.url( "/graphql" ), data={ "doc_id": "2" } )
+
+def test_record_streams_and_keys_ranges( server, tmp_path ) -> None:
+	body = bytes( range( 256 ) ) * 4
+	def ranged( handler ) -> None:
+		start, end = handler.headers['Range'].removeprefix( "bytes=" ).split( "-" )
+		handler.respond( 206, body[int( start ):int( end ) +1], { "Content-Range": f"bytes {start}-{end}/{len( body )}" } )
+	server.route( "/media.mp4", ranged )
+	cassette = Cassette( "media", pathname=str( tmp_path ) )
+	pool = SessionPool( workers=1 )
+	pool.transport( RecordAdapter.factory( cassette ) )
+	for start, end in [ ( 0, 511 ), ( 512, 1023 ) ]:
+		response = pool.session().get( server.url( "/media.mp4" ), headers={ "Range": f"bytes={start}-{end}" }, stream=True )
+		assert cassette.interactions == ( 0 if start == 0 else 1 )
+		assert b"".join( response.iter_content( 128 ) ) == body[start:end+1]
+	assert cassette.interactions == 2
+	response = pool.session().get( server.url( "/media.mp4" ), headers={ "Range": "bytes=0-1023" }, stream=True )
+	response.raw.read( 16 )
+	response.close()
+	assert cassette.interactions == 2
+	assert sorted( name for name in listdir( f"{tmp_path}/media" ) if name.startswith( "tmp" ) ) == []
+	pool.transport( ReplayAdapter.factory( Cassette( "media", pathname=str( tmp_path ) ) ) )
+	for start, end in [ ( 512, 1023 ), ( 0, 511 ) ]:
+		response = pool.session().get( server.url( "/media.mp4" ), headers={ "Range": f"bytes={start}-{end}" } )
+		assert response.content == body[start:end+1]
+	assert len( server.requests ) == 3